@@ -0,0 +1,114 @@
+"""
+Regulatory Navigator - Report Artifact Store
+Disk-backed store for generated PDFs, so reports are rendered once, on demand, and kept out of memory.
+
+A report is keyed by a SHA-256 over its name, the hash of the source PDF and the findings it
+depends on: an annotated document only on the requirements found in it, the summary on the score,
+all requirements and the recommendations. Re-rendering the same document with the same findings
+is therefore a store hit, whichever job or resubmission asks for it. Files live in a spool
+directory (see spool.py), expire after a TTL and are evicted least-recently-used beyond the
+entry/byte budget. A document whose annotation fails is served unannotated and not stored.
+
+Environment:
+    NAVIGATOR_ARTIFACT_DIR   spool directory (default: .cache/artifacts next to this file)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+import pipeline
+import spool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACT_DIR = os.path.join(pipeline.BASE_DIR, ".cache", "artifacts")
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 3 * 24 * 3600
+ARTIFACT_SUFFIX = ".pdf"
+
+
+def document_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def report_inputs(report: str, evaluation_result: Dict, lang: str = "en") -> Dict:
+    """The part of an evaluation a report is rendered from (and, for the summary, its language)."""
+    if report == pipeline.SUMMARY_REPORT:
+        inputs = {"score": evaluation_result["overall_score"], "requirements": evaluation_result["requirements"],
+                  "recommendations": evaluation_result.get("recommendations", [])}
+        if lang != "en": inputs["lang"] = lang  # English keys stay as they were before languages existed
+        return inputs
+    return {"requirements": [r for r in evaluation_result["requirements"] if r.get("found_in_document") == report]}
+
+
+class ArtifactStore(spool.SpoolStore):
+    """Spool directory of rendered reports with TTL and LRU (entry count / total size) eviction."""
+
+    SUFFIX = ARTIFACT_SUFFIX
+    DESCRIPTION = "report artifact"
+
+    def __init__(self, directory: str = DEFAULT_ARTIFACT_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        super().__init__(directory, max_entries, max_bytes, ttl_seconds)
+        self._render_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def key(report: str, source_hash: str, evaluation_result: Dict, lang: str = "en") -> str:
+        """Content hash of everything the rendered report depends on."""
+        return spool.content_key(report, source_hash, json.dumps(report_inputs(report, evaluation_result, lang), sort_keys=True, ensure_ascii=False))
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Serves the artifact from the store, rendering and storing it first if needed.
+
+        Concurrent requests for the same key wait for one render instead of repeating it. A render
+        that raises stores nothing and the exception propagates.
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+        with self._lock:
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        try:
+            with render_lock:
+                data = self.get(key)
+                if data is None:
+                    data = render()
+                    self.put(key, data)
+        finally:
+            with self._lock:
+                self._render_locks.pop(key, None)
+        return data
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(os.environ.get("NAVIGATOR_ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR))
+        return _store
+
+def get_report(report: str, pdf_bytes: Optional[bytes], evaluation_result: Dict, store: Optional[ArtifactStore] = None,
+               lang: str = "en") -> bytes:
+    """One rendered report (a document category or SUMMARY_REPORT), served from the store when possible.
+
+    `pdf_bytes` is the source document for an annotated report and is ignored for the summary;
+    `lang` only applies to the summary.
+    """
+    store = store or get_store()
+    source_hash = document_hash(pdf_bytes) if report != pipeline.SUMMARY_REPORT else ""
+    key = store.key(report, source_hash, evaluation_result, lang)
+    try:
+        return store.get_or_render(key, lambda: pipeline.render_report(report, pdf_bytes, evaluation_result, lang, fallback=False))
+    except Exception as e:
+        if report == pipeline.SUMMARY_REPORT:
+            raise
+        # Same fallback as pipeline.annotate_pdf, but kept out of the store so the next request retries.
+        logger.error(f"Error annotating PDF for {report}: {e}")
+        return pdf_bytes
@@ -0,0 +1,209 @@
+"""
+Regulatory Navigator - Headless Batch Evaluation
+Evaluates many applications concurrently. PDF extraction and report rendering (PyMuPDF, ReportLab)
+run on a process pool; LLM calls run on a bounded thread pool in the parent process.
+
+An application is a (business plan, compliance policy, legal structure) triple, given either as
+a directory of application folders, each holding business_plan.pdf, compliance_policy.pdf and
+legal_structure.pdf, or as a manifest (.jsonl or .csv) with the columns
+id, business_plan, compliance_policy, legal_structure. Each application's reports go to a folder
+named after its id, so ids must be unique and must not be a path ("a/b", "..").
+
+Usage:
+    python batch.py applications/ --out results/
+    python batch.py manifest.jsonl --out results/ --workers 8 --llm-concurrency 16
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import eval_cache
+import pipeline
+import tracing
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILENAME = "results.jsonl"
+
+
+# --- Application Discovery ---
+
+def discover_applications(source: str) -> List[Dict]:
+    """Lists applications as {"id", "business_plan", "compliance_policy", "legal_structure"} path records."""
+    if os.path.isdir(source):
+        applications = []
+        for name in sorted(os.listdir(source)):
+            app_dir = os.path.join(source, name)
+            if not os.path.isdir(app_dir): continue
+            paths = {cat: os.path.join(app_dir, f"{cat}.pdf") for cat in pipeline.DOCUMENT_CATEGORIES}
+            missing = [cat for cat, path in paths.items() if not os.path.isfile(path)]
+            if missing:
+                logger.warning(f"Skipping {app_dir}: missing {', '.join(missing)}")
+                continue
+            applications.append({"id": name, **paths})
+        return applications
+    return _read_manifest(source)
+
+def validate_applications(applications: List[Dict]) -> None:
+    """Raises ValueError unless every id is unique and usable as a single folder name under the output directory."""
+    seen = set()
+    for application in applications:
+        app_id = application["id"]
+        if app_id in ("", ".", "..") or any(sep and sep in app_id for sep in ("/", "\\", os.sep, os.altsep, "\0")):
+            raise ValueError(f"Application id {app_id!r} cannot be used as a folder name")
+        if app_id in seen:
+            raise ValueError(f"Duplicate application id {app_id!r}")
+        seen.add(app_id)
+
+def _read_manifest(manifest_path: str) -> List[Dict]:
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+        if manifest_path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    applications = []
+    for index, row in enumerate(rows):
+        app = {"id": str(row.get("id") or index)}
+        for cat in pipeline.DOCUMENT_CATEGORIES:
+            if not row.get(cat):
+                raise ValueError(f"Manifest row {index} has no '{cat}' path")
+            app[cat] = os.path.join(base_dir, row[cat])
+        applications.append(app)
+    validate_applications(applications)
+    return applications
+
+
+# --- Process-Pool Workers ---
+# These run in child processes and only exchange paths, texts and evaluation dicts with the
+# parent, never PDF bytes.
+
+def _read_pdfs(application: Dict) -> Dict[str, bytes]:
+    pdf_bytes = {}
+    for cat in pipeline.DOCUMENT_CATEGORIES:
+        with open(application[cat], "rb") as f:
+            pdf_bytes[cat] = f.read()
+    return pdf_bytes
+
+# Each stage runs in its own process or thread, so each records its own trace, tagged with the application id.
+
+def _extract_worker(application: Dict) -> Dict[str, List[str]]:
+    with tracing.span("batch_extract", application=application["id"]):
+        return pipeline.extract_documents(_read_pdfs(application))
+
+def _evaluate_worker(application: Dict, pages: Dict[str, List[str]], client, use_cache: bool, strategy: Optional[str]) -> Dict:
+    with tracing.span("batch_evaluate", application=application["id"]):
+        return pipeline.evaluate_documents(pages, client, use_cache, strategy)
+
+def _render_worker(application: Dict, evaluation_result: Dict, output_dir: str) -> Dict[str, str]:
+    with tracing.span("batch_render", application=application["id"]):
+        reports = pipeline.render_reports(_read_pdfs(application), evaluation_result)
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {}
+    for key, data in reports.items():
+        outputs[key] = os.path.join(output_dir, pipeline.OUTPUT_FILENAMES[key])
+        with open(outputs[key], "wb") as f:
+            f.write(data)
+    return outputs
+
+
+# --- Batch Engine ---
+
+def run_batch(applications: List[Dict], output_dir: str, workers: Optional[int] = None, llm_concurrency: int = 4, client=None,
+              use_cache: bool = True, strategy: Optional[str] = None) -> Dict[str, int]:
+    """Evaluates all applications and writes results.jsonl plus the four PDFs per application.
+
+    Stages are chained per application as futures complete, so extraction of later applications
+    overlaps with LLM calls and rendering of earlier ones. Returns {"ok": n, "error": n}.
+    Raises ValueError for duplicate or path-like application ids (see validate_applications).
+    """
+    validate_applications(applications)
+    os.makedirs(output_dir, exist_ok=True)
+    client = client or pipeline.get_client()
+    counts = {"ok": 0, "error": 0}
+    started = {}
+
+    # "spawn" keeps worker processes from forking a parent that already has live LLM threads.
+    cpu_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+    with cpu_pool, llm_pool, open(os.path.join(output_dir, RESULTS_FILENAME), "w", encoding="utf-8") as sink:
+        def record(application: Dict, **fields):
+            row = {"id": application["id"], **fields, "elapsed": round(time.monotonic() - started[application["id"]], 3)}
+            sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+            sink.flush()
+            counts[fields["status"]] += 1
+
+        pending = {}
+        for application in applications:
+            started[application["id"]] = time.monotonic()
+            pending[cpu_pool.submit(_extract_worker, application)] = ("extract", application, None)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, application, state = pending.pop(future)
+                try:
+                    value = future.result()
+                    if stage == "extract":
+                        pending[llm_pool.submit(_evaluate_worker, application, value, client, use_cache, strategy)] = ("evaluate", application, value)
+                    elif stage == "evaluate":
+                        with tracing.span("batch_finalize", application=application["id"]):
+                            evaluation_result = pipeline.finalize_evaluation(value, state)
+                        app_dir = os.path.join(output_dir, application["id"])
+                        pending[cpu_pool.submit(_render_worker, application, evaluation_result, app_dir)] = ("render", application, evaluation_result)
+                    else:
+                        record(application, status="ok", score=state["overall_score"], requirements=state["requirements"],
+                               recommendations=state.get("recommendations", []), outputs=value)
+                        logger.info(f"{application['id']}: score {state['overall_score']}%")
+                except Exception as e:
+                    logger.error(f"{application['id']}: {stage} failed: {e}")
+                    record(application, status="error", stage=stage, error=str(e))
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate a batch of QCB applications without the Streamlit UI.")
+    parser.add_argument("source", help="Directory of application folders, or a .jsonl/.csv manifest")
+    parser.add_argument("--out", default="batch_output", help="Output directory for results.jsonl and the PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for PDF stages (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum concurrent LLM requests")
+    parser.add_argument("--strategy", choices=pipeline.EVALUATION_STRATEGIES, default=None,
+                        help="How to request the AI evaluation (default: NAVIGATOR_STRATEGY or single)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the evaluation cache and always call the LLM")
+    parser.add_argument("--trace", nargs="?", const=tracing.DEFAULT_TRACE_FILE, default=None, metavar="FILE",
+                        help="Record per-stage traces to FILE (default .cache/traces/traces.jsonl), see tracing.py")
+    args = parser.parse_args(argv)
+    if args.trace:
+        tracing.enable(args.trace)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        applications = discover_applications(args.source)
+    except ValueError as e:
+        logger.error(f"Invalid manifest {args.source}: {e}")
+        return 1
+    if not applications:
+        logger.error(f"No applications found in {args.source}")
+        return 1
+
+    began = time.monotonic()
+    counts = run_batch(applications, args.out, workers=args.workers, llm_concurrency=args.llm_concurrency,
+                       use_cache=not args.no_cache, strategy=args.strategy)
+    cache = eval_cache.get_cache()
+    if cache is not None and not args.no_cache:
+        logger.info(f"Evaluation cache: {cache.hits} hits, {cache.misses} misses")
+    logger.info(f"Evaluated {len(applications)} applications in {time.monotonic() - began:.1f}s "
+                f"({counts['ok']} ok, {counts['error']} failed) -> {os.path.join(args.out, RESULTS_FILENAME)}")
+    return 0 if counts["error"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
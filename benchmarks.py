@@ -0,0 +1,177 @@
+"""
+Regulatory Navigator - Benchmark Suite
+Times and memory-profiles each pipeline stage on a synthetic application (corpus.py), with the LLM
+replaced by mock_llm.MockClient, and times a whole batch run end to end. Results can be stored as a
+baseline, and later runs are compared against it to catch regressions.
+
+Stages (single application):
+    extract_text    extract_text_from_pdf over the three documents
+    build_prompt    build_evaluation_prompt for the full catalog
+    evaluate        evaluate_documents against the mock client (latency from --latency)
+    apply_checks    apply_hardcoded_checks, with the rule scan memo cleared each run
+    score           calculate_transparent_score
+    annotate_pdf    annotate_pdf over the three documents
+    summary_pdf     generate_summary_pdf
+Batch: batch.run_batch over --batch applications, process pool and mock client included.
+
+Times are the median and minimum of --repeat runs; memory is the tracemalloc peak of one more run,
+so it counts Python allocations, not PyMuPDF's own buffers. A stage regresses when its median time
+grows by more than --tolerance (and by at least 2 ms), or its peak memory by more than --tolerance.
+
+Usage:
+    python benchmarks.py --pages 20 --quotes 12 --lang mixed --batch 8 --save-baseline
+    python benchmarks.py --pages 20 --quotes 12 --lang mixed --batch 8     # exits 1 on a regression
+"""
+
+import argparse
+import copy
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import corpus
+import mock_llm
+import pipeline
+import rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = os.path.join(pipeline.BASE_DIR, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 2.0
+
+
+def measure(run: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Median/min time (ms) of `repeat` runs and the tracemalloc peak (KiB) of one more; `setup` runs untimed before each."""
+    timings = []
+    for _ in range(repeat):
+        if setup: setup()
+        began = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - began) * 1000)
+    if setup: setup()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3), "peak_kib": round(peak / 1024, 1)}
+
+def run_stages(settings: Dict, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmarks each stage on one synthetic application."""
+    pdf_bytes = corpus.make_application(settings["pages"], settings["quotes"], settings["lang"])
+    client = mock_llm.MockClient(per_requirement_latency=settings["latency"], detail_words=settings["detail_words"])
+    texts = {cat: pipeline.extract_text_from_pdf(io.BytesIO(data)) for cat, data in pdf_bytes.items()}
+    pages = pipeline.extract_documents(pdf_bytes)
+    evaluation = pipeline.evaluate_documents(pages, client=client, use_cache=False)
+    result = pipeline.finalize_evaluation(copy.deepcopy(evaluation), pages)
+    state = {}
+
+    def fresh_requirements():
+        rules.clear_scan_cache()
+        state["requirements"] = copy.deepcopy(evaluation["requirements"])
+
+    return {
+        "extract_text": measure(lambda: [pipeline.extract_text_from_pdf(io.BytesIO(data)) for data in pdf_bytes.values()], repeat),
+        "build_prompt": measure(lambda: pipeline.build_evaluation_prompt(texts), repeat),
+        "evaluate": measure(lambda: pipeline.evaluate_documents(pages, client=client, use_cache=False), repeat, setup=rules.clear_scan_cache),
+        "apply_checks": measure(lambda: pipeline.apply_hardcoded_checks(state["requirements"], texts), repeat, setup=fresh_requirements),
+        "score": measure(lambda: pipeline.calculate_transparent_score(result["requirements"]), repeat),
+        "annotate_pdf": measure(lambda: [pipeline.annotate_pdf(data, result["requirements"], cat) for cat, data in pdf_bytes.items()], repeat),
+        "summary_pdf": measure(lambda: pipeline.generate_summary_pdf(result["overall_score"], result["requirements"],
+                                                                     result.get("recommendations", [])), repeat),
+    }
+
+def run_batch_benchmark(settings: Dict, applications: int, workers: Optional[int] = None) -> Dict[str, float]:
+    """Wall time of batch.run_batch over a synthetic corpus (corpus generation not included)."""
+    import batch
+
+    client = mock_llm.MockClient(per_requirement_latency=settings["latency"], detail_words=settings["detail_words"])
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir, out_dir = os.path.join(work_dir, "corpus"), os.path.join(work_dir, "out")
+        corpus.write_corpus(corpus_dir, applications, settings["pages"], settings["quotes"], settings["lang"])
+        began = time.perf_counter()
+        counts = batch.run_batch(batch.discover_applications(corpus_dir), out_dir, workers=workers, client=client, use_cache=False)
+        seconds = time.perf_counter() - began
+    if counts["error"]:
+        raise RuntimeError(f"{counts['error']} of {applications} batch applications failed")
+    return {"median_ms": round(seconds * 1000, 1), "per_application_ms": round(seconds * 1000 / applications, 1),
+            "applications_per_second": round(applications / seconds, 2)}
+
+
+# --- Baselines ---
+
+def environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of `results` against `baseline`, as readable lines."""
+    if baseline.get("settings") != results["settings"]:
+        logger.warning("Baseline was recorded with different settings; not comparing")
+        return []
+    regressions = []
+    for stage, now in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before is None: continue
+        if now["median_ms"] > before["median_ms"] * (1 + tolerance) and now["median_ms"] - before["median_ms"] >= MIN_REGRESSION_MS:
+            regressions.append(f"{stage}: {before['median_ms']:.1f} ms -> {now['median_ms']:.1f} ms")
+        if "peak_kib" in now and now["peak_kib"] > before.get("peak_kib", float("inf")) * (1 + tolerance):
+            regressions.append(f"{stage}: peak {before['peak_kib']:.0f} KiB -> {now['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage and a batch run on a synthetic corpus with a mock LLM.")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per synthetic document")
+    parser.add_argument("--quotes", type=int, default=8, help="Requirement quotes placed per document")
+    parser.add_argument("--lang", choices=corpus.LANGUAGES, default="en")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock: seconds per requirement in a reply")
+    parser.add_argument("--detail-words", type=int, default=0, help="Mock: words of padding per finding (reply size)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=0, metavar="APPLICATIONS", help="Also time a batch run of this many applications")
+    parser.add_argument("--workers", type=int, default=None, help="Batch: worker processes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown/growth before a regression")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+
+    settings = {"pages": args.pages, "quotes": args.quotes, "lang": args.lang, "latency": args.latency,
+                "detail_words": args.detail_words, "batch": args.batch}
+    results = {"settings": settings, "environment": environment(), "stages": run_stages(settings, args.repeat)}
+    if args.batch:
+        results["stages"]["batch"] = run_batch_benchmark(settings, args.batch, args.workers)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.pages} pages, {args.quotes} quotes, {args.lang}, {args.repeat} runs per stage")
+        for stage, stats in results["stages"].items():
+            extra = (f"{stats['per_application_ms']:.0f} ms/application, {stats['applications_per_second']:.2f} applications/s"
+                     if stage == "batch" else f"min {stats['min_ms']:9.2f} ms   peak {stats['peak_kib']:8.0f} KiB")
+            print(f"  {stage:<14} {stats['median_ms']:9.2f} ms   {extra}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Regulatory Navigator - Prompt Token Budget
+Counts prompt tokens and fits the documents of an evaluation prompt into a token budget.
+
+The evaluation prompts are laid out for provider-side prompt caching. Everything that does not depend
+on the application comes first as a static prefix: instructions, output format and requirements. The
+documents come last. Evaluations that ask about the same requirements then share a prefix the provider
+can serve from its cache; OpenAI caches prefixes of 1024 tokens or more.
+
+When the documents do not fit in what the budget leaves after the prefix, each document gets a share:
+documents smaller than an equal share keep all their text and the others split the rest. A document
+over its share keeps its paragraphs in order up to the share, the first one that does not fit cut
+at a word, and ends with a note that the rest was left out; the cut is logged.
+
+Tokens are counted with tiktoken when it is installed, otherwise estimated at CHARS_PER_TOKEN
+characters per token.
+
+Environment:
+    NAVIGATOR_PROMPT_BUDGET   maximum prompt tokens (default: DEFAULT_MAX_TOKENS)
+"""
+
+import logging
+import math
+import os
+import re
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# gpt-4o has a 128k context; the rest is left for the reply.
+DEFAULT_MAX_TOKENS = 110_000
+CHARS_PER_TOKEN = 4
+TRUNCATION_NOTE = "[{omitted} of {total} paragraphs omitted to fit the prompt budget]"
+
+_WORD_RE = re.compile(r"\S+")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def max_prompt_tokens() -> int:
+    return int(os.environ.get("NAVIGATOR_PROMPT_BUDGET", DEFAULT_MAX_TOKENS))
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")  # the gpt-4o tokenizer
+        except Exception as e:
+            logger.debug(f"tiktoken unavailable ({e}); estimating tokens from characters")
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens of `text`: exact with tiktoken, otherwise estimated from its length."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _shares(sizes: Dict[str, int], available: int) -> Dict[str, int]:
+    """Splits `available` tokens between documents: small documents get their size, the rest an equal share of what is left."""
+    shares, remaining, pending = {}, max(available, 0), sorted(sizes, key=sizes.get)
+    while pending:
+        equal = remaining // len(pending)
+        if sizes[pending[0]] > equal:
+            shares.update({name: equal for name in pending})
+            break
+        name = pending.pop(0)
+        shares[name] = sizes[name]
+        remaining -= sizes[name]
+    return shares
+
+def _cut(paragraph: str, limit: int) -> str:
+    """The longest prefix of `paragraph`, ending at a word, of at most `limit` tokens (binary search over word ends)."""
+    ends = [match.end() for match in _WORD_RE.finditer(paragraph)]
+    low, high = 0, len(ends)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(paragraph[:ends[middle - 1]]) <= limit:
+            low = middle
+        else:
+            high = middle - 1
+    return paragraph[:ends[low - 1]] if low else ""
+
+def _truncate(text: str, limit: int, separator: str) -> str:
+    paragraphs = text.split(separator)
+    kept, used = [], count_tokens(TRUNCATION_NOTE.format(omitted=len(paragraphs), total=len(paragraphs)))
+    for paragraph in paragraphs:
+        cost = count_tokens(paragraph) + 1
+        if used + cost > limit: break
+        kept.append(paragraph)
+        used += cost
+    omitted = len(paragraphs) - len(kept)
+    if omitted:
+        # The first paragraph that does not fit is cut at a word (and still counts as omitted), so a
+        # document without blank lines keeps its start instead of only the note.
+        cut = _cut(paragraphs[len(kept)], limit - used - 1)
+        if cut: kept.append(cut)
+    kept.append(TRUNCATION_NOTE.format(omitted=omitted, total=len(paragraphs)))
+    return separator.join(kept)
+
+def fit(prefix: str, documents: Dict[str, str], max_tokens: Optional[int] = None, separator: str = "\n\n") -> Dict[str, str]:
+    """The documents, cut down where needed so `prefix` plus all documents stay within max_tokens (default: NAVIGATOR_PROMPT_BUDGET)."""
+    max_tokens = max_prompt_tokens() if max_tokens is None else max_tokens
+    available = max_tokens - count_tokens(prefix)
+    sizes = {name: count_tokens(text) for name, text in documents.items()}
+    if sum(sizes.values()) <= available:
+        return documents
+    shares = _shares(sizes, available)
+    fitted = {}
+    for name, text in documents.items():
+        if sizes[name] <= shares[name]:
+            fitted[name] = text
+        else:
+            fitted[name] = _truncate(text, shares[name], separator)
+            logger.warning(f"{name}: {sizes[name]} tokens cut to {shares[name]} to fit the prompt budget of {max_tokens}")
+    return fitted
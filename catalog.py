@@ -0,0 +1,153 @@
+"""
+Regulatory Navigator - Requirement Catalog
+The requirement catalog compiled from its four configuration files, with indexes for the hot paths.
+
+requirements.json lists the requirements; scoring.json weighs them, remediation.json holds the
+suggestion for a gap and resource_mapping_data.json links support resources to requirement ids.
+Catalog resolves all of them once into dicts keyed by requirement id (weights with the default
+applied, resources by linked id), plus indexes by category and input_category, so scoring and
+resource mapping cost a lookup per requirement instead of a scan of the catalog or the provider
+list. The files are checked while compiling:
+- problems: a requirement without a required field, a duplicate id, a weight that is not a
+  non-negative number. These are errors.
+- warnings: a weight, template or resource link that names no requirement in requirements.json,
+  e.g. "minimum_capital" after it was split into "minimum_capital_psp/p2p/wealth", or an entry kept
+  for a requirement not (yet) in the catalog. Such entries stay in their files and are ignored, so
+  they are reported instead of silently never matching.
+
+get_catalog() recompiles when any of the files changes (see config.load). Check the files:
+    python catalog.py            # exits 1 on problems; --strict also on warnings
+"""
+
+import argparse
+import logging
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+REQUIREMENTS_FILE = "requirements.json"
+SCORING_FILE = "scoring.json"
+REMEDIATION_FILE = "remediation.json"
+RESOURCES_FILE = "resource_mapping_data.json"
+DEFAULT_WEIGHT = 2
+DEFAULT_PARTIAL_MULTIPLIER = 0.4
+_REQUIRED_FIELDS = ("id", "category", "requirement", "input_category")
+
+
+class Catalog:
+    """Compiled, read-only view of the requirement catalog. Callers must not mutate what it returns."""
+
+    def __init__(self, requirements: List[Dict], scoring: Dict, remediation: Dict[str, str], resources: List[Dict]):
+        self.sources = (requirements, scoring, remediation, resources)
+        self.requirements = requirements
+        self.remediation = remediation
+        self.problems: List[str] = []
+        self.warnings: List[str] = []
+
+        self.by_id: Dict[str, Dict] = {}
+        self.position: Dict[str, int] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        self.by_input_category: Dict[str, List[Dict]] = {}
+        for index, req in enumerate(requirements):
+            missing = [field for field in _REQUIRED_FIELDS if not req.get(field)]
+            if missing:
+                self.problems.append(f"{REQUIREMENTS_FILE}: requirement #{index} ({req.get('id', '?')}) has no {', '.join(missing)}")
+            if "id" not in req:
+                continue
+            if req["id"] in self.by_id:
+                self.problems.append(f"{REQUIREMENTS_FILE}: duplicate id '{req['id']}', the first one is used")
+                continue
+            self.by_id[req["id"]] = req
+            self.position[req["id"]] = index
+            self.by_category.setdefault(req.get("category", "Other"), []).append(req)
+            self.by_input_category.setdefault(req.get("input_category"), []).append(req)
+
+        configured = scoring.get("weights", {})
+        default_weight = scoring.get("default_weight", DEFAULT_WEIGHT)
+        self.partial_multiplier = scoring.get("partial_multiplier", DEFAULT_PARTIAL_MULTIPLIER)
+        self.weights = {req_id: configured.get(req_id, default_weight) for req_id in self.by_id}
+        for req_id, weight in self.weights.items():
+            if not isinstance(weight, (int, float)) or weight < 0:
+                self.problems.append(f"{SCORING_FILE}: weight of '{req_id}' is not a non-negative number: {weight!r}")
+        self._check_ids(SCORING_FILE, "weights", configured)
+        self._check_ids(REMEDIATION_FILE, "templates", remediation)
+
+        self.resources_by_id: Dict[str, List[Dict]] = {}
+        for resource in resources:
+            linked = resource.get("linked_rule_ids", [])
+            for req_id in dict.fromkeys(linked):  # a resource is listed once per requirement
+                self.resources_by_id.setdefault(req_id, []).append(resource)
+            self._check_ids(RESOURCES_FILE, f"resource '{resource.get('name', '?')}'", linked)
+
+    def _check_ids(self, filename: str, where: str, ids) -> None:
+        unknown = [req_id for req_id in ids if req_id not in self.by_id]
+        if unknown:
+            self.warnings.append(f"{filename}: {where} name requirement id(s) not in {REQUIREMENTS_FILE}: {', '.join(unknown)}")
+
+    def resources_for(self, requirement_id: str) -> List[Dict]:
+        """Support resources linked to a requirement, in file order (a new list each call)."""
+        return list(self.resources_by_id.get(requirement_id, ()))
+
+    def score(self, requirements: List[Dict], provisional: bool = False) -> int:
+        """Weighted readiness score over the catalog; see pipeline.calculate_transparent_score."""
+        statuses: Dict[str, str] = {}
+        for req in requirements:
+            statuses.setdefault(req.get("id"), req.get("status"))  # the first finding for an id counts
+        ids = [req_id for req_id in self.weights if req_id in statuses] if provisional else self.weights
+        # Compliant and partial weights are summed apart and the multiplier applied once, so the
+        # result does not depend on the order of the requirements.
+        compliant, partial, max_score = 0, 0, 0
+        for req_id in ids:
+            weight = self.weights[req_id]
+            max_score += weight
+            status = statuses.get(req_id)
+            if status == "compliant": compliant += weight
+            elif status == "partial": partial += weight
+        if max_score == 0: return 0
+        return int(((compliant + partial * self.partial_multiplier) / max_score) * 100)
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+def _load_sources() -> Tuple:
+    return tuple(config.load(filename) for filename in (REQUIREMENTS_FILE, SCORING_FILE, REMEDIATION_FILE, RESOURCES_FILE))
+
+def get_catalog() -> Catalog:
+    """The catalog compiled from the current files; recompiled (and re-validated) when one of them changes."""
+    global _catalog
+    sources = _load_sources()
+    catalog = _catalog
+    if catalog is not None and all(a is b for a, b in zip(sources, catalog.sources)):
+        return catalog
+    with _catalog_lock:
+        if _catalog is None or not all(a is b for a, b in zip(sources, _catalog.sources)):
+            _catalog = Catalog(*sources)
+            for problem in _catalog.problems:
+                logger.warning(f"Requirement catalog: {problem}")
+            if _catalog.warnings:
+                logger.warning(f"Requirement catalog: {len(_catalog.warnings)} reference(s) to requirements not in {REQUIREMENTS_FILE}; "
+                               f"those entries are ignored (python catalog.py lists them)")
+        return _catalog
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the requirement catalog and report broken cross-references.")
+    parser.add_argument("--strict", action="store_true", help="Also exit 1 on warnings (entries for unknown requirements)")
+    args = parser.parse_args(argv)
+    catalog = Catalog(*_load_sources())
+    print(f"{len(catalog.by_id)} requirements in {len(catalog.by_category)} categories, "
+          f"{sum(len(r) for r in catalog.resources_by_id.values())} resource links, {len(catalog.remediation)} remediation templates")
+    for problem in catalog.problems:
+        print(f"  - error: {problem}")
+    for warning in catalog.warnings:
+        print(f"  - warning: {warning}")
+    return 1 if catalog.problems or (args.strict and catalog.warnings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
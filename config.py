@@ -0,0 +1,183 @@
+"""
+Regulatory Navigator - Configuration and Clients
+Process-wide cache of the JSON configuration files and the OpenAI clients.
+
+A configuration file is parsed once and re-read only when its modification time or size changes,
+so edits to requirements.json, scoring.json, rules.json etc. take effect without a restart while a
+Streamlit rerun costs one stat per file. An edit that leaves a file unparsable keeps the previous
+version in use. OpenAI clients are built on first use and shared per API key and base URL.
+
+The openai SDK, PyMuPDF and ReportLab are imported only when an evaluation or a render needs them,
+so the page comes up without paying for them. Check startup against its budget:
+    python config.py --benchmark
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Startup budget checked by the benchmark: importing what the page needs, and one rerun of the page.
+COLD_START_BUDGET_SECONDS = 0.5
+RERUN_BUDGET_MS = 50.0
+HEAVY_MODULES = ("openai", "fitz", "reportlab.platypus", "numpy")
+
+
+# --- Configuration Files ---
+
+_files: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_files_lock = threading.Lock()
+
+def load(filename: str) -> Any:
+    """The parsed JSON of a configuration file (relative to this directory), re-read when it changes.
+
+    Callers share the returned object and must not mutate it. Raises FileNotFoundError or
+    ValueError only if no version of the file could ever be loaded.
+    """
+    path = filename if os.path.isabs(filename) else os.path.join(BASE_DIR, filename)
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        if path in _files:
+            logger.warning(f"Configuration file {filename} disappeared; keeping the loaded version")
+            return _files[path][1]
+        raise
+    cached = _files.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _files_lock:
+        cached = _files.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            if cached is None:
+                raise
+            logger.warning(f"Could not reload {filename}, keeping the previous version: {e}")
+            return cached[1]
+        if cached is not None:
+            logger.info(f"Reloaded configuration file {filename}")
+        _files[path] = (signature, data)
+        return data
+
+
+# --- Clients ---
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+
+def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """The shared OpenAI client for an API key (default: OPENAI_API_KEY) and base URL."""
+    api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY", "")
+    with _clients_lock:
+        client = _clients.get((api_key, base_url))
+        if client is None:
+            from openai import OpenAI
+            client = _clients[(api_key, base_url)] = OpenAI(api_key=api_key, base_url=base_url)
+        return client
+
+def get_async_client(client=None):
+    """A new AsyncOpenAI client for the running event loop, configured like the sync `client` (default: get_client()).
+
+    Key, organization, project, endpoint, timeout, default headers and query parameters are copied
+    (the fields OpenAI.copy carries over). SDK retries stay off: fanout.py retries each request itself,
+    with backoff, and SDK retries on top would multiply the attempts.
+    """
+    from openai import AsyncOpenAI
+    client = client if client is not None else get_client()
+    return AsyncOpenAI(api_key=client.api_key, organization=client.organization, project=client.project,
+                       base_url=client.base_url, websocket_base_url=client.websocket_base_url, timeout=client.timeout,
+                       max_retries=0, default_headers=client._custom_headers, default_query=client._custom_query)
+
+
+# --- Startup Benchmark ---
+
+_IMPORT_PROBE = """
+import sys, time
+began = time.perf_counter()
+import pipeline, jobs, translations
+from report import summary_filename
+elapsed = time.perf_counter() - began
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def measure_cold_start(runs: int = 5) -> Dict[str, Any]:
+    """Median time for a fresh interpreter to import the modules app.py loads, and which heavy modules came along."""
+    timings, loaded = [], ""
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE.format(heavy=HEAVY_MODULES)], cwd=BASE_DIR,
+                             capture_output=True, text=True, check=True).stdout.split()
+        timings.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    return {"seconds": statistics.median(timings), "heavy_modules": [m for m in loaded.split(",") if m]}
+
+def measure_reruns(runs: int = 20) -> Dict:
+    """First-run and median rerun time (ms) of app.py under Streamlit's AppTest, toggling the language.
+
+    AppTest catches exceptions raised by the script into app.exception instead of raising them, so
+    each run is checked: a failing first run raises RuntimeError, failing reruns are counted in
+    'failed' (with their messages in 'errors') and left out of the median.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("NAVIGATOR_JOB_WORKERS", "0")
+    app = AppTest.from_file(os.path.join(BASE_DIR, "app.py"), default_timeout=60)
+    began = time.perf_counter()
+    app.run()
+    first_ms = (time.perf_counter() - began) * 1000
+    if app.exception:
+        raise RuntimeError(f"app.py failed on its first run: {app.exception[0].message}")
+    timings, errors = [], []
+    for i in range(runs):
+        began = time.perf_counter()
+        app.radio(key="lang_selector").set_value("ar" if i % 2 == 0 else "en").run()
+        elapsed_ms = (time.perf_counter() - began) * 1000
+        if app.exception:
+            errors.append(app.exception[0].message)
+        else:
+            timings.append(elapsed_ms)
+    return {"first_ms": first_ms, "median_ms": statistics.median(timings) if timings else float("inf"),
+            "failed": len(errors), "errors": errors}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold start and rerun latency of the app against the startup budget.")
+    parser.add_argument("--benchmark", action="store_true", help="Run the startup benchmark")
+    parser.add_argument("--runs", type=int, default=20, help="Reruns to time")
+    args = parser.parse_args(argv)
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+    logging.basicConfig(level=logging.WARNING)
+
+    cold = measure_cold_start()
+    try:
+        reruns = measure_reruns(args.runs)
+    except RuntimeError as e:
+        print(f"error: {e}")
+        return 1
+    print(f"cold start: {cold['seconds']:.3f}s (budget {COLD_START_BUDGET_SECONDS}s), "
+          f"heavy modules loaded: {', '.join(cold['heavy_modules']) or 'none'}")
+    print(f"first run: {reruns['first_ms']:.0f} ms, rerun: median {reruns['median_ms']:.1f} ms (budget {RERUN_BUDGET_MS:.0f} ms)")
+    for message in dict.fromkeys(reruns["errors"]):
+        print(f"error: rerun failed: {message}")
+    if reruns["failed"]:
+        print(f"{reruns['failed']} of {args.runs} reruns failed and were not timed")
+    within = cold["seconds"] <= COLD_START_BUDGET_SECONDS and reruns["median_ms"] <= RERUN_BUDGET_MS and not reruns["failed"]
+    print("within budget" if within else "FAILED" if reruns["failed"] else "OVER BUDGET")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
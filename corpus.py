@@ -0,0 +1,127 @@
+"""
+Regulatory Navigator - Synthetic Application Corpus
+Builds synthetic application PDFs (business plan, compliance policy, legal structure) for benchmarks
+and load tests, in the folder layout batch.py reads.
+
+Pages are filled with deterministic filler text in English, Arabic or both, laid out with PyMuPDF's
+HTML engine so Arabic is shaped right-to-left. Requirement titles are placed as quotes on spread-out
+pages of their input_category document. mock_llm quotes those titles back for gaps, so annotate_pdf
+has real quotes to locate. The business plan also states a paid-up capital and a large transaction
+amount, so the rules in rules.json fire as they would on a real application. Like real filings, every
+page has a running header and a page-number footer, and every document ends with the same
+confidentiality notice (what normalize.py strips).
+
+Usage:
+    python corpus.py corpus/ --applications 20 --pages 12 --quotes 8 --lang mixed
+    python batch.py corpus/ --out results/
+"""
+
+import argparse
+import html
+import logging
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+
+import pipeline
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("en", "ar", "mixed")
+PARAGRAPHS_PER_PAGE = 6
+WORDS_PER_PARAGRAPH = 55
+_MARGIN = 54
+_CSS = "p { font-family: sans-serif; font-size: 10pt; line-height: 1.35; margin: 0 0 8pt 0; } h1 { font-size: 14pt; }"
+_ENGLISH_WORDS = (
+    "the", "company", "customer", "policy", "risk", "controls", "board", "reporting", "payments", "platform", "review",
+    "procedures", "management", "regulatory", "annual", "monitoring", "data", "services", "approval", "operations",
+    "and", "of", "to", "for", "with", "under", "each", "quarterly", "framework", "license", "capital", "audit",
+)
+_ARABIC_WORDS = (
+    "الشركة", "العملاء", "السياسة", "المخاطر", "الضوابط", "مجلس", "الإدارة", "التقارير", "المدفوعات", "المنصة",
+    "المراجعة", "الإجراءات", "التنظيمية", "السنوية", "الرقابة", "البيانات", "الخدمات", "الموافقة", "العمليات",
+    "و", "من", "إلى", "على", "في", "كل", "إطار", "الترخيص", "رأس", "المال", "التدقيق", "الامتثال",
+)
+_NOTICE = ("This document is confidential and is submitted to the Qatar Central Bank solely for the purpose of the "
+           "licensing application. It may not be copied, distributed or disclosed to any third party without prior written consent.")
+# Statements the rules in rules.json look for.
+_RULE_TRIGGERS = ("Paid-Up Capital: QAR 5,000,000", "Single customer transfers of up to QAR 45,000 are processed same day.")
+
+
+def _paragraph(rng: random.Random, lang: str) -> str:
+    words = _ARABIC_WORDS if lang == "ar" else _ENGLISH_WORDS
+    text = " ".join(rng.choice(words) for _ in range(WORDS_PER_PARAGRAPH))
+    attributes = ' dir="rtl"' if lang == "ar" else ""
+    return f"<p{attributes}>{html.escape(text.capitalize())}.</p>"
+
+def _quotes(category: str, count: int) -> List[str]:
+    titles = [req["requirement"] for req in pipeline.QCB_REQUIREMENTS if req.get("input_category") == category]
+    return [titles[i % len(titles)] for i in range(count)] if titles else []
+
+def make_document(category: str, pages: int = 5, quotes: int = 8, lang: str = "en", seed: int = 0) -> bytes:
+    """One synthetic PDF of `pages` pages with `quotes` requirement titles of its category placed on spread-out pages."""
+    import fitz  # PyMuPDF
+
+    if lang not in LANGUAGES:
+        raise ValueError(f"Unknown corpus language '{lang}', expected one of {', '.join(LANGUAGES)}")
+    rng = random.Random(f"{seed}:{category}")
+    placed: Dict[int, List[str]] = {}
+    for index, quote in enumerate(_quotes(category, quotes)):
+        placed.setdefault(index * pages // max(quotes, 1), []).append(quote)
+    if category == "business_plan":
+        placed.setdefault(0, []).extend(_RULE_TRIGGERS)
+
+    doc = fitz.open()
+    for number in range(pages):
+        parts = [f"<h1>{html.escape(category.replace('_', ' ').title())}, page {number + 1}</h1>"] if number == 0 else []
+        for index in range(PARAGRAPHS_PER_PAGE):
+            paragraph_lang = lang if lang != "mixed" else ("ar" if index % 2 else "en")
+            parts.append(_paragraph(rng, paragraph_lang))
+            if index == 1:
+                parts.extend(f"<p>{html.escape(quote)}.</p>" for quote in placed.get(number, []))
+        if number == pages - 1:
+            parts.append(f"<p>{html.escape(_NOTICE)}</p>")
+        page = doc.new_page(width=pipeline.A4[0], height=pipeline.A4[1])
+        page.insert_text((_MARGIN, _MARGIN / 2), f"Al-Ameen Digital LLC | {category.replace('_', ' ').title()} | Confidential", fontsize=8)
+        page.insert_text((_MARGIN, pipeline.A4[1] - _MARGIN / 2), f"Page {number + 1} of {pages}", fontsize=8)
+        page.insert_htmlbox(page.rect + (_MARGIN, _MARGIN, -_MARGIN, -_MARGIN), "".join(parts), css=_CSS)
+    doc.subset_fonts()
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+def make_application(pages: int = 5, quotes: int = 8, lang: str = "en", seed: int = 0) -> Dict[str, bytes]:
+    """The three PDFs of one synthetic application, keyed by DOCUMENT_CATEGORIES."""
+    return {cat: make_document(cat, pages, quotes, lang, seed) for cat in pipeline.DOCUMENT_CATEGORIES}
+
+def write_corpus(directory: str, applications: int, pages: int = 5, quotes: int = 8, lang: str = "en", seed: int = 0) -> List[str]:
+    """Writes application folders app0000, app0001, ... in the layout batch.py reads; returns their paths."""
+    paths = []
+    for index in range(applications):
+        app_dir = os.path.join(directory, f"app{index:04d}")
+        os.makedirs(app_dir, exist_ok=True)
+        for cat, data in make_application(pages, quotes, lang, seed + index).items():
+            with open(os.path.join(app_dir, f"{cat}.pdf"), "wb") as f:
+                f.write(data)
+        paths.append(app_dir)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of application PDFs.")
+    parser.add_argument("out", help="Directory to write application folders to")
+    parser.add_argument("--applications", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5, help="Pages per document")
+    parser.add_argument("--quotes", type=int, default=8, help="Requirement quotes placed per document")
+    parser.add_argument("--lang", choices=LANGUAGES, default="en")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    paths = write_corpus(args.out, args.applications, args.pages, args.quotes, args.lang, args.seed)
+    logger.info(f"Wrote {len(paths)} applications to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
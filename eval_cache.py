@@ -0,0 +1,71 @@
+"""
+Regulatory Navigator - AI Evaluation Cache
+Persistent, content-addressed cache for LLM evaluation results.
+
+An entry is keyed on a SHA-256 over the extracted document texts, the requirements data, the prompt
+template and the model name, so any change to one of them (e.g. editing requirements.json) yields a
+new key instead of a stale hit. Entries are JSON files in a spool directory (see spool.py), expired
+after a TTL and evicted least-recently-used once the entry or byte budget is exceeded.
+
+Environment:
+    NAVIGATOR_CACHE_DIR   cache directory (default: .cache/evaluations next to this file)
+    NAVIGATOR_CACHE       set to "off" to bypass the cache entirely
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import spool
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "evaluations")
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class EvaluationCache(spool.SpoolStore):
+    """On-disk cache of evaluation results with TTL and LRU (entry count / total size) eviction."""
+
+    SUFFIX = ".json"
+    DESCRIPTION = "evaluation cache entry"
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        super().__init__(directory, max_entries, max_bytes, ttl_seconds)
+
+    @staticmethod
+    def key(documents: Dict[str, str], requirements: List[Dict], prompt_template: str, model: str) -> str:
+        """Content hash of everything that determines the evaluation result."""
+        return spool.content_key(
+            json.dumps(documents, sort_keys=True, ensure_ascii=False),
+            json.dumps(requirements, sort_keys=True, ensure_ascii=False),
+            prompt_template,
+            model,
+        )
+
+    def _encode(self, result: Dict) -> bytes:
+        return json.dumps({"created": time.time(), "result": result}, ensure_ascii=False).encode("utf-8")
+
+    def _decode(self, data: bytes) -> Optional[Dict]:
+        # A hit keeps an entry from being evicted, but the TTL still counts from when it was stored.
+        entry = json.loads(data)
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            return None
+        return entry["result"]
+
+
+_cache: Optional[EvaluationCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[EvaluationCache]:
+    """Returns the process-wide cache, or None when disabled via NAVIGATOR_CACHE=off."""
+    global _cache
+    if os.environ.get("NAVIGATOR_CACHE", "").lower() in ("off", "0", "false"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EvaluationCache(os.environ.get("NAVIGATOR_CACHE_DIR", DEFAULT_CACHE_DIR))
+        return _cache
@@ -0,0 +1,220 @@
+"""
+Regulatory Navigator - Concurrent Fan-Out Evaluation
+Splits the AI evaluation into smaller asyncio requests, one per document category (optionally
+further split into requirement batches). Each request carries only its requirements and the one
+document they are judged on. Requests run under a concurrency limit with per-request retry and
+exponential backoff; partial results are merged into the usual
+{"requirements": [...], "recommendations": [...]} shape, so one malformed reply costs one group,
+not the whole evaluation.
+
+Compare against the single-prompt path on a local mock server (no network needed):
+    python fanout.py business_plan.pdf compliance_policy.pdf legal_structure.pdf --mock --latency 0.5
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI, OpenAI
+
+import budget
+import eval_cache
+import pipeline
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+DOCUMENT_NAMES = {
+    "business_plan": ("Business Plan", "BUSINESS_PLAN"),
+    "compliance_policy": ("Compliance Policy", "COMPLIANCE_POLICY"),
+    "legal_structure": ("Legal Structure document", "LEGAL_STRUCTURE"),
+}
+
+
+def group_requirements(requirements: List[Dict], batch_size: Optional[int] = None) -> List[Tuple[str, List[Dict]]]:
+    """Groups requirements by input_category, optionally splitting each group into batches of batch_size."""
+    by_category: Dict[str, List[Dict]] = {}
+    for req in requirements:
+        by_category.setdefault(req.get("input_category", "business_plan"), []).append(req)
+    groups = []
+    for category, reqs in by_category.items():
+        size = batch_size or len(reqs)
+        groups.extend((category, reqs[i:i + size]) for i in range(0, len(reqs), size))
+    return groups
+
+def build_group_prompt(document_category: str, requirements: List[Dict], document_text: str, document_name: Optional[str] = None) -> str:
+    """The group's prompt, with the document cut down to the prompt budget if needed (see budget.fit)."""
+    default_name, document_tag = DOCUMENT_NAMES[document_category]
+    document_name = document_name or default_name
+    fields = dict(document_name=document_name, document_tag=document_tag, requirements=pipeline.format_requirements(requirements))
+    document_text = budget.fit(pipeline.CATEGORY_PROMPT_TEMPLATE.format(document="", **fields), {document_category: document_text})[document_category]
+    return pipeline.CATEGORY_PROMPT_TEMPLATE.format(document=document_text, **fields)
+
+
+async def _complete(client, prompt: str) -> str:
+    kwargs = dict(
+        model=pipeline.EVALUATION_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a regulatory compliance expert. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1,
+    )
+    if isinstance(client, AsyncOpenAI) or asyncio.iscoroutinefunction(client.chat.completions.create):
+        response = await client.chat.completions.create(**kwargs)
+    else:
+        # Synchronous stand-ins (tests, benchmarks) run on a worker thread.
+        response = await asyncio.to_thread(client.chat.completions.create, **kwargs)
+    tracing.record_usage(getattr(response, "usage", None))
+    return response.choices[0].message.content
+
+async def _evaluate_group(client, semaphore: asyncio.Semaphore, document_category: str, requirements: List[Dict],
+                          document_text: str, max_retries: int, backoff: float, cache, prompt: Optional[str] = None) -> Optional[Dict]:
+    """One group's reply, from the cache or the model (retried with backoff); None when every attempt failed.
+    `prompt` overrides the group prompt built from document_text.
+
+    The cache is keyed on the prompt as sent, so it follows the prompt budget and the document name.
+    """
+    prompt = prompt or build_group_prompt(document_category, requirements, document_text)
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key({document_category: prompt}, requirements, pipeline.CATEGORY_PROMPT_TEMPLATE, pipeline.EVALUATION_MODEL)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            tracing.current().add("cache_hits")
+            return cached
+
+    expected_ids = {req["id"] for req in requirements}
+    for attempt in range(max_retries + 1):
+        try:
+            async with semaphore:
+                with tracing.span("llm", document=document_category, requirements=len(requirements), attempt=attempt, prompt_chars=len(prompt)):
+                    result = pipeline.parse_evaluation_reply(await _complete(client, prompt))
+            returned_ids = {req.get("id") for req in result.get("requirements", [])}
+            if not expected_ids & returned_ids:
+                raise ValueError("reply contains none of the requested requirements")
+            if cache is not None:
+                cache.put(cache_key, result)
+            return result
+        except Exception as e:
+            if attempt == max_retries:
+                logger.error(f"Error during AI evaluation of {document_category} ({len(requirements)} requirements): {e}")
+                return None
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            logger.warning(f"Retrying {document_category} evaluation in {delay:.1f}s after error: {e}")
+            await asyncio.sleep(delay)
+
+def merge_results(groups: List[Tuple[str, List[Dict]]], results: List[Optional[Dict]]) -> Dict:
+    """Merges per-group replies, keeping only requested ids and filling catalog fields the model left out."""
+    requirements, recommendations = [], []
+    for (document_category, group), result in zip(groups, results):
+        if not result: continue
+        catalog = {req["id"]: req for req in group}
+        for found in result.get("requirements", []):
+            source = catalog.pop(found.get("id"), None)
+            if source is None: continue  # unrequested or duplicate id
+            found.setdefault("category", source.get("category"))
+            found.setdefault("requirement", source.get("requirement"))
+            if not found.get("found_in_document"): found["found_in_document"] = document_category
+            requirements.append(found)
+        for recommendation in result.get("recommendations", []):
+            if recommendation not in recommendations:
+                recommendations.append(recommendation)
+    return {"requirements": requirements, "recommendations": recommendations}
+
+
+def async_client(client) -> Tuple[object, bool]:
+    """The client to use on the running loop, and whether it was created here (and must be closed)."""
+    if client is None:
+        return pipeline.get_async_client(), True
+    if isinstance(client, OpenAI):
+        # Same configuration, but with an async transport bound to this loop.
+        return pipeline.get_async_client(client), True
+    return client, False
+
+async def aevaluate_fanout(texts: Dict[str, str], requirements: Optional[List[Dict]] = None, client=None,
+                           concurrency: int = DEFAULT_CONCURRENCY, batch_size: Optional[int] = None,
+                           max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF_SECONDS,
+                           use_cache: bool = True, on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Evaluates `requirements` (default: all) with one concurrent request per category group.
+
+    `on_requirement` receives each group's requirements as soon as that group's reply is in.
+    """
+    requirements = pipeline.QCB_REQUIREMENTS if requirements is None else requirements
+    groups = group_requirements(requirements, batch_size)
+    cache = eval_cache.get_cache() if use_cache else None
+
+    client, owns_client = async_client(client)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate(category: str, group: List[Dict]) -> Optional[Dict]:
+        result = await _evaluate_group(client, semaphore, category, group, texts.get(category, ""), max_retries, backoff, cache)
+        if on_requirement is not None:
+            for found in merge_results([(category, group)], [result])["requirements"]:
+                on_requirement(found)
+        return result
+
+    try:
+        results = await asyncio.gather(*(evaluate(category, group) for category, group in groups))
+    finally:
+        if owns_client:
+            await client.close()
+    return merge_results(groups, results)
+
+def evaluate_fanout(texts: Dict[str, str], requirements: Optional[List[Dict]] = None, client=None, **kwargs) -> Dict:
+    """Synchronous entry point for aevaluate_fanout; must not be called from a running event loop."""
+    return asyncio.run(aevaluate_fanout(texts, requirements, client=client, **kwargs))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time single-prompt vs fan-out evaluation of one application.")
+    parser.add_argument("business_plan")
+    parser.add_argument("compliance_policy")
+    parser.add_argument("legal_structure")
+    parser.add_argument("--mock", action="store_true", help="Run against a local mock OpenAI-compatible server")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock: seconds of latency per requirement in a reply")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=None, help="Split category groups into batches of this size")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    server = None
+    if args.mock:
+        import mock_llm
+        server, base_url = mock_llm.start_server(per_requirement_latency=args.latency)
+        client = OpenAI(api_key="mock", base_url=base_url)
+    else:
+        client = pipeline.get_client()
+
+    pdf_bytes = {}
+    for cat in pipeline.DOCUMENT_CATEGORIES:
+        with open(getattr(args, cat), "rb") as f:
+            pdf_bytes[cat] = f.read()
+    texts = {cat: "".join(pages) for cat, pages in pipeline.extract_documents(pdf_bytes).items()}
+
+    began = time.monotonic()
+    single = pipeline.evaluate_compliance_with_ai(texts["business_plan"], texts["compliance_policy"], texts["legal_structure"], client=client, use_cache=False)
+    single_seconds = time.monotonic() - began
+
+    began = time.monotonic()
+    fanned = evaluate_fanout(texts, client=client, concurrency=args.concurrency, batch_size=args.batch_size, use_cache=False)
+    fanout_seconds = time.monotonic() - began
+
+    print(f"single prompt: {single_seconds:6.2f}s  {len(single.get('requirements', []))} requirements")
+    print(f"fan-out:       {fanout_seconds:6.2f}s  {len(fanned['requirements'])} requirements "
+          f"({len(group_requirements(pipeline.QCB_REQUIREMENTS, args.batch_size))} requests, concurrency {args.concurrency})")
+    if server is not None:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Regulatory Navigator - Incremental Re-Evaluation
+Re-evaluates a resubmitted application by reusing its previous evaluation.
+
+Each submission (identified by a caller-chosen reference) keeps a record of its last run: document
+and page hashes, the extracted pages and the finalized evaluation. On resubmission, changed
+documents are detected by hash and the changed pages are located. Only requirements whose
+input_category or previous found_in_document touches a changed document go back to the AI. The
+merged result is re-checked and re-scored, also when nothing changed, so edits to rules.json,
+remediation.json and scoring.json apply. use_cache=False re-evaluates everything. Reports come from
+the artifact store, which is keyed on document and findings, so only reports whose document or
+findings changed are rendered again.
+
+Usage:
+    python incremental.py APP-2025-001 business_plan.pdf compliance_policy.pdf legal_structure.pdf --out results/
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import artifacts
+import pipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBMISSIONS_DIR = os.path.join(pipeline.BASE_DIR, ".cache", "submissions")
+RECORD_FILENAME = "record.json"
+# Fields attached by finalize_evaluation; they are recomputed on every run.
+_DERIVED_FIELDS = ("suggestion", "resources")
+
+
+def _hash(data) -> str:
+    return hashlib.sha256(data if isinstance(data, bytes) else data.encode("utf-8")).hexdigest()
+
+def _submission_dir(submission_id: str, root: Optional[str] = None) -> str:
+    root = root or os.environ.get("NAVIGATOR_SUBMISSIONS_DIR", DEFAULT_SUBMISSIONS_DIR)
+    return os.path.join(root, re.sub(r"[^\w.-]", "_", submission_id))
+
+def load_record(submission_id: str, root: Optional[str] = None) -> Optional[Dict]:
+    try:
+        with open(os.path.join(_submission_dir(submission_id, root), RECORD_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save(submission_id: str, record: Dict, root: Optional[str] = None) -> None:
+    directory = _submission_dir(submission_id, root)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(directory, RECORD_FILENAME))
+
+
+def changed_pages(old_hashes: List[str], new_hashes: List[str]) -> List[int]:
+    """1-based numbers of pages in the new document that were added or modified."""
+    matcher = difflib.SequenceMatcher(a=old_hashes, b=new_hashes, autojunk=False)
+    return [j + 1 for tag, _, _, j1, j2 in matcher.get_opcodes() if tag in ("replace", "insert") for j in range(j1, j2)]
+
+def affected_requirements(changed_documents: List[str], previous_requirements: List[Dict]) -> List[Dict]:
+    """Catalog requirements that must be re-evaluated when the given documents changed."""
+    previous_location = {req.get("id"): req.get("found_in_document") for req in previous_requirements}
+    return [
+        req for req in pipeline.QCB_REQUIREMENTS
+        if req.get("input_category") in changed_documents
+        or previous_location.get(req["id"]) in changed_documents
+        or req["id"] not in previous_location
+    ]
+
+def _report_keys(record: Dict) -> Dict[str, str]:
+    """Artifact store key of each report of a recorded run."""
+    documents, evaluation_result = record["documents"], record["evaluation"]
+    return {report: artifacts.ArtifactStore.key(report, documents[report]["hash"] if report in documents else "", evaluation_result)
+            for report in pipeline.OUTPUT_FILENAMES}
+
+def _record(pdf_bytes: Dict[str, bytes], pages: Dict[str, List[str]], evaluation_result: Dict) -> Dict:
+    return {
+        "documents": {
+            cat: {"hash": _hash(pdf_bytes[cat]), "page_hashes": [_hash(p) for p in pages[cat]], "pages": pages[cat]}
+            for cat in pipeline.DOCUMENT_CATEGORIES
+        },
+        "evaluation": evaluation_result,
+    }
+
+def _results(evaluation_result: Dict, pdf_bytes: Dict[str, bytes], changes: Dict, render: bool) -> Dict:
+    results = {
+        'score': evaluation_result["overall_score"], 'requirements': evaluation_result["requirements"],
+        'recommendations': evaluation_result.get("recommendations", []), 'changes': changes,
+    }
+    if render:
+        results['reports'] = {report: artifacts.get_report(report, pdf_bytes.get(report), evaluation_result) for report in pipeline.OUTPUT_FILENAMES}
+    return results
+
+def run_incremental(submission_id: str, pdf_bytes: Dict[str, bytes], client=None, progress: Optional[Callable[[str], None]] = None,
+                    use_cache: bool = True, strategy: Optional[str] = None, root: Optional[str] = None,
+                    on_requirement: Optional[Callable[[Dict], None]] = None, render: bool = True) -> Dict:
+    """Evaluates a submission, reusing its previous run where documents are unchanged.
+
+    `on_requirement` receives the re-evaluated requirements as they stream in (see pipeline.evaluate_documents).
+    With render=False the result has no 'reports' (see pipeline.run_application).
+    Returns the run_application result plus a "changes" entry:
+    {"documents": [changed categories], "pages": {category: [changed page numbers]},
+     "reevaluated": [requirement ids], "rendered": [report keys whose content changed]}.
+    """
+    progress = progress or (lambda stage: None)
+    previous = load_record(submission_id, root)
+    progress("reading_pdfs")
+    changed_documents = [cat for cat in pipeline.DOCUMENT_CATEGORIES
+                         if previous is None or _hash(pdf_bytes[cat]) != previous["documents"][cat]["hash"]]
+    if previous is None or not use_cache:
+        # A first run, or one that bypasses the cache: every requirement goes back to the AI.
+        pages = pipeline.extract_documents(pdf_bytes)
+        progress("ai_analyzing")
+        evaluation_result = pipeline.evaluate_documents(pages, client=client, use_cache=use_cache, strategy=strategy,
+                                                        on_requirement=on_requirement)
+        affected_ids = {req["id"] for req in pipeline.QCB_REQUIREMENTS}
+    else:
+        # Only the changed documents are re-extracted; unchanged pages come from the record.
+        pages = {cat: previous["documents"][cat]["pages"] for cat in pipeline.DOCUMENT_CATEGORIES}
+        pages.update(pipeline.extract_documents({cat: pdf_bytes[cat] for cat in changed_documents}))
+        previous_evaluation = previous["evaluation"]
+        affected = affected_requirements(changed_documents, previous_evaluation["requirements"]) if changed_documents else []
+        affected_ids = {req["id"] for req in affected}
+        kept = [
+            {k: v for k, v in req.items() if k not in _DERIVED_FIELDS}
+            for req in previous_evaluation["requirements"] if req.get("id") not in affected_ids
+        ]
+        evaluation_result = {"requirements": kept, "recommendations": previous_evaluation.get("recommendations", [])}
+        if affected:
+            progress("ai_analyzing")
+            fresh = pipeline.evaluate_documents(pages, client=client, use_cache=use_cache, strategy=strategy, requirements=affected,
+                                                on_requirement=on_requirement)
+            evaluation_result["requirements"] += fresh["requirements"]
+            evaluation_result["recommendations"] = fresh.get("recommendations") or evaluation_result["recommendations"]
+    # Even with nothing re-evaluated, checks, remediation and scores follow the current rules.json,
+    # remediation.json and scoring.json.
+    evaluation_result = pipeline.finalize_evaluation(evaluation_result, pages, progress=progress)
+
+    record = _record(pdf_bytes, pages, evaluation_result)
+    _save(submission_id, record, root)
+    keys = _report_keys(record)
+    previous_keys = _report_keys(previous) if previous is not None else {}
+    page_changes = {cat: changed_pages(previous["documents"][cat]["page_hashes"], record["documents"][cat]["page_hashes"])
+                    for cat in changed_documents} if previous is not None else {}
+    changes = {"documents": changed_documents, "pages": page_changes, "reevaluated": sorted(affected_ids),
+               "rendered": [report for report in pipeline.OUTPUT_FILENAMES if keys[report] != previous_keys.get(report)]}
+    if render: progress("generating_reports")
+    return _results(evaluation_result, pdf_bytes, changes, render)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate a (re)submitted application, re-using its previous evaluation.")
+    parser.add_argument("submission_id", help="Stable reference of the application, e.g. its QCB application number")
+    parser.add_argument("business_plan")
+    parser.add_argument("compliance_policy")
+    parser.add_argument("legal_structure")
+    parser.add_argument("--out", default=".", help="Directory to write the four PDFs to")
+    parser.add_argument("--strategy", choices=pipeline.EVALUATION_STRATEGIES, default=None)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    pdf_bytes = {}
+    for cat in pipeline.DOCUMENT_CATEGORIES:
+        with open(getattr(args, cat), "rb") as f:
+            pdf_bytes[cat] = f.read()
+    results = run_incremental(args.submission_id, pdf_bytes, strategy=args.strategy)
+
+    os.makedirs(args.out, exist_ok=True)
+    for key, data in results["reports"].items():
+        with open(os.path.join(args.out, pipeline.OUTPUT_FILENAMES[key]), "wb") as f:
+            f.write(data)
+    changes = results["changes"]
+    logger.info(f"Score {results['score']}% | changed documents: {', '.join(changes['documents']) or 'none'} | "
+                f"re-evaluated {len(changes['reevaluated'])} requirements | re-rendered: {', '.join(changes['rendered']) or 'nothing'}")
+    for cat, numbers in changes["pages"].items():
+        logger.info(f"  {cat}: changed pages {numbers}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+"""
+Regulatory Navigator - Background Evaluation Jobs
+Durable job queue so evaluations run outside the Streamlit script thread and outlive a page refresh.
+
+A submission becomes a job: its PDFs are written under the jobs directory and a row is added to a
+SQLite database (WAL mode, so several processes can share it). A pool of worker threads claims
+queued jobs and runs them through the pipeline. Each stage message ("reading_pdfs",
+"ai_analyzing", ...), each streamed finding and each pipeline error is appended to the job's event
+log, and while tracing is on (see tracing.py) so is the job's trace. The results are written next to the inputs; reports are not rendered by the worker, but on
+first request through the artifact store (see artifacts.py). Clients poll a job by id and read its
+events after the last one they have seen, so a reconnecting page replays the log from the start.
+
+Workers send heartbeats for the jobs they are running. A job whose worker stops sending them, for
+example because the process crashed or its outcome could not be stored, is put back in the queue; after MAX_ATTEMPTS it is marked failed.
+A finished or failed job can be replayed, which runs it again from its stored inputs.
+
+Environment:
+    NAVIGATOR_JOBS_DIR      jobs directory (default: .cache/jobs next to this file)
+    NAVIGATOR_JOB_WORKERS   worker threads started by the app (default: 2; 0 to rely on `python jobs.py work`)
+
+Usage:
+    python jobs.py submit business_plan.pdf compliance_policy.pdf legal_structure.pdf [--ref APP-2025-001]
+    python jobs.py work --workers 4
+    python jobs.py status JOB_ID
+    python jobs.py replay JOB_ID
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import artifacts
+import incremental
+import pipeline
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_DIR = os.path.join(pipeline.BASE_DIR, ".cache", "jobs")
+DEFAULT_WORKERS = 2
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 0.5
+HEARTBEAT_SECONDS = 5.0
+# A running job whose heartbeat is older than this is presumed orphaned by a dead worker.
+STALE_SECONDS = 60.0
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    options TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    heartbeat REAL,
+    owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    stage TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+"""
+
+RESULT_FILENAME = "result.json"
+
+
+class JobQueue:
+    """SQLite-backed job store. Every call uses its own connection, so one instance can be shared by threads."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.environ.get("NAVIGATOR_JOBS_DIR", DEFAULT_JOBS_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.db_path = os.path.join(self.directory, "jobs.db")
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    # --- Submission & Queries ---
+
+    def submit(self, pdf_bytes: Dict[str, bytes], submission_ref: Optional[str] = None, use_cache: bool = True,
+               strategy: Optional[str] = None) -> str:
+        """Stores the PDFs and queues a job for them; returns the job id."""
+        job_id = uuid.uuid4().hex
+        inputs = os.path.join(self.job_dir(job_id), "inputs")
+        os.makedirs(inputs)
+        for cat in pipeline.DOCUMENT_CATEGORIES:
+            with open(os.path.join(inputs, f"{cat}.pdf"), "wb") as f:
+                f.write(pdf_bytes[cat])
+        options = {"submission_ref": submission_ref or None, "use_cache": use_cache, "strategy": strategy}
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT INTO jobs (id, status, options, created, updated) VALUES (?, ?, ?, ?, ?)",
+                       (job_id, QUEUED, json.dumps(options), now, now))
+        self.add_event(job_id, "queued")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def recent(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        query, params = "SELECT id, status, stage, created, updated, attempts, error FROM jobs", ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(query + " ORDER BY created DESC LIMIT ?", params + (limit,))]
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict]:
+        """The job's events with seq > after, oldest first: {"seq", "kind", "payload", "created"}."""
+        with self._connect() as db:
+            rows = db.execute("SELECT seq, kind, payload, created FROM events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                              (job_id, after)).fetchall()
+        return [{"seq": row["seq"], "kind": row["kind"], "created": row["created"],
+                 "payload": json.loads(row["payload"]) if row["payload"] is not None else None} for row in rows]
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """The results of a finished job, as run_application(render=False) returns them; None until it is done."""
+        try:
+            with open(os.path.join(self.job_dir(job_id), RESULT_FILENAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def report(self, job_id: str, report: str, lang: str = "en") -> bytes:
+        """One report of a finished job (a document category or SUMMARY_REPORT), rendered on first request.
+
+        `lang` selects the language of the summary.
+        """
+        results = self.result(job_id)
+        if results is None:
+            raise KeyError(f"Job {job_id} has no results")
+        evaluation_result = {"overall_score": results["score"], "requirements": results["requirements"],
+                             "recommendations": results.get("recommendations", [])}
+        pdf_bytes = None
+        if report != pipeline.SUMMARY_REPORT:
+            with open(os.path.join(self.job_dir(job_id), "inputs", f"{report}.pdf"), "rb") as f:
+                pdf_bytes = f.read()
+        return artifacts.get_report(report, pdf_bytes, evaluation_result, lang=lang)
+
+    # --- Worker Side ---
+
+    def add_event(self, job_id: str, kind: str, payload=None) -> None:
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT INTO events (job_id, created, kind, payload) VALUES (?, ?, ?, ?)",
+                       (job_id, now, kind, json.dumps(payload, ensure_ascii=False) if payload is not None else None))
+            if kind == "stage":
+                db.execute("UPDATE jobs SET stage = ?, updated = ?, heartbeat = ? WHERE id = ?", (payload, now, now, job_id))
+
+    def claim(self, owner: str) -> Optional[Dict]:
+        """Atomically takes the oldest queued job for `owner`; None if the queue is empty."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, updated = ?, attempts = attempts + 1 WHERE id = ?",
+                               (RUNNING, owner, now, now, row["id"]))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def heartbeat(self, owner: str, job_ids: List[str]) -> None:
+        """Marks the given running jobs of `owner` as alive; its other running jobs go stale and are recovered."""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status = ? AND id IN ({','.join('?' * len(job_ids))})",
+                       (now, owner, RUNNING, *job_ids))
+
+    def load_inputs(self, job_id: str) -> Dict[str, bytes]:
+        pdf_bytes = {}
+        for cat in pipeline.DOCUMENT_CATEGORIES:
+            with open(os.path.join(self.job_dir(job_id), "inputs", f"{cat}.pdf"), "rb") as f:
+                pdf_bytes[cat] = f.read()
+        return pdf_bytes
+
+    def complete(self, job_id: str, results: Dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.job_dir(job_id), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in results.items() if k != "reports"}, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.job_dir(job_id), RESULT_FILENAME))
+        self._finish(job_id, DONE, None)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, FAILED, error)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]) -> None:
+        now = time.time()
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = ?, error = ?, owner = NULL, updated = ? WHERE id = ?", (status, error, now, job_id))
+        self.add_event(job_id, status, error)
+
+    # --- Recovery & Replay ---
+
+    def recover(self, stale_after: float = STALE_SECONDS) -> List[str]:
+        """Re-queues running jobs whose worker stopped sending heartbeats; returns their ids."""
+        cutoff = time.time() - stale_after
+        with self._connect() as db:
+            rows = db.execute("SELECT id, attempts FROM jobs WHERE status = ? AND heartbeat < ?", (RUNNING, cutoff)).fetchall()
+        recovered = []
+        for row in rows:
+            if row["attempts"] >= MAX_ATTEMPTS:
+                logger.warning(f"Job {row['id']} abandoned after {row['attempts']} attempts")
+                self.fail(row["id"], f"Worker stopped responding ({row['attempts']} attempts)")
+                continue
+            with self._connect() as db:
+                claimed = db.execute("UPDATE jobs SET status = ?, owner = NULL, updated = ? WHERE id = ? AND status = ? AND heartbeat < ?",
+                                     (QUEUED, time.time(), row["id"], RUNNING, cutoff)).rowcount
+            if claimed:
+                logger.warning(f"Re-queued job {row['id']} from a stalled worker")
+                self.add_event(row["id"], "queued", "recovered")
+                recovered.append(row["id"])
+        return recovered
+
+    def replay(self, job_id: str) -> bool:
+        """Runs a finished job again from its stored inputs. Its event log and results are reset."""
+        with self._connect() as db:
+            changed = db.execute("UPDATE jobs SET status = ?, owner = NULL, attempts = 0, stage = NULL, error = NULL, updated = ? "
+                                 "WHERE id = ? AND status IN (?, ?)", (QUEUED, time.time(), job_id) + FINISHED).rowcount
+            if changed:
+                db.execute("DELETE FROM events WHERE job_id = ?", (job_id,))
+        if not changed:
+            return False
+        try:
+            os.remove(os.path.join(self.job_dir(job_id), RESULT_FILENAME))
+        except OSError:
+            pass
+        self.add_event(job_id, "queued", "replay")
+        return True
+
+
+# --- Worker Pool ---
+
+# Loggers whose errors during a job are recorded in the job's event log.
+_JOB_LOGGERS = ("pipeline", "fanout", "mapreduce", "incremental")
+
+class _JobLogHandler(logging.Handler):
+    """Records pipeline errors raised while a worker thread runs a job as "error" events of that job."""
+
+    def __init__(self, queue: JobQueue, current: Dict[int, str]):
+        super().__init__(level=logging.ERROR)
+        self.queue, self.current = queue, current
+
+    def emit(self, record):
+        job_id = self.current.get(threading.get_ident())
+        if job_id is not None:
+            try:
+                self.queue.add_event(job_id, "error", record.getMessage())
+            except sqlite3.Error:
+                self.handleError(record)
+
+
+def run_job(queue: JobQueue, job: Dict, get_client: Callable = pipeline.get_client) -> None:
+    """Runs one claimed job through the pipeline and stores its outcome.
+
+    While tracing is on, the job's trace is also added as a "trace" event before it finishes.
+    """
+    job_id = job["id"]
+    with tracing.span("job", job_id=job_id, incremental=bool(job["options"].get("submission_ref"))) as stage:
+        results, error = _run_job(queue, job, get_client)
+    if tracing.enabled():
+        queue.add_event(job_id, "trace", stage.record())
+    if error is not None:
+        queue.fail(job_id, error)
+    else:
+        queue.complete(job_id, results)
+
+def _run_job(queue: JobQueue, job: Dict, get_client: Callable):
+    """(results, None) on success, (None, error message) on failure."""
+    job_id, options = job["id"], job["options"]
+    progress = lambda stage: queue.add_event(job_id, "stage", stage)
+    on_requirement = lambda req: queue.add_event(job_id, "requirement", req)
+    try:
+        client = get_client()
+        pdf_bytes = queue.load_inputs(job_id)
+        if options.get("submission_ref"):
+            results = incremental.run_incremental(options["submission_ref"], pdf_bytes, client=client, progress=progress,
+                                                  use_cache=options["use_cache"], strategy=options["strategy"], on_requirement=on_requirement,
+                                                  render=False)
+        else:
+            results = pipeline.run_application(pdf_bytes, client=client, progress=progress, use_cache=options["use_cache"],
+                                               strategy=options["strategy"], on_requirement=on_requirement, render=False)
+    except pipeline.PipelineError as e:
+        return None, str(e)
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        return None, f"Unexpected error: {e}"
+    return results, None
+
+
+class WorkerPool:
+    """Worker threads that process queued jobs, plus a heartbeat/recovery thread.
+
+    The LLM client is built by `client_factory` when the first job starts, so a missing API key
+    fails that job instead of the process that starts the pool.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = DEFAULT_WORKERS, client_factory: Optional[Callable] = None):
+        self.queue = queue
+        self.client_factory = client_factory or pipeline.get_client
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._current: Dict[int, str] = {}
+        self._log_handler = _JobLogHandler(queue, self._current)
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(workers)]
+        self._threads.append(threading.Thread(target=self._keepalive, name="job-heartbeat", daemon=True))
+
+    def start(self) -> "WorkerPool":
+        for name in _JOB_LOGGERS:
+            logging.getLogger(name).addHandler(self._log_handler)
+        self.queue.recover()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        for name in _JOB_LOGGERS:
+            logging.getLogger(name).removeHandler(self._log_handler)
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.owner)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(POLL_SECONDS)
+                continue
+            self._current[threading.get_ident()] = job["id"]
+            try:
+                run_job(self.queue, job, self._get_client)
+            except Exception:
+                # Storing the outcome failed (e.g. the database is locked or the disk full). The job gets no
+                # more heartbeats, so recover() queues it again once it is stale.
+                logger.exception(f"Worker could not finish job {job['id']}")
+            finally:
+                self._current.pop(threading.get_ident(), None)
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = self.client_factory()
+            return self._client
+
+    def _keepalive(self) -> None:
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            try:
+                self.queue.heartbeat(self.owner, list(self._current.values()))
+                self.queue.recover()
+            except sqlite3.Error as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+
+
+def start_workers(workers: Optional[int] = None, client_factory: Optional[Callable] = None, directory: Optional[str] = None) -> Optional[WorkerPool]:
+    """Starts a worker pool on the shared queue; returns None when configured with zero workers."""
+    workers = int(os.environ.get("NAVIGATOR_JOB_WORKERS", DEFAULT_WORKERS)) if workers is None else workers
+    if workers <= 0:
+        return None
+    return WorkerPool(JobQueue(directory), workers, client_factory).start()
+
+
+def wait_for(queue: JobQueue, job_id: str, on_event: Optional[Callable[[Dict], None]] = None, timeout: Optional[float] = None) -> Dict:
+    """Polls a job until it finishes, passing each event to on_event; returns the final job row."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    seen = 0
+    while True:
+        for event in queue.events(job_id, after=seen):
+            seen = event["seq"]
+            if on_event: on_event(event)
+        job = queue.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+        time.sleep(POLL_SECONDS)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Submit, run and inspect background evaluation jobs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="Queue an application")
+    for cat in pipeline.DOCUMENT_CATEGORIES:
+        submit.add_argument(cat)
+    submit.add_argument("--ref", default=None, help="Submission reference for incremental re-evaluation")
+    submit.add_argument("--strategy", choices=pipeline.EVALUATION_STRATEGIES, default=None)
+    submit.add_argument("--no-cache", action="store_true")
+    submit.add_argument("--wait", action="store_true", help="Follow the job's progress until it finishes")
+    work = commands.add_parser("work", help="Process queued jobs until interrupted")
+    work.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    status = commands.add_parser("status", help="Show a job, or the most recent jobs")
+    status.add_argument("job_id", nargs="?")
+    replay = commands.add_parser("replay", help="Run a finished or failed job again")
+    replay.add_argument("job_id")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    queue = JobQueue()
+
+    if args.command == "submit":
+        pdf_bytes = {}
+        for cat in pipeline.DOCUMENT_CATEGORIES:
+            with open(getattr(args, cat), "rb") as f:
+                pdf_bytes[cat] = f.read()
+        job_id = queue.submit(pdf_bytes, submission_ref=args.ref, use_cache=not args.no_cache, strategy=args.strategy)
+        print(job_id)
+        if args.wait:
+            job = wait_for(queue, job_id, on_event=lambda event: logger.info(f"{event['kind']}: {event['payload'] if event['kind'] != 'requirement' else event['payload'].get('id')}"))
+            return 0 if job["status"] == DONE else 2
+    elif args.command == "work":
+        pool = WorkerPool(queue, args.workers).start()
+        logger.info(f"Worker {pool.owner} processing jobs from {queue.directory}")
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            pool.stop()
+    elif args.command == "status":
+        for job in ([queue.get(args.job_id)] if args.job_id else queue.recent()):
+            if job is None:
+                logger.error(f"No job {args.job_id}")
+                return 1
+            print(f"{job['id']}  {job['status']:<8} stage={job['stage'] or '-':<18} attempts={job['attempts']}  {job['error'] or ''}")
+    elif args.command == "replay":
+        if not queue.replay(args.job_id):
+            logger.error(f"Job {args.job_id} is not finished or does not exist")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Regulatory Navigator - Map-Reduce Evaluation for Large Filings
+Evaluates documents too large for one prompt by splitting each into page-range chunks.
+
+Map: each document is cut into chunks of whole pages of at most NAVIGATOR_CHUNK_TOKENS tokens. Each
+chunk is sent with the requirements judged on that document (their input_category), with the pages
+marked, as one request of the fan-out machinery: concurrent, retried with backoff and cached per chunk
+(see fanout.py). A document that fits in one chunk costs one request, as in fan-out mode.
+
+Reduce: the chunk findings for a requirement are merged.
+- The best evidence wins: compliant over partial over missing. Among equal statuses, the finding whose
+  key_quote is found in its own chunk wins, then the earliest chunk.
+- Chunk findings with another status that carry evidence of their own (any status but missing, or a
+  missing with a key_quote) are listed in "conflicts" with their pages. An example is one chunk
+  stating Qatar hosting and another quoting an AWS Ireland region.
+- The merged finding keeps "evidence_pages", the page range of the winning chunk, and
+  "key_quote_page", the page its key_quote is on. annotate_pdf then only reads those pages.
+
+Latency stays close to one chunk's request as documents grow, as long as the chunks fit in the
+concurrency limit. pipeline.evaluate_documents switches to this mode by itself when the documents do
+not fit in the prompt budget (see budget.py).
+
+Time it against document size with the mock LLM:
+    python mapreduce.py --pages 20 100 300 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import budget
+import eval_cache
+import fanout
+import normalize
+import pipeline
+import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_TOKENS = 12_000
+DEFAULT_CONCURRENCY = 16
+STATUS_RANK = {"missing": 0, "partial": 1, "compliant": 2}
+
+
+class Chunk(NamedTuple):
+    """Pages [start, end) of one document, evaluated against `requirements`."""
+    category: str
+    requirements: List[Dict]
+    start: int
+    end: int
+
+    @property
+    def pages(self) -> str:
+        return str(self.end) if self.end - self.start == 1 else f"{self.start + 1}-{self.end}"
+
+
+def chunk_tokens() -> int:
+    return int(os.environ.get("NAVIGATOR_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS))
+
+def split_pages(pages: List[str], max_tokens: int) -> List[Tuple[int, int]]:
+    """Page ranges [start, end) of at most max_tokens each; a single larger page is a range of its own."""
+    ranges, start, used = [], 0, 0
+    for index, page in enumerate(pages):
+        tokens = budget.count_tokens(page)
+        if index > start and used + tokens > max_tokens:
+            ranges.append((start, index))
+            start, used = index, 0
+        used += tokens
+    if start < len(pages):
+        ranges.append((start, len(pages)))
+    return ranges
+
+def chunk_text(pages: List[str], start: int, end: int) -> str:
+    return normalize.PARAGRAPH_SEPARATOR.join(f"[Page {number + 1}]\n{pages[number]}" for number in range(start, end) if pages[number])
+
+def build_chunks(pages: Dict[str, List[str]], requirements: List[Dict], max_tokens: int) -> List[Chunk]:
+    chunks = []
+    for category, group in fanout.group_requirements(requirements):
+        for start, end in split_pages(pages.get(category, []), max_tokens) or [(0, 0)]:
+            chunks.append(Chunk(category, group, start, end))
+    return chunks
+
+
+# --- Reduce ---
+
+def _quote_page(pages: Dict[str, List[str]], chunk: Chunk, finding: Dict) -> Optional[int]:
+    """1-based page of the finding's key_quote within its chunk, or None."""
+    quote = finding.get("key_quote")
+    if not quote or chunk.end <= chunk.start:
+        return None
+    found = normalize.normalize_document(pages[chunk.category]).locate(quote, chunk.start, chunk.end)
+    return found[0] + 1 if found else None
+
+def _has_evidence(finding: Dict) -> bool:
+    return finding.get("status") != "missing" or bool(finding.get("key_quote"))
+
+def reduce_findings(pages: Dict[str, List[str]], chunks: List[Chunk], results: List[Optional[Dict]]) -> Dict:
+    """Merges the chunk replies into one finding per requirement (see the module docstring), in requirement order."""
+    candidates: Dict[str, List[Tuple[Dict, Chunk, Optional[int]]]] = {}
+    order: Dict[str, Dict] = {}
+    recommendations: List[str] = []
+    for chunk, result in zip(chunks, results):
+        for req in chunk.requirements:
+            order.setdefault(req["id"], req)
+        if not result: continue
+        wanted, seen = {req["id"]: req for req in chunk.requirements}, set()
+        for found in result.get("requirements", []):
+            source = wanted.get(found.get("id"))
+            if source is None or found["id"] in seen: continue  # unrequested or duplicate id
+            seen.add(found["id"])
+            found = dict(found)
+            found.setdefault("category", source.get("category"))
+            found.setdefault("requirement", source.get("requirement"))
+            if not found.get("found_in_document"): found["found_in_document"] = chunk.category
+            candidates.setdefault(found["id"], []).append((found, chunk, _quote_page(pages, chunk, found)))
+        for recommendation in result.get("recommendations", []):
+            if recommendation not in recommendations:
+                recommendations.append(recommendation)
+
+    requirements = []
+    for req_id in order:
+        options = candidates.get(req_id)
+        if not options: continue
+        best, chunk, page = max(options, key=lambda option: (STATUS_RANK.get(option[0].get("status"), 0), option[2] is not None, -option[1].start))
+        merged = dict(best)
+        if chunk.end > chunk.start:
+            merged["evidence_pages"] = chunk.pages
+        if page is not None:
+            merged["key_quote_page"] = page
+        conflicts = [{"pages": other_chunk.pages, "status": other.get("status"), "details": other.get("details", ""),
+                      "key_quote": other.get("key_quote", "")}
+                     for other, other_chunk, _ in options if other.get("status") != best.get("status") and _has_evidence(other)]
+        if conflicts:
+            merged["conflicts"] = conflicts
+        requirements.append(merged)
+    return {"requirements": requirements, "recommendations": recommendations}
+
+
+# --- Map ---
+
+async def aevaluate_mapreduce(pages: Dict[str, List[str]], requirements: Optional[List[Dict]] = None, client=None,
+                              max_chunk_tokens: Optional[int] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                              max_retries: int = fanout.DEFAULT_MAX_RETRIES, backoff: float = fanout.DEFAULT_BACKOFF_SECONDS,
+                              use_cache: bool = True, on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Evaluates `requirements` (default: all) over page chunks of each document and reduces the replies.
+
+    `on_requirement` receives a document's merged requirements as soon as all of its chunks are in.
+    """
+    requirements = pipeline.QCB_REQUIREMENTS if requirements is None else requirements
+    chunks = build_chunks(pages, requirements, max_chunk_tokens or chunk_tokens())
+    cache = eval_cache.get_cache() if use_cache else None
+    remaining: Dict[str, int] = {}
+    for chunk in chunks:
+        remaining[chunk.category] = remaining.get(chunk.category, 0) + 1
+    results: List[Optional[Dict]] = [None] * len(chunks)
+
+    client, owns_client = fanout.async_client(client)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate(index: int, chunk: Chunk) -> None:
+        document_pages = pages.get(chunk.category, [])
+        text = chunk_text(document_pages, chunk.start, chunk.end)
+        name = fanout.DOCUMENT_NAMES[chunk.category][0]
+        if len(document_pages) > chunk.end - chunk.start:
+            name = f"excerpt (pages {chunk.pages} of {len(document_pages)}) of the {name}"
+        prompt = fanout.build_group_prompt(chunk.category, chunk.requirements, text, document_name=name)
+        results[index] = await fanout._evaluate_group(client, semaphore, chunk.category, chunk.requirements, text,
+                                                      max_retries, backoff, cache, prompt=prompt)
+        remaining[chunk.category] -= 1
+        if on_requirement is not None and remaining[chunk.category] == 0:
+            done = [i for i, other in enumerate(chunks) if other.category == chunk.category]
+            for found in reduce_findings(pages, [chunks[i] for i in done], [results[i] for i in done])["requirements"]:
+                on_requirement(found)
+
+    with tracing.span("mapreduce", chunks=len(chunks)) as stage:
+        try:
+            await asyncio.gather(*(evaluate(index, chunk) for index, chunk in enumerate(chunks)))
+        finally:
+            if owns_client:
+                await client.close()
+        merged = reduce_findings(pages, chunks, results)
+        stage.set(failed_chunks=sum(1 for result in results if not result))
+        stage.add("conflicts", sum(1 for req in merged["requirements"] if req.get("conflicts")))
+    return merged
+
+def evaluate_mapreduce(pages: Dict[str, List[str]], requirements: Optional[List[Dict]] = None, client=None, **kwargs) -> Dict:
+    """Synchronous entry point for aevaluate_mapreduce; must not be called from a running event loop."""
+    async def run() -> Dict:
+        # Synchronous clients run on the loop's default executor (see fanout._complete), one thread per request slot.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=kwargs.get("concurrency", DEFAULT_CONCURRENCY)))
+        return await aevaluate_mapreduce(pages, requirements, client=client, **kwargs)
+    return asyncio.run(run())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time map-reduce evaluation against document size with the mock LLM.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 100, 300], help="Legal structure sizes to time, in pages")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock: seconds per requirement in a reply")
+    parser.add_argument("--chunk-tokens", type=int, default=None, help="Tokens per chunk (default: NAVIGATOR_CHUNK_TOKENS or 12000)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+    import io
+    import corpus
+    import mock_llm
+
+    client = mock_llm.MockClient(base_latency=0.2, per_requirement_latency=args.latency)
+    print(f"{'pages':>6} {'chunks':>7} {'seconds':>8} {'requirements':>13}")
+    for size in args.pages:
+        pages = {cat: pipeline.extract_pages_from_pdf(io.BytesIO(corpus.make_document(cat, size if cat == "legal_structure" else 5)))
+                 for cat in pipeline.DOCUMENT_CATEGORIES}
+        chunks = build_chunks(pages, pipeline.QCB_REQUIREMENTS, args.chunk_tokens or chunk_tokens())
+        began = time.perf_counter()
+        result = evaluate_mapreduce(pages, client=client, max_chunk_tokens=args.chunk_tokens, concurrency=args.concurrency, use_cache=False)
+        print(f"{size:6d} {len(chunks):7d} {time.perf_counter() - began:8.2f} {len(result['requirements']):13d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Regulatory Navigator - Mock OpenAI-Compatible Server
+A local stand-in for the chat completions endpoint, so evaluation strategies can be run and timed
+without network access or API cost.
+
+The server answers POST /v1/chat/completions with a deterministic evaluation of every requirement id
+that appears in the prompt. Latency is a fixed base plus a per-requirement cost, which models
+completion length: a prompt covering 16 requirements takes longer than one covering 4, which is
+what makes fan-out gains measurable. A failure rate can be set to exercise retry paths.
+
+Requests with "stream": true are answered as server-sent events in the OpenAI chunk format. The
+per-requirement latency is then spread over the reply as it is written, so the first findings arrive
+well before the last one, as with a real model. `detail_words` pads every finding's details to model
+longer replies.
+
+MockClient gives the same replies in-process, without HTTP, for benchmarks that should time the
+pipeline rather than the network stack (see benchmarks.py).
+
+Usage:
+    python mock_llm.py --port 8000 --latency 0.5
+    OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=mock streamlit run app.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Tuple
+
+import pipeline
+
+STATUSES = ("compliant", "partial", "missing")
+_FILLER_WORDS = ("the", "documents", "describe", "this", "control", "without", "naming", "an", "owner", "or", "a", "review", "cycle")
+
+
+def mock_status(requirement_id: str) -> str:
+    """Stable pseudo-random status per requirement id."""
+    return STATUSES[hashlib.sha256(requirement_id.encode("utf-8")).digest()[0] % len(STATUSES)]
+
+def requested_requirements(prompt: str) -> List[Dict]:
+    """Returns the catalog requirements whose ids appear in the prompt, in catalog order."""
+    return [req for req in pipeline.QCB_REQUIREMENTS if f'"id": "{req["id"]}"' in prompt]
+
+def build_evaluation(prompt: str, detail_words: int = 0) -> Dict:
+    """Deterministic reply in the shape the evaluation prompts ask for; details are padded by detail_words words."""
+    padding = " ".join(_FILLER_WORDS[i % len(_FILLER_WORDS)] for i in range(detail_words))
+    requirements = []
+    for req in requested_requirements(prompt):
+        status = mock_status(req["id"])
+        requirements.append({
+            "id": req["id"], "category": req["category"], "requirement": req["requirement"], "status": status,
+            "details": f"Mock assessment: {req['requirement']} is {status}. {padding}".rstrip(),
+            "found_in_document": req.get("input_category", "business_plan"),
+            "key_quote": "" if status == "compliant" else req["requirement"],
+        })
+    return {"requirements": requirements, "recommendations": ["Mock recommendation: review all partial findings."]}
+
+def reply_content(evaluation: Dict) -> str:
+    return "```json\n" + json.dumps(evaluation, indent=2) + "\n```"
+
+def _usage(content: str, prompt: str) -> Dict:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+def completion_payload(content: str, model: str, prompt: str) -> Dict:
+    return {
+        "id": f"chatcmpl-mock-{int(time.time() * 1000)}", "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(content, prompt),
+    }
+
+def chunk_payload(delta: Dict, model: str, finish_reason=None, usage=None) -> Dict:
+    payload = {
+        "id": "chatcmpl-mock-stream", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    if usage is not None:
+        payload.update(choices=[], usage=usage)
+    return payload
+
+STREAM_CHUNK_CHARS = 64
+
+def stream_events(content: str, model: str, usage=None) -> List[Dict]:
+    """The chunk payloads of a streamed reply: role, one per STREAM_CHUNK_CHARS of content, finish, optional usage."""
+    pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+    events = [chunk_payload({"role": "assistant", "content": ""}, model)]
+    events += [chunk_payload({"content": piece}, model) for piece in pieces]
+    events.append(chunk_payload({}, model, finish_reason="stop"))
+    if usage is not None:
+        events.append(chunk_payload({}, model, usage=usage))
+    return events
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    base_latency = 0.0
+    per_requirement_latency = 0.0
+    failure_rate = 0.0
+    detail_words = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+        evaluation = build_evaluation(prompt, self.detail_words)
+        generation_seconds = self.per_requirement_latency * len(evaluation["requirements"])
+        time.sleep(self.base_latency if request.get("stream") else self.base_latency + generation_seconds)
+        if random.random() < self.failure_rate:
+            self._send_json(500, {"error": {"message": "Mock transient failure", "type": "server_error"}})
+            return
+        content = reply_content(evaluation)
+        model = request.get("model", "mock")
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            self._stream(content, model, generation_seconds, _usage(content, prompt) if include_usage else None)
+        else:
+            self._send_json(200, completion_payload(content, model, prompt))
+
+    def _stream(self, content: str, model: str, generation_seconds: float, usage) -> None:
+        """Writes the reply as server-sent events, spreading generation_seconds evenly over the chunks."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        events = stream_events(content, model, usage)
+        pieces = len(events) - (3 if usage is not None else 2)
+        delay = generation_seconds / max(pieces, 1)
+        for index, event in enumerate(events):
+            if 0 < index <= pieces: time.sleep(delay)
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, base_latency: float = 0.0, per_requirement_latency: float = 0.0,
+                 failure_rate: float = 0.0, detail_words: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Starts the mock server on a daemon thread; returns (server, base_url). Port 0 picks a free port."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {
+        "base_latency": base_latency, "per_requirement_latency": per_requirement_latency, "failure_rate": failure_rate,
+        "detail_words": detail_words,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+# --- In-Process Client ---
+
+class _Payload(SimpleNamespace):
+    """Attribute view of a JSON payload; fields the payload lacks read as None, as on the SDK's models."""
+    def __getattr__(self, name):
+        return None
+
+def _as_payload(data: Dict) -> _Payload:
+    return json.loads(json.dumps(data), object_hook=lambda d: _Payload(**d))
+
+class MockClient:
+    """Deterministic in-process stand-in for openai.OpenAI, for client.chat.completions.create(...).
+
+    Replies, latency model (base + per requirement) and reply padding are those of the server.
+    """
+
+    def __init__(self, base_latency: float = 0.0, per_requirement_latency: float = 0.0, detail_words: int = 0):
+        self.base_latency = base_latency
+        self.per_requirement_latency = per_requirement_latency
+        self.detail_words = detail_words
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str = "mock", messages=(), stream: bool = False, stream_options=None, **kwargs):
+        self.calls += 1
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        evaluation = build_evaluation(prompt, self.detail_words)
+        content = reply_content(evaluation)
+        generation_seconds = self.per_requirement_latency * len(evaluation["requirements"])
+        if not stream:
+            time.sleep(self.base_latency + generation_seconds)
+            return _as_payload(completion_payload(content, model, prompt))
+        usage = _usage(content, prompt) if (stream_options or {}).get("include_usage") else None
+        return self._stream(stream_events(content, model, usage), generation_seconds)
+
+    def _stream(self, events: List[Dict], generation_seconds: float) -> Iterator[_Payload]:
+        time.sleep(self.base_latency)
+        delay = generation_seconds / max(len(events) - 2, 1)
+        for event in events:
+            if delay and event["choices"] and event["choices"][0]["delta"].get("content"): time.sleep(delay)
+            yield _as_payload(event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible chat completions endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--base-latency", type=float, default=0.2, help="Seconds added to every reply")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per requirement in a reply")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--detail-words", type=int, default=0, help="Words of padding per finding, to model longer replies")
+    args = parser.parse_args()
+    server, base_url = start_server(args.host, args.port, args.base_latency, args.latency, args.failure_rate, args.detail_words)
+    print(f"Mock LLM listening on {base_url}  (set OPENAI_BASE_URL={base_url})")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Regulatory Navigator - Document Normalization
+Strips what the evaluation prompt pays for but the model does not need: lines repeated on most pages
+(running headers, footers, page numbers), whitespace runs and line wrapping, and paragraphs repeated
+verbatim within or across the three documents (shared boilerplate, disclaimers).
+
+A line among the first or last EDGE_LINES lines of a page is a running header or footer when its
+signature (whitespace collapsed, case folded, digits replaced) is there on at least REPEAT_FRACTION
+of the pages of a document of MIN_REPEAT_PAGES pages or more, so "Page 3 of 40" and "Page 4 of 40"
+are the same line. PyMuPDF's plain text has no blank lines between blocks, so a paragraph is a run of
+lines up to one that ends a sentence, a blank line or the end of the page. A repeated paragraph
+(MIN_DUPLICATE_CHARS or longer) is kept where it first appears, in document order, and dropped elsewhere.
+
+Every kept word remembers its offset in the original text, so a quote taken from the normalized text
+maps back to its page and to the original text it came from (NormalizedDocument.locate), including
+any header or footer it crossed. The rule engine and annotate_pdf keep working on the original text.
+
+See what normalization saves on an application:
+    python normalize.py business_plan.pdf compliance_policy.pdf legal_structure.pdf
+"""
+
+import argparse
+import bisect
+import functools
+import logging
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPEAT_FRACTION = 0.5
+MIN_REPEAT_PAGES = 3
+EDGE_LINES = 3
+MIN_DUPLICATE_CHARS = 80
+PARAGRAPH_SEPARATOR = "\n\n"
+
+_WORD_RE = re.compile(r"\S+")
+_DIGITS_RE = re.compile(r"\d+")
+_SENTENCE_END = (".", "!", "?", ":", ";", "؟", "。")
+_BULLETS = ("•", "▪", "◦", "-", "–", "*")
+
+
+def _signature(line: str) -> str:
+    return _DIGITS_RE.sub("#", " ".join(line.split()).casefold())
+
+def _edge_lines(page: str) -> List[int]:
+    """Indexes of the first and last EDGE_LINES non-blank lines of a page, where headers and footers are."""
+    filled = [index for index, line in enumerate(page.split("\n")) if line.strip()]
+    return filled[:EDGE_LINES] + filled[-EDGE_LINES:]
+
+
+class Paragraph:
+    """One normalized paragraph: its page, its text and, per word, the offset of the word in the text and in the original."""
+
+    __slots__ = ("page", "text", "offsets", "origins")
+
+    def __init__(self, page: int, words: List[Tuple[str, int]]):
+        self.page = page
+        self.offsets, self.origins, parts, position = [], [], [], 0
+        for word, origin in words:
+            self.offsets.append(position)
+            self.origins.append(origin)
+            parts.append(word)
+            position += len(word) + 1
+        self.text = " ".join(parts)
+
+
+class NormalizedDocument:
+    """The normalized paragraphs of one document plus the map back to its original text ("".join(pages))."""
+
+    def __init__(self, pages: List[str]):
+        self.original = "".join(pages)
+        self.page_starts: List[int] = []
+        self.paragraphs: List[Paragraph] = []
+        self.removed_lines = 0
+
+        edges_by_page, signatures_by_page, offset = [], [], 0
+        for page in pages:
+            self.page_starts.append(offset)
+            lines = page.split("\n")
+            edges_by_page.append(set(_edge_lines(page)))
+            signatures_by_page.append({_signature(lines[index]) for index in edges_by_page[-1]})
+            offset += len(page)
+        repeated = set()
+        if len(pages) >= MIN_REPEAT_PAGES:
+            threshold = max(MIN_REPEAT_PAGES, REPEAT_FRACTION * len(pages))
+            counts: Dict[str, int] = {}
+            for signatures in signatures_by_page:
+                for signature in signatures:
+                    counts[signature] = counts.get(signature, 0) + 1
+            repeated = {signature for signature, count in counts.items() if count >= threshold}
+
+        for page_index, page in enumerate(pages):
+            words: List[Tuple[str, int]] = []
+            line_start = self.page_starts[page_index]
+            for line_index, line in enumerate(page.split("\n")):
+                stripped = line.strip()
+                if repeated and line_index in edges_by_page[page_index] and _signature(line) in repeated:
+                    self.removed_lines += 1
+                elif not stripped:
+                    self._close(page_index, words)
+                else:
+                    if stripped.startswith(_BULLETS):
+                        self._close(page_index, words)
+                    words.extend((match.group(), line_start + match.start()) for match in _WORD_RE.finditer(line))
+                    if stripped.endswith(_SENTENCE_END):
+                        self._close(page_index, words)
+                line_start += len(line) + 1
+            self._close(page_index, words)
+        self._index: Optional[Tuple[str, List[int], List[int], List[int], List[int]]] = None
+
+    def _close(self, page_index: int, words: List[Tuple[str, int]]) -> None:
+        if words:
+            self.paragraphs.append(Paragraph(page_index, words))
+            words.clear()
+
+    def pages(self, skip: Set[int] = frozenset()) -> List[str]:
+        """Normalized text of each page, paragraphs separated by a blank line, without the paragraphs in `skip`."""
+        pages: List[List[str]] = [[] for _ in self.page_starts]
+        for index, paragraph in enumerate(self.paragraphs):
+            if index not in skip:
+                pages[paragraph.page].append(paragraph.text)
+        return [PARAGRAPH_SEPARATOR.join(parts) for parts in pages]
+
+    def _word_index(self) -> Tuple[str, List[int], List[int], List[int], List[int]]:
+        """All paragraphs as one text; the text offset and original offset of every word; the start and page of every paragraph."""
+        if self._index is None:
+            offsets, origins, starts, position = [], [], [], 0
+            for paragraph in self.paragraphs:
+                starts.append(position)
+                offsets.extend(position + offset for offset in paragraph.offsets)
+                origins.extend(paragraph.origins)
+                position += len(paragraph.text) + len(PARAGRAPH_SEPARATOR)
+            self._index = (PARAGRAPH_SEPARATOR.join(p.text for p in self.paragraphs), offsets, origins, starts, [p.page for p in self.paragraphs])
+        return self._index
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Maps a [start, end) range of the text of all paragraphs to the original text."""
+        _, offsets, origins, _, _ = self._word_index()
+        first = max(bisect.bisect_right(offsets, start) - 1, 0)
+        last = max(bisect.bisect_right(offsets, end - 1) - 1, 0)
+        return origins[first] + (start - offsets[first]), origins[last] + (end - offsets[last])
+
+    def page_of(self, original_offset: int) -> int:
+        """0-based page of an offset in the original text."""
+        return max(bisect.bisect_right(self.page_starts, original_offset) - 1, 0)
+
+    def locate(self, quote: str, first_page: int = 0, last_page: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """(0-based page, original text) of a quote from the normalized text (whitespace and case are ignored), or None.
+
+        The search can be limited to the paragraphs on pages [first_page, last_page).
+        """
+        words = quote.split()
+        if not words or not self.paragraphs:
+            return None
+        text, _, _, starts, paragraph_pages = self._word_index()
+        first = bisect.bisect_left(paragraph_pages, first_page)
+        last = len(self.paragraphs) if last_page is None else bisect.bisect_left(paragraph_pages, last_page)
+        if first >= last:
+            return None
+        pattern = re.compile(r"\s+".join(re.escape(word) for word in words), re.IGNORECASE)
+        match = pattern.search(text, starts[first], starts[last - 1] + len(self.paragraphs[last - 1].text))
+        if match is None:
+            return None
+        start, end = self.to_original(match.start(), match.end())
+        return self.page_of(start), self.original[start:end]
+
+
+@functools.lru_cache(maxsize=16)
+def _normalize(pages: Tuple[str, ...]) -> NormalizedDocument:
+    return NormalizedDocument(list(pages))
+
+def normalize_document(pages: List[str]) -> NormalizedDocument:
+    """The normalized document for a list of page texts; recent documents are kept, so repeat calls are free."""
+    return _normalize(tuple(pages))
+
+def duplicate_paragraphs(documents: Dict[str, NormalizedDocument]) -> Dict[str, Set[int]]:
+    """Indexes of the paragraphs of each document that repeat an earlier paragraph, in document order."""
+    seen, skip = set(), {}
+    for category, document in documents.items():
+        skip[category] = set()
+        for index, paragraph in enumerate(document.paragraphs):
+            if len(paragraph.text) < MIN_DUPLICATE_CHARS:
+                continue
+            key = paragraph.text.casefold()
+            if key in seen:
+                skip[category].add(index)
+            else:
+                seen.add(key)
+    return skip
+
+def normalize_documents(pages: Dict[str, List[str]], dedupe: bool = True) -> Dict[str, List[str]]:
+    """Normalized page texts of each document; with `dedupe`, paragraphs already seen in an earlier document
+    (in the order of `pages`) or earlier in the same one are dropped."""
+    documents = {category: normalize_document(document_pages) for category, document_pages in pages.items()}
+    skip = duplicate_paragraphs(documents) if dedupe else {}
+    return {category: document.pages(skip.get(category, frozenset())) for category, document in documents.items()}
+
+def savings(pages: Dict[str, List[str]], normalized: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+    """Tokens before and after normalization, per document."""
+    import budget
+    report = {}
+    for category in pages:
+        before = budget.count_tokens("".join(pages[category]))
+        after = budget.count_tokens(PARAGRAPH_SEPARATOR.join(page for page in normalized[category] if page))
+        report[category] = {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Show what normalization removes from an application's documents.")
+    parser.add_argument("pdfs", nargs="+", help="PDFs in document order (business plan, compliance policy, legal structure)")
+    parser.add_argument("--no-dedupe", action="store_true", help="Keep paragraphs repeated across documents")
+    parser.add_argument("--show", action="store_true", help="Print the normalized text")
+    args = parser.parse_args(argv)
+    import pipeline
+
+    pages = {}
+    for path in args.pdfs:
+        with open(path, "rb") as f:
+            pages[path] = pipeline.extract_pages_from_pdf(f)
+    normalized = normalize_documents(pages, dedupe=not args.no_dedupe)
+    skip = duplicate_paragraphs({path: normalize_document(p) for path, p in pages.items()}) if not args.no_dedupe else {}
+    for path, stats in savings(pages, normalized).items():
+        document = normalize_document(pages[path])
+        share = stats["tokens_saved"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        print(f"{path}: {len(pages[path])} pages, {stats['tokens_before']} -> {stats['tokens_after']} tokens ({share:.0%} saved); "
+              f"{document.removed_lines} header/footer lines, {len(skip.get(path, ()))} duplicate paragraphs removed")
+        if args.show:
+            print(PARAGRAPH_SEPARATOR.join(page for page in normalized[path] if page))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
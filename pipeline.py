@@ -0,0 +1,619 @@
+"""
+Regulatory Navigator - Evaluation Pipeline
+Headless core of the app: PDF extraction, AI evaluation, specialist checks, scoring and report generation.
+Importable without Streamlit so the same pipeline can drive the UI, the batch CLI and background workers.
+PyMuPDF, the ReportLab layout engine, NumPy and the openai SDK are imported by the stages that use them, not by this module.
+"""
+
+import io
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import A4  # light; the layout engine is only loaded by report.py
+
+import budget
+import catalog
+import config
+import eval_cache
+import normalize
+import rules
+import streaming
+import tracing
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DOCUMENT_CATEGORIES = ("business_plan", "compliance_policy", "legal_structure")
+SUMMARY_REPORT = "summary"
+OUTPUT_FILENAMES = {
+    "business_plan": "annotated_business_plan.pdf",
+    "compliance_policy": "annotated_compliance_policy.pdf",
+    "legal_structure": "annotated_legal_structure.pdf",
+    SUMMARY_REPORT: "compliance_summary_report.pdf",
+}
+
+
+class PipelineError(Exception):
+    """Raised when an application cannot be evaluated (unreadable PDFs, empty AI result)."""
+
+
+# --- Configuration Loading ---
+# The configuration tables are served by config.py, which re-reads a file only when it changes:
+# pipeline.QCB_REQUIREMENTS is always the current requirements.json. Lookups by requirement id go
+# through the compiled catalog (catalog.py).
+
+_CONFIG_FILES = {
+    "QCB_REQUIREMENTS": catalog.REQUIREMENTS_FILE,
+    "RESOURCE_MAPPING": catalog.RESOURCES_FILE,
+    "CRITICALITY_WEIGHTS": catalog.SCORING_FILE,
+    "REMEDIATION_TEMPLATES": catalog.REMEDIATION_FILE,
+}
+
+def _table(name: str):
+    return config.load(_CONFIG_FILES[name])
+
+def __getattr__(name: str):
+    if name in _CONFIG_FILES:
+        return _table(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+catalog.get_catalog()  # a missing or broken file fails at import, as before; broken cross-references are logged
+
+# How the AI evaluation is requested: "single" sends one prompt with all three documents,
+# "retrieval" one prompt with the top-k passages per requirement (retrieval.py), and "fanout"
+# concurrent per-category prompts with only the relevant document (fanout.py), and "mapreduce" the
+# same per page-range chunk of each document, merged afterwards (mapreduce.py). "single" and "fanout"
+# switch to "mapreduce" when the documents do not fit in the prompt budget (budget.py).
+EVALUATION_STRATEGIES = ("single", "retrieval", "fanout", "mapreduce")
+_PER_DOCUMENT_STRATEGIES = ("fanout", "mapreduce")
+EVALUATION_STRATEGY = os.environ.get("NAVIGATOR_STRATEGY", "single")
+# The prompts carry the normalized documents (see normalize.py) unless NAVIGATOR_NORMALIZE=off.
+NORMALIZE_DOCUMENTS = os.environ.get("NAVIGATOR_NORMALIZE", "on").lower() != "off"
+
+def get_client(api_key: Optional[str] = None) -> "OpenAI":
+    """Returns the shared OpenAI client for an API key (default: OPENAI_API_KEY), see config.get_client."""
+    return config.get_client(api_key)
+
+def get_async_client(client: Optional["OpenAI"] = None) -> "AsyncOpenAI":
+    """Returns a new AsyncOpenAI client for one event loop, configured like `client` (default: the shared client),
+    see config.get_async_client. SDK retries are off; callers retry per request."""
+    return config.get_async_client(client)
+
+
+# --- Core Logic ---
+
+def extract_pages_from_pdf(pdf_file) -> List[str]:
+    """Extract the text of each page of an uploaded PDF file."""
+    import fitz  # PyMuPDF
+    try:
+        pdf_bytes = pdf_file.read()
+        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        pages = [page.get_text() for page in pdf_document]
+        pdf_document.close()
+        return pages
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {str(e)}")
+        return []
+
+def extract_text_from_pdf(pdf_file) -> str:
+    """Extract text content from uploaded PDF file."""
+    return "".join(extract_pages_from_pdf(pdf_file))
+
+
+EVALUATION_MODEL = "gpt-4o"
+
+# Prompt pieces shared by all evaluation prompt templates.
+_PROMPT_HEADER = """You are an expert regulatory compliance analyst for the Qatar Central Bank (QCB). Your task is to analyze three documents and evaluate them against a list of QCB FinTech requirements.
+"""
+_PROMPT_INSTRUCTIONS = """For each requirement, you must:
+1.  Classify its status as "compliant", "partial", or "missing".
+2.  Provide a specific, concise "details" explanation for your reasoning, especially for "partial" or "missing" statuses.
+3.  Identify which document ("business_plan", "compliance_policy", or "legal_structure") contains the primary evidence using the "found_in_document" field.
+4.  For any "partial" or "missing" status, extract the most relevant sentence or phrase as the "key_quote". If no text is relevant, leave the quote empty.
+
+**CRITICAL RULE for data_residency & primary_data_environment:** If a document mentions hosting on public clouds like AWS, Azure, or GCP, or regions like Ireland or Singapore, BUT does NOT explicitly state that all customer PII and transactional data are stored on servers physically located in Qatar, you MUST mark these requirements as "missing" and state this specific reason in the "details". For the "key_quote", extract the sentence that mentions the foreign hosting, for example: "hosted across the AWS regions in Ireland and Singapore".
+"""
+_PROMPT_OUTPUT_FORMAT = """Return a single JSON object. DO NOT include an overall_score. Your entire output must be only the JSON object.
+Structure:
+{{
+  "requirements": [
+    {{
+      "id": "<requirement_id>",
+      "category": "<category_name>",
+      "requirement": "<requirement_title>",
+      "status": "compliant|partial|missing",
+      "details": "<Your specific, 1-2 sentence reasoning>",
+      "found_in_document": "business_plan|compliance_policy|legal_structure",
+      "key_quote": "<Exact quote from the source document if not compliant>"
+    }}
+  ],
+  "recommendations": ["<A general, high-level recommendation>", "<Another general recommendation>"]
+}}
+"""
+
+# Every template starts with the same static text (header, instructions, output format), then the
+# requirements, and ends with the application's text, so providers can cache the shared prefix (see budget.py).
+_STATIC_PREFIX = _PROMPT_HEADER + "\n" + _PROMPT_INSTRUCTIONS + "\n" + _PROMPT_OUTPUT_FORMAT
+
+EVALUATION_PROMPT_PREFIX = _STATIC_PREFIX + """
+Analyze the documentation at the end against these QCB requirements (one JSON object per line):
+{requirements}
+"""
+EVALUATION_DOCUMENTS_TEMPLATE = """
+Documentation to analyze:
+<BUSINESS_PLAN>
+{business_plan}
+</BUSINESS_PLAN>
+
+<COMPLIANCE_POLICY>
+{compliance_policy}
+</COMPLIANCE_POLICY>
+
+<LEGAL_STRUCTURE>
+{legal_structure}
+</LEGAL_STRUCTURE>
+"""
+EVALUATION_PROMPT_TEMPLATE = EVALUATION_PROMPT_PREFIX + EVALUATION_DOCUMENTS_TEMPLATE
+
+# Retrieval mode: each requirement is followed by only the passages selected for it (see retrieval.py).
+RETRIEVAL_PROMPT_TEMPLATE = _STATIC_PREFIX + """
+Each QCB requirement below is followed by the passages of the three documents most relevant to it.
+Judge each requirement only on its passages; if none of them supports it, it is "missing".
+
+Requirements and relevant passages:
+{requirements_with_context}
+"""
+
+# Fan-out mode: one prompt per document category with only that category's requirements (see fanout.py).
+CATEGORY_PROMPT_TEMPLATE = _STATIC_PREFIX + """
+Only the {document_name} is provided below. Analyze it against these QCB requirements (one JSON object per line):
+{requirements}
+
+Documentation to analyze:
+<{document_tag}>
+{document}
+</{document_tag}>
+"""
+
+
+def parse_evaluation_reply(result_text: str) -> Dict:
+    """Parses the model's JSON reply, tolerating a ```json fenced block."""
+    if "```json" in result_text:
+        result_text = result_text.split("```json")[1].split("```")[0].strip()
+    return json.loads(result_text)
+
+class _CallbackError(Exception):
+    """Carries an exception raised by an on_requirement callback past the LLM error handling."""
+
+def _complete(prompt: str, client: Optional["OpenAI"], on_requirement: Optional[Callable[[Dict], None]]) -> str:
+    """Returns the model's reply text. With on_requirement, the reply is streamed and each requirement
+    object is passed to it as soon as it has been received in full (see streaming.py)."""
+    kwargs = dict(
+        model=EVALUATION_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a regulatory compliance expert. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1
+    )
+    client = client or get_client()
+    with tracing.span("llm", model=EVALUATION_MODEL, streaming=on_requirement is not None, prompt_chars=len(prompt)):
+        if on_requirement is None:
+            response = client.chat.completions.create(**kwargs)
+            tracing.record_usage(getattr(response, "usage", None))
+            return response.choices[0].message.content
+
+        # The last streamed chunk carries the token usage (and no choices).
+        parser = streaming.RequirementStreamParser()
+        for chunk in client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                for found in parser.feed(delta):
+                    try:
+                        on_requirement(found)
+                    except Exception as e:
+                        raise _CallbackError() from e
+            tracing.record_usage(getattr(chunk, "usage", None))
+        return parser.text
+
+def _request_evaluation(prompt: str, cache_documents: Dict[str, str], requirements: List[Dict], prompt_template: str,
+                        client: Optional["OpenAI"], use_cache: bool, on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Sends an evaluation prompt and parses the JSON reply, going through the evaluation cache."""
+    cache = eval_cache.get_cache() if use_cache else None
+    if cache is not None:
+        cache_key = cache.key(cache_documents, requirements, prompt_template, EVALUATION_MODEL)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            tracing.current().add("cache_hits")
+            if on_requirement is not None:
+                for found in cached.get("requirements", []): on_requirement(found)
+            return cached
+
+    try:
+        result = parse_evaluation_reply(_complete(prompt, client, on_requirement))
+        if cache is not None and result.get("requirements"):
+            cache.put(cache_key, result)
+        return result
+    except _CallbackError as e:
+        raise e.__cause__  # a bug in the caller, not an LLM failure: don't turn it into an empty result
+    except Exception as e:
+        logger.error(f"Error during AI evaluation: {e}")
+        return {"requirements": [], "recommendations": []}
+
+def format_requirements(requirements: List[Dict]) -> str:
+    """Requirements for a prompt, one compact JSON object per line."""
+    return "\n".join(json.dumps(req, ensure_ascii=False) for req in requirements)
+
+def build_evaluation_prompt(texts: Dict[str, str], requirements: Optional[List[Dict]] = None, max_tokens: Optional[int] = None) -> str:
+    """The single-prompt evaluation request for the three documents' texts (keyed by DOCUMENT_CATEGORIES).
+
+    The documents are cut down to fit max_tokens (default: NAVIGATOR_PROMPT_BUDGET), see budget.fit.
+    """
+    prefix, documents = _fit_evaluation_documents(texts, requirements, max_tokens)
+    return prefix + EVALUATION_DOCUMENTS_TEMPLATE.format(**documents)
+
+def _fit_evaluation_documents(texts: Dict[str, str], requirements: Optional[List[Dict]] = None,
+                              max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, str]]:
+    """The static prompt prefix and the documents as they go into the prompt, cut down by budget.fit."""
+    requirements = _table("QCB_REQUIREMENTS") if requirements is None else requirements
+    prefix = EVALUATION_PROMPT_PREFIX.format(requirements=format_requirements(requirements))
+    return prefix, budget.fit(prefix, {cat: texts[cat] for cat in DOCUMENT_CATEGORIES}, max_tokens)
+
+def evaluate_compliance_with_ai(business_plan: str, compliance_policy: str, legal_structure: str, client: Optional["OpenAI"] = None, use_cache: bool = True,
+                                requirements: Optional[List[Dict]] = None, on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Stage 1: AI Evaluation for status and reasoning. Does NOT calculate score.
+
+    `requirements` defaults to the full catalog. Successful results are cached on disk by content
+    (see eval_cache); pass use_cache=False to force a fresh call. `on_requirement` streams the reply
+    and receives each requirement as it arrives.
+    """
+    requirements = _table("QCB_REQUIREMENTS") if requirements is None else requirements
+    documents = {"business_plan": business_plan, "compliance_policy": compliance_policy, "legal_structure": legal_structure}
+    # The cache is keyed on the documents as sent, so a different prompt budget is a different entry.
+    prefix, documents = _fit_evaluation_documents(documents, requirements)
+    evaluation_prompt = prefix + EVALUATION_DOCUMENTS_TEMPLATE.format(**documents)
+    return _request_evaluation(evaluation_prompt, documents, requirements, EVALUATION_PROMPT_TEMPLATE, client, use_cache, on_requirement)
+
+def evaluate_compliance_with_retrieval(pages: Dict[str, List[str]], client: Optional["OpenAI"] = None, use_cache: bool = True,
+                                       requirements: Optional[List[Dict]] = None, top_k: Optional[int] = None,
+                                       on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Stage 1 (retrieval mode): like evaluate_compliance_with_ai, but each requirement only sees its top-k passages
+    (default retrieval.DEFAULT_TOP_K)."""
+    import retrieval
+    requirements = _table("QCB_REQUIREMENTS") if requirements is None else requirements
+    top_k = retrieval.DEFAULT_TOP_K if top_k is None else top_k
+    context = retrieval.select_context(pages, requirements, top_k=top_k)
+    requirements_with_context = retrieval.render_context(requirements, context)
+    evaluation_prompt = RETRIEVAL_PROMPT_TEMPLATE.format(requirements_with_context=requirements_with_context)
+    return _request_evaluation(evaluation_prompt, {"requirements_with_context": requirements_with_context}, requirements,
+                               RETRIEVAL_PROMPT_TEMPLATE, client, use_cache, on_requirement)
+
+
+def apply_hardcoded_checks(requirements: List[Dict], documents: Dict[str, str]) -> List[Dict]:
+    """Applies the high-precision, rule-based checks declared in rules.json (see rules.py).
+
+    A fired rule overrides the AI's status and details for its requirement. Requirements settled by a
+    definitive rule were never sent to the AI, so they are added here from the catalog.
+    """
+    findings = rules.scan_documents(documents)
+    if not findings:
+        return requirements
+    compiled = catalog.get_catalog()
+    by_id = {req.get("id"): req for req in requirements}
+    # Fired rules are applied in catalog order, so added requirements keep the catalog's order.
+    for req_id in sorted((req_id for req_id in findings if req_id in compiled.by_id), key=compiled.position.__getitem__):
+        finding, source = findings[req_id], compiled.by_id[req_id]
+        req = by_id.get(req_id)
+        if req is None:
+            req = {"id": source["id"], "category": source["category"], "requirement": source["requirement"]}
+            requirements.append(req)
+        _apply_finding(req, finding)
+    return requirements
+
+def _apply_finding(req: Dict, finding: Dict) -> Dict:
+    req.update({k: v for k, v in finding.items() if k not in ("rule", "definitive")})
+    return req
+
+
+def calculate_transparent_score(requirements: List[Dict], provisional: bool = False) -> int:
+    """Calculates a transparent, weighted score.
+
+    With provisional=True only the requirements evaluated so far count, which gives the running
+    score shown while findings are still streaming in.
+    """
+    return catalog.get_catalog().score(requirements, provisional=provisional)
+
+def map_resources(requirement_id: str) -> List[Dict]:
+    """Maps experts and programs to a requirement ID."""
+    return catalog.get_catalog().resources_for(requirement_id)
+
+# --- PDF Generation and Annotation ---
+
+def annotate_pdf(original_pdf_bytes: bytes, requirements: List[Dict], doc_category: str, fallback: bool = True) -> bytes:
+    """Adds highlights AND a final summary page to the PDF.
+
+    If annotation fails the original bytes are returned, or with fallback=False the error is raised
+    (the artifact store uses that to keep unannotated copies out of the store).
+    """
+    with tracing.span("annotate_pdf", document=doc_category, bytes=len(original_pdf_bytes)):
+        return _annotate_pdf(original_pdf_bytes, requirements, doc_category, fallback)
+
+def _annotate_pdf(original_pdf_bytes: bytes, requirements: List[Dict], doc_category: str, fallback: bool) -> bytes:
+    import fitz  # PyMuPDF
+    import quote_index
+    try:
+        pdf_document = fitz.open(stream=original_pdf_bytes, filetype="pdf")
+        relevant_reqs = [r for r in requirements if r.get("found_in_document") == doc_category]
+
+        # --- PART 1: Highlight what can be found ---
+        # All quotes are resolved against one word index of the document (see quote_index.py).
+        to_highlight = [r for r in relevant_reqs if r.get("status") != "compliant" and r.get("key_quote")]
+        # source_quote is the original text of a quote that spans a stripped header or footer (see locate_quotes).
+        quote_of = lambda r: r.get("source_quote") or r["key_quote"]
+        # Quotes with a key_quote_page (see locate_quotes) are looked up on that page and the next one (for
+        # quotes that cross a page break) first; the other pages are only indexed when a quote is still unmatched.
+        if to_highlight:
+            hinted_pages = {index for r in to_highlight if r.get("key_quote_page")
+                            for index in (r["key_quote_page"] - 1, r["key_quote_page"]) if index < pdf_document.page_count}
+            word_index = quote_index.QuoteIndex(pdf_document, hinted_pages)
+            matches = word_index.locate_all([quote_of(r) for r in to_highlight if r.get("key_quote_page")])
+            unmatched = [quote for quote in dict.fromkeys(quote_of(r) for r in to_highlight) if not matches.get(quote)]
+            if unmatched:
+                word_index.add_pages(range(pdf_document.page_count))
+                matches.update(word_index.locate_all(unmatched))
+            matched = sum(1 for r in to_highlight if matches[quote_of(r)])
+            tracing.current().add("quotes_requested", len(to_highlight)).add("quotes_matched", matched).set(
+                pages=pdf_document.page_count, indexed_pages=len(word_index.pages), match_rate=round(matched / len(to_highlight), 3))
+            del word_index  # not needed while the pages are saved, where memory use peaks
+        for req in to_highlight:
+            color = (1.0, 1.0, 0.0) if req.get("status") == "partial" else (1.0, 0.0, 0.0) # Yellow for partial
+            comment = f"Gap: {req.get('details', 'N/A')}"
+            for page_index, quads in matches[quote_of(req)]:
+                page = pdf_document[page_index]  # keep a reference: annotations need a live page object
+                highlight = page.add_highlight_annot(quads)
+                if highlight:
+                    highlight.set_colors(stroke=color)
+                    highlight.set_info(content=comment)
+                    highlight.update()
+
+        # --- PART 2: Add a final summary page with ALL findings for this document ---
+        if relevant_reqs:
+            summary_content = f"Findings Summary for {doc_category.replace('_', ' ').title()}\n\n"
+            for status, symbol in [("compliant", "✅"), ("partial", "⚠️"), ("missing", "❌")]:
+                items = [r for r in relevant_reqs if r.get("status") == status]
+                if items:
+                    summary_content += f"--- {status.upper()} ---\n"
+                    for item in sorted(items, key=lambda x: x.get('requirement', '')):
+                        summary_content += f"{symbol} {item.get('requirement', '')}\n"
+                        summary_content += f"   - Reasoning: {item.get('details', 'N/A')}\n"
+                        for conflict in item.get('conflicts', []):  # map-reduce: other pages disagree (see mapreduce.py)
+                            summary_content += f"   - Conflicting evidence (p. {conflict['pages']}, {conflict['status']}): {conflict['details']}\n"
+                        summary_content += "\n"
+            page = pdf_document.new_page(width=A4[0], height=A4[1])
+            page.insert_textbox(
+                fitz.Rect(50, 50, A4[0] - 50, A4[1] - 50),
+                summary_content, fontsize=10, fontname="helv"
+            )
+
+        output_bytes = pdf_document.write()
+        pdf_document.close()
+        return output_bytes
+    except Exception as e:
+        if not fallback:
+            raise
+        logger.error(f"Error annotating PDF for {doc_category}: {e}")
+        return original_pdf_bytes
+
+def generate_summary_pdf(score: int, requirements: List[Dict], recommendations: List[str], lang: str = "en") -> bytes:
+    """Generates the main summary PDF, in English unless another TRANSLATIONS language is given (see report.py)."""
+    import report
+    with tracing.span("summary_pdf", lang=lang, requirements=len(requirements)):
+        return report.render_summary(score, requirements, recommendations, lang)
+
+
+# --- Pipeline Stages ---
+# Each stage is a plain function over picklable values so the batch engine can
+# run the CPU-bound ones (extraction, rendering) in worker processes.
+
+def extract_documents(pdf_bytes: Dict[str, bytes]) -> Dict[str, List[str]]:
+    """Extracts the per-page text of each document category from its PDF bytes."""
+    pages = {}
+    with tracing.span("extract"):
+        for cat, data in pdf_bytes.items():
+            with tracing.span("extract_pdf", document=cat, bytes=len(data)) as stage:
+                pages[cat] = extract_pages_from_pdf(io.BytesIO(data))
+                stage.set(pages=len(pages[cat]), chars=sum(len(page) for page in pages[cat]))
+                stage.add("pages", len(pages[cat])).add("document_bytes", len(data))
+    return pages
+
+def _join_pages(pages: List[str]) -> str:
+    # Original pages end in a newline; normalized ones are separated by a blank line like their paragraphs.
+    return "".join(pages) if not NORMALIZE_DOCUMENTS else normalize.PARAGRAPH_SEPARATOR.join(page for page in pages if page)
+
+def normalize_pages(pages: Dict[str, List[str]], dedupe: bool = True) -> Dict[str, List[str]]:
+    """Normalized page texts of the three documents (see normalize.py); the savings are recorded in the trace."""
+    with tracing.span("normalize", dedupe=dedupe) as stage:
+        normalized = normalize.normalize_documents({cat: pages[cat] for cat in DOCUMENT_CATEGORIES}, dedupe=dedupe)
+        if tracing.enabled():
+            for cat, saved in normalize.savings({cat: pages[cat] for cat in DOCUMENT_CATEGORIES}, normalized).items():
+                stage.set(**{f"{cat}_tokens_before": saved["tokens_before"], f"{cat}_tokens_after": saved["tokens_after"]})
+                stage.add("tokens_saved", saved["tokens_saved"])
+    return normalized
+
+def _oversized(texts: Dict[str, str], requirements: List[Dict], strategy: str) -> bool:
+    """Whether the documents exceed the prompt budget: all three together for "single", any one of them for "fanout"."""
+    available = budget.max_prompt_tokens() - budget.count_tokens(EVALUATION_PROMPT_PREFIX.format(requirements=format_requirements(requirements)))
+    sizes = [budget.count_tokens(texts[cat]) for cat in DOCUMENT_CATEGORIES]
+    return (sum(sizes) if strategy == "single" else max(sizes)) > available
+
+def locate_quotes(requirements: List[Dict], pages: Dict[str, List[str]]) -> None:
+    """Sets 'key_quote_page' (1-based) on requirements whose key_quote is found in their document's text, and
+    'source_quote' to the original text when the quote crossed text that normalization strips (see normalize.py).
+    A key_quote_page already set (map-reduce) is searched first, with the next page for quotes that cross it."""
+    for req in requirements:
+        doc_pages = pages.get(req.get("found_in_document"))
+        if not req.get("key_quote") or req.get("status") == "compliant" or not doc_pages:
+            continue
+        document = normalize.normalize_document(doc_pages)
+        hint = req.get("key_quote_page")
+        found = document.locate(req["key_quote"], hint - 1, hint + 1) if hint else None
+        found = found or document.locate(req["key_quote"])
+        if found is None:
+            continue
+        page_index, source = found
+        req["key_quote_page"] = page_index + 1
+        if len(source.split()) > len(req["key_quote"].split()):
+            req["source_quote"] = source
+
+def _forward_requested(on_requirement: Callable[[Dict], None], requested_ids) -> Callable[[Dict], None]:
+    """Passes on each requested id once; streamed replies may repeat ids or invent new ones."""
+    emitted = set()
+    def forward(found: Dict) -> None:
+        if found.get("id") in requested_ids and found["id"] not in emitted:
+            emitted.add(found["id"])
+            on_requirement(found)
+    return forward
+
+def evaluate_documents(pages: Dict[str, List[str]], client: Optional["OpenAI"] = None, use_cache: bool = True,
+                       strategy: Optional[str] = None, requirements: Optional[List[Dict]] = None,
+                       on_requirement: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Runs the AI evaluation over the extracted pages. Raises PipelineError on an empty result.
+
+    `strategy` is one of EVALUATION_STRATEGIES and defaults to EVALUATION_STRATEGY (NAVIGATOR_STRATEGY).
+    `requirements` restricts the evaluation to a subset of the catalog (default: all of it).
+    `on_requirement` is called once per requirement as soon as a provisional finding for it is known:
+    rule-settled ones first, then the AI's as they stream in. finalize_evaluation may still change them.
+    """
+    strategy = strategy or EVALUATION_STRATEGY
+    if strategy not in EVALUATION_STRATEGIES:
+        raise ValueError(f"Unknown evaluation strategy '{strategy}', expected one of {', '.join(EVALUATION_STRATEGIES)}")
+    with tracing.span("evaluate", strategy=strategy) as stage:
+        return _evaluate_documents(pages, client, use_cache, strategy, requirements, on_requirement, stage)
+
+def _evaluate_documents(pages: Dict[str, List[str]], client: Optional["OpenAI"], use_cache: bool, strategy: str,
+                        requirements: Optional[List[Dict]], on_requirement: Optional[Callable[[Dict], None]], stage) -> Dict:
+    texts = {cat: "".join(pages[cat]) for cat in DOCUMENT_CATEGORIES}
+    if not any(texts[cat].strip() for cat in DOCUMENT_CATEGORIES):
+        raise PipelineError("❌ Critical Error: Could not extract text from the uploaded PDFs. Please ensure they are not scanned images.")
+
+    # Requirements settled by a definitive rule are not sent to the AI; finalize_evaluation fills them in.
+    findings = rules.scan_documents(texts)
+    decided = {req_id for req_id, finding in findings.items() if finding["definitive"]}
+    requirements = _table("QCB_REQUIREMENTS") if requirements is None else requirements
+    pending = [req for req in requirements if req["id"] not in decided]
+    pending_ids = {req["id"] for req in pending}
+    stage.set(requirements=len(pending), rule_decided=len(decided))
+    # Rules above see the original text; the prompts get the normalized one. Fan-out and map-reduce prompts
+    # carry one document each, so paragraphs are only de-duplicated across documents for the other strategies.
+    prompt_pages = normalize_pages(pages, dedupe=strategy not in _PER_DOCUMENT_STRATEGIES) if NORMALIZE_DOCUMENTS else pages
+    prompt_texts = {cat: _join_pages(prompt_pages[cat]) for cat in DOCUMENT_CATEGORIES}
+    if strategy in ("single", "fanout") and _oversized(prompt_texts, pending, strategy):
+        logger.info(f"Documents exceed the prompt budget of {budget.max_prompt_tokens()} tokens; evaluating them in chunks")
+        if strategy == "single" and NORMALIZE_DOCUMENTS:
+            prompt_pages = normalize_pages(pages, dedupe=False)
+        strategy = "mapreduce"
+        stage.set(strategy=strategy, oversized=True)
+
+    forward = None
+    if on_requirement is not None:
+        for req in requirements:
+            if req["id"] in decided:
+                on_requirement(_apply_finding({"id": req["id"], "category": req["category"], "requirement": req["requirement"]}, findings[req["id"]]))
+        forward = _forward_requested(on_requirement, pending_ids)
+    if not pending:
+        return {"requirements": [], "recommendations": []}
+
+    if strategy == "retrieval":
+        evaluation_result = evaluate_compliance_with_retrieval(prompt_pages, client=client, use_cache=use_cache, requirements=pending,
+                                                               on_requirement=forward)
+    elif strategy == "fanout":
+        import fanout  # imports this module, so it is loaded on first use
+        evaluation_result = fanout.evaluate_fanout(prompt_texts, pending, client=client, use_cache=use_cache, on_requirement=forward)
+    elif strategy == "mapreduce":
+        import mapreduce
+        evaluation_result = mapreduce.evaluate_mapreduce(prompt_pages, pending, client=client, use_cache=use_cache, on_requirement=forward)
+    else:
+        evaluation_result = evaluate_compliance_with_ai(prompt_texts["business_plan"], prompt_texts["compliance_policy"], prompt_texts["legal_structure"],
+                                                        client=client, use_cache=use_cache, requirements=pending, on_requirement=forward)
+    # Keep only the requirements that were asked for, so subset evaluations can be merged safely.
+    evaluation_result["requirements"] = [req for req in evaluation_result.get("requirements", []) if req.get("id") in pending_ids]
+    if not evaluation_result["requirements"]:
+        raise PipelineError("AI analysis failed to return results. Please try again.")
+    return evaluation_result
+
+def finalize_evaluation(evaluation_result: Dict, pages: Dict[str, List[str]], progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """Applies the specialist checks, attaches remediation and resources, and scores the result."""
+    progress = progress or (lambda stage: None)
+
+    progress("applying_checks")
+    texts = {cat: "".join(pages[cat]) for cat in DOCUMENT_CATEGORIES}
+    with tracing.span("checks") as stage:
+        evaluation_result["requirements"] = apply_hardcoded_checks(evaluation_result["requirements"], texts)
+        if tracing.enabled():
+            stage.set(rules_fired=len(rules.scan_documents(texts)))  # memoized by the checks above
+
+    locate_quotes(evaluation_result["requirements"], pages)
+
+    progress("mapping_recs")
+    compiled = catalog.get_catalog()
+    for req in evaluation_result["requirements"]:
+        if req.get("status") in ("partial", "missing"):
+            # A rule-specific suggestion (rules.json) takes precedence over the generic remediation template.
+            req["suggestion"] = req.get("suggestion") or compiled.remediation.get(req.get("id"), "Review this requirement with a compliance expert.")
+            req["resources"] = compiled.resources_for(req.get("id"))
+
+    progress("calculating_score")
+    with tracing.span("score"):
+        evaluation_result["overall_score"] = calculate_transparent_score(evaluation_result["requirements"])
+    return evaluation_result
+
+def render_report(name: str, pdf_bytes: Optional[bytes], evaluation_result: Dict, lang: str = "en", fallback: bool = True) -> bytes:
+    """Renders one report: an annotated document category (from its PDF bytes) or SUMMARY_REPORT in `lang`.
+
+    `fallback` is passed to annotate_pdf.
+    """
+    if name == SUMMARY_REPORT:
+        return generate_summary_pdf(evaluation_result["overall_score"], evaluation_result["requirements"], evaluation_result.get("recommendations", []), lang)
+    return annotate_pdf(pdf_bytes, evaluation_result["requirements"], name, fallback)
+
+def render_reports(pdf_bytes: Dict[str, bytes], evaluation_result: Dict) -> Dict[str, bytes]:
+    """Renders the three annotated documents and the summary report."""
+    return {name: render_report(name, pdf_bytes.get(name), evaluation_result) for name in OUTPUT_FILENAMES}
+
+def run_application(pdf_bytes: Dict[str, bytes], client: Optional["OpenAI"] = None, progress: Optional[Callable[[str], None]] = None,
+                    use_cache: bool = True, on_requirement: Optional[Callable[[Dict], None]] = None, strategy: Optional[str] = None,
+                    render: bool = True) -> Dict:
+    """Evaluates one application end to end.
+
+    `pdf_bytes` maps each of DOCUMENT_CATEGORIES to the raw PDF; `progress` is called with the
+    stage keys used by the UI translations ("reading_pdfs", "ai_analyzing", ...). `on_requirement`
+    receives provisional findings while the evaluation streams (see evaluate_documents).
+    With render=False the result has no 'reports'; render them on demand with render_report.
+    """
+    with tracing.span("application", strategy=strategy or EVALUATION_STRATEGY, render=render):
+        return _run_application(pdf_bytes, client, progress, use_cache, on_requirement, strategy, render)
+
+def _run_application(pdf_bytes: Dict[str, bytes], client: Optional["OpenAI"], progress: Optional[Callable[[str], None]],
+                     use_cache: bool, on_requirement: Optional[Callable[[Dict], None]], strategy: Optional[str], render: bool) -> Dict:
+    progress = progress or (lambda stage: None)
+
+    progress("reading_pdfs")
+    pages = extract_documents(pdf_bytes)
+
+    progress("ai_analyzing")
+    evaluation_result = evaluate_documents(pages, client=client, use_cache=use_cache, strategy=strategy, on_requirement=on_requirement)
+    evaluation_result = finalize_evaluation(evaluation_result, pages, progress=progress)
+
+    results = {
+        'score': evaluation_result["overall_score"], 'requirements': evaluation_result["requirements"],
+        'recommendations': evaluation_result.get("recommendations", []),
+    }
+    if render:
+        progress("generating_reports")
+        results['reports'] = render_reports(pdf_bytes, evaluation_result)
+    return results
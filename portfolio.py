@@ -0,0 +1,285 @@
+"""
+Regulatory Navigator - Portfolio Scoring
+Scores a whole backlog of evaluated applications at once, and shows how changing scoring.json
+(weights, default_weight, partial_multiplier) would move those scores.
+
+Stored evaluations (batch results.jsonl, finished jobs, incremental submission records) are loaded
+into an applications x requirements status matrix: 0 missing, 1 partial, 2 compliant. A score is
+then two matrix products. The compliant mask times the weight vector gives the compliant weight,
+the partial mask times it gives the partial weight, and each application's score is
+int((compliant + partial * multiplier) / total weight * 100), the same formula as
+pipeline.calculate_transparent_score. A sweep stacks many scoring configurations into a weight
+matrix, so K what-if configurations cost a single pass over the portfolio instead of K.
+
+Usage:
+    python portfolio.py batch_output/results.jsonl --jobs --submissions --multiplier 0.2 0.6 --scoring draft_scoring.json
+    python portfolio.py batch_output/results.jsonl --save portfolio.npz
+    python portfolio.py portfolio.npz --sensitivity 2
+    python portfolio.py --benchmark 100000
+"""
+
+import argparse
+import copy
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import catalog
+import config
+
+logger = logging.getLogger(__name__)
+
+STATUS_CODES = {"partial": 1, "compliant": 2}  # anything else, or no finding, counts as missing (0)
+READY_SCORE = 90
+AT_RISK_SCORE = 40
+# Rows scored per block, so the float masks stay around 64 MB however large the portfolio is.
+_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+# --- Loading Stored Evaluations ---
+
+def iter_results_jsonl(path: str) -> Iterator[Tuple[str, List[Dict]]]:
+    """(application id, requirements) of each successful row of a batch.py results.jsonl."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            row = json.loads(line)
+            if row.get("status") == "ok":
+                yield str(row["id"]), row["requirements"]
+
+def iter_job_results(directory: Optional[str] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """(job id, requirements) of every finished job in the job store (see jobs.py)."""
+    import jobs
+    directory = directory or os.environ.get("NAVIGATOR_JOBS_DIR", jobs.DEFAULT_JOBS_DIR)
+    for path in sorted(glob.glob(os.path.join(directory, "*", jobs.RESULT_FILENAME))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield os.path.basename(os.path.dirname(path)), json.load(f)["requirements"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable job result {path}: {e}")
+
+def iter_submissions(root: Optional[str] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """(submission id, requirements) of the latest run of every incremental submission (see incremental.py)."""
+    import incremental
+    root = root or os.environ.get("NAVIGATOR_SUBMISSIONS_DIR", incremental.DEFAULT_SUBMISSIONS_DIR)
+    for path in sorted(glob.glob(os.path.join(root, "*", incremental.RECORD_FILENAME))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield os.path.basename(os.path.dirname(path)), json.load(f)["evaluation"]["requirements"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable submission record {path}: {e}")
+
+
+# --- Scoring Configurations ---
+
+def current_scoring() -> Dict:
+    return config.load(catalog.SCORING_FILE)
+
+def with_multiplier(scoring: Dict, partial_multiplier: float) -> Dict:
+    variant = copy.deepcopy(scoring)
+    variant["partial_multiplier"] = partial_multiplier
+    return variant
+
+def with_weight(scoring: Dict, requirement_id: str, weight: float) -> Dict:
+    variant = copy.deepcopy(scoring)
+    variant.setdefault("weights", {})[requirement_id] = weight
+    return variant
+
+
+class Portfolio:
+    """Applications x requirements status matrix (int8 STATUS_CODES), in catalog requirement order."""
+
+    def __init__(self, application_ids: List[str], requirement_ids: List[str], statuses: np.ndarray):
+        if statuses.shape != (len(application_ids), len(requirement_ids)):
+            raise ValueError(f"Status matrix is {statuses.shape}, expected {(len(application_ids), len(requirement_ids))}")
+        self.application_ids = application_ids
+        self.requirement_ids = requirement_ids
+        self.statuses = statuses
+
+    def __len__(self) -> int:
+        return len(self.application_ids)
+
+    @classmethod
+    def from_results(cls, results: Iterable[Tuple[str, List[Dict]]], requirement_ids: Optional[List[str]] = None) -> "Portfolio":
+        """Builds the matrix from (application id, requirements) pairs; ids outside the catalog are ignored.
+
+        As in scoring, the first finding for a requirement counts.
+        """
+        requirement_ids = list(catalog.get_catalog().by_id) if requirement_ids is None else requirement_ids
+        column = {req_id: index for index, req_id in enumerate(requirement_ids)}
+        application_ids, rows, cols, codes = [], [], [], []
+        for row, (application_id, requirements) in enumerate(results):
+            application_ids.append(application_id)
+            seen = set()
+            for req in requirements:
+                index = column.get(req.get("id"))
+                if index is None or index in seen: continue
+                seen.add(index)
+                code = STATUS_CODES.get(req.get("status"))
+                if code:
+                    rows.append(row); cols.append(index); codes.append(code)
+        statuses = np.zeros((len(application_ids), len(requirement_ids)), dtype=np.int8)
+        statuses[rows, cols] = codes
+        return cls(application_ids, requirement_ids, statuses)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, statuses=self.statuses, application_ids=np.array(self.application_ids),
+                            requirement_ids=np.array(self.requirement_ids))
+
+    @classmethod
+    def load(cls, path: str) -> "Portfolio":
+        with np.load(path, allow_pickle=False) as stored:
+            return cls([str(a) for a in stored["application_ids"]], [str(r) for r in stored["requirement_ids"]], stored["statuses"])
+
+    def weights(self, scorings: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Weight matrix (requirements x K) and partial multipliers (K) of K scoring.json-shaped configurations."""
+        matrix = np.empty((len(self.requirement_ids), len(scorings)), dtype=np.float64)
+        multipliers = np.empty(len(scorings), dtype=np.float64)
+        for k, scoring in enumerate(scorings):
+            configured = scoring.get("weights", {})
+            default_weight = scoring.get("default_weight", catalog.DEFAULT_WEIGHT)
+            matrix[:, k] = [configured.get(req_id, default_weight) for req_id in self.requirement_ids]
+            multipliers[k] = scoring.get("partial_multiplier", catalog.DEFAULT_PARTIAL_MULTIPLIER)
+        return matrix, multipliers
+
+    def scores(self, scorings: Optional[List[Dict]] = None) -> np.ndarray:
+        """Scores (applications x K, int16) under each configuration; default: the current scoring.json.
+
+        With integer weights the result equals calculate_transparent_score for every application.
+        """
+        weights, multipliers = self.weights(scorings if scorings is not None else [current_scoring()])
+        total = weights.sum(axis=0)
+        scores = np.zeros((len(self), weights.shape[1]), dtype=np.int16)
+        block = max(1, _BLOCK_BYTES // (8 * max(1, len(self.requirement_ids))))
+        for start in range(0, len(self), block):
+            chunk = self.statuses[start:start + block]
+            compliant = (chunk == 2).astype(np.float64) @ weights
+            partial = (chunk == 1).astype(np.float64) @ weights
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = (compliant + partial * multipliers) / total * 100
+            scores[start:start + block] = np.where(total > 0, np.trunc(ratio), 0)
+        return scores
+
+    def sensitivity(self, scoring: Optional[Dict] = None, factor: float = 2.0) -> List[Dict]:
+        """Mean score change when each requirement's weight alone is multiplied by `factor` (one sweep)."""
+        scoring = scoring or current_scoring()
+        base_weights, _ = self.weights([scoring])
+        variants = [scoring] + [with_weight(scoring, req_id, base_weights[i, 0] * factor) for i, req_id in enumerate(self.requirement_ids)]
+        scores = self.scores(variants).astype(np.float64)
+        deltas = scores[:, 1:] - scores[:, :1]
+        rows = [{"requirement": req_id, "mean_delta": float(deltas[:, i].mean()), "changed": int(np.count_nonzero(deltas[:, i]))}
+                for i, req_id in enumerate(self.requirement_ids)]
+        return sorted(rows, key=lambda row: abs(row["mean_delta"]), reverse=True)
+
+
+def summarize(scores: np.ndarray, labels: List[str]) -> List[Dict]:
+    """Distribution of each configuration's scores, and its change against the first column."""
+    baseline = scores[:, 0].astype(np.int32)
+    summary = []
+    for k, label in enumerate(labels):
+        column = scores[:, k].astype(np.int32)
+        delta = column - baseline
+        summary.append({
+            "config": label, "mean": float(column.mean()), "median": float(np.median(column)),
+            "ready": float((column >= READY_SCORE).mean()), "at_risk": float((column < AT_RISK_SCORE).mean()),
+            "mean_delta": float(delta.mean()), "changed": int(np.count_nonzero(delta)),
+        })
+    return summary
+
+
+# --- Benchmark ---
+
+def synthetic(applications: int, seed: int = 0) -> Portfolio:
+    """A random portfolio over the current catalog: about half compliant, a quarter each partial and missing."""
+    requirement_ids = list(catalog.get_catalog().by_id)
+    rng = np.random.default_rng(seed)
+    statuses = rng.choice(np.array([0, 1, 2], dtype=np.int8), size=(applications, len(requirement_ids)), p=[0.25, 0.25, 0.5])
+    return Portfolio([f"app{i}" for i in range(applications)], requirement_ids, statuses)
+
+def benchmark(applications: int, configurations: int = 64, python_sample: int = 2000) -> Dict[str, float]:
+    import pipeline
+
+    portfolio = synthetic(applications)
+    base = current_scoring()
+    sweep = [with_multiplier(base, m) for m in np.linspace(0.0, 1.0, configurations)]
+
+    began = time.perf_counter()
+    vectorized = portfolio.scores()
+    one_ms = (time.perf_counter() - began) * 1000
+    began = time.perf_counter()
+    portfolio.scores(sweep)
+    sweep_ms = (time.perf_counter() - began) * 1000
+
+    codes = {code: status for status, code in STATUS_CODES.items()}
+    sample = [[{"id": req_id, "status": codes.get(int(code), "missing")} for req_id, code in zip(portfolio.requirement_ids, row)]
+              for row in portfolio.statuses[:python_sample]]
+    began = time.perf_counter()
+    reference = [pipeline.calculate_transparent_score(requirements) for requirements in sample]
+    python_ms = (time.perf_counter() - began) * 1000 * applications / len(sample)
+    if list(vectorized[:len(sample), 0]) != reference:
+        raise AssertionError("Vectorized scores differ from calculate_transparent_score")
+    return {"one_ms": one_ms, "sweep_ms": sweep_ms, "python_ms": python_ms}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score stored evaluations under the current and what-if scoring configurations.")
+    parser.add_argument("sources", nargs="*", help="batch results.jsonl files, or one .npz saved with --save")
+    parser.add_argument("--jobs", action="store_true", help="Include finished background jobs")
+    parser.add_argument("--submissions", action="store_true", help="Include incremental submission records")
+    parser.add_argument("--scoring", nargs="+", default=[], metavar="FILE", help="Alternative scoring.json files to compare")
+    parser.add_argument("--multiplier", nargs="+", type=float, default=[], help="Alternative partial_multiplier values to compare")
+    parser.add_argument("--sensitivity", type=float, metavar="FACTOR", help="Rank requirements by the effect of scaling their weight")
+    parser.add_argument("--save", metavar="PATH", help="Save the status matrix as .npz for later runs")
+    parser.add_argument("--benchmark", type=int, metavar="APPLICATIONS", help="Time scoring a synthetic portfolio of this size")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.benchmark:
+        stats = benchmark(args.benchmark)
+        print(f"{args.benchmark} applications: current scoring {stats['one_ms']:.1f} ms, 64-configuration sweep {stats['sweep_ms']:.1f} ms "
+              f"(calculate_transparent_score per application: ~{stats['python_ms']:.0f} ms per configuration)")
+        return 0
+
+    if len(args.sources) == 1 and args.sources[0].endswith(".npz"):
+        portfolio = Portfolio.load(args.sources[0])
+    else:
+        def results():
+            for path in args.sources: yield from iter_results_jsonl(path)
+            if args.jobs: yield from iter_job_results()
+            if args.submissions: yield from iter_submissions()
+        portfolio = Portfolio.from_results(results())
+    if not len(portfolio):
+        parser.error("no evaluated applications found")
+    if args.save:
+        portfolio.save(args.save)
+
+    base = current_scoring()
+    scorings, labels = [base], ["current"]
+    for path in args.scoring:
+        with open(path, "r", encoding="utf-8") as f:
+            scorings.append(json.load(f))
+        labels.append(os.path.basename(path))
+    for multiplier in args.multiplier:
+        scorings.append(with_multiplier(base, multiplier))
+        labels.append(f"partial_multiplier={multiplier:g}")
+
+    print(f"{len(portfolio)} applications x {len(portfolio.requirement_ids)} requirements")
+    print(f"{'configuration':<32} {'mean':>6} {'median':>6} {'ready':>6} {'at risk':>7} {'delta':>6} {'changed':>8}")
+    for row in summarize(portfolio.scores(scorings), labels):
+        print(f"{row['config'][:32]:<32} {row['mean']:6.1f} {row['median']:6.0f} {row['ready']:6.0%} {row['at_risk']:7.0%} "
+              f"{row['mean_delta']:+6.1f} {row['changed']:8d}")
+    if args.sensitivity:
+        print(f"\nMean score change with one requirement's weight x{args.sensitivity:g}:")
+        for row in portfolio.sensitivity(base, args.sensitivity):
+            print(f"  {row['requirement']:<28} {row['mean_delta']:+6.2f}  ({row['changed']} applications change)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Regulatory Navigator - Quote Index for PDF Annotation
+Locates key quotes in a PDF with one pass over its words instead of repeated page.search_for calls.
+
+The word list of every page (page.get_text("words")) is read once into a flat sequence of normalized
+tokens, each remembering its page and rectangle, plus an n-gram index over that sequence. Each quote
+is then resolved against the index: exact token-sequence matches first, otherwise the position where
+most of the quote's n-grams line up (fuzzy match), which tolerates line breaks, hyphenation,
+punctuation and small wording differences from the model, and last its first SNIPPET_WORDS words.
+Matched spans map back to one quad per text line for highlighting.
+"""
+
+import bisect
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+MIN_QUOTE_CHARS = 8
+NGRAM = 3
+# Fraction of a quote's n-grams that must line up at one position for a fuzzy match.
+FUZZY_THRESHOLD = 0.5
+# Last resort for a quote found neither exactly nor fuzzily: its first words.
+SNIPPET_WORDS = 5
+
+_STRIP_RE = re.compile(r"[^\w]", re.UNICODE)
+
+
+def normalize_token(word: str) -> str:
+    """Case- and punctuation-insensitive form of a word ("Singapore." and "singapore" are equal)."""
+    return _STRIP_RE.sub("", unicodedata.normalize("NFKC", word).casefold())
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in (normalize_token(w) for w in text.split()) if t]
+
+
+class QuoteIndex:
+    """Word/offset index of one PDF document, or of the page indexes in `pages` only; add_pages extends it.
+
+    Tokens are always in page order. Where the indexed pages skip a page, no match, n-gram or
+    highlight spans the gap.
+    """
+
+    def __init__(self, pdf_document, pages: Optional[Iterable[int]] = None):
+        self._document = pdf_document
+        # Page index -> [(token, position)]; each page's words are extracted once.
+        self._page_words: Dict[int, List[Tuple[str, Tuple]]] = {}
+        self.tokens: List[str] = []
+        # Parallel to tokens: (page index, block no, line no, x0, y0, x1, y1). Words keep content-stream
+        # order; sort=True would cost several times the extraction itself.
+        self.positions: List[Tuple] = []
+        self._run_starts: List[int] = []  # token offsets where the indexed pages stop being consecutive
+        self._ngrams: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        self._unigrams: Dict[str, List[int]] = defaultdict(list)
+        self.add_pages(range(pdf_document.page_count) if pages is None else pages)
+
+    @property
+    def pages(self):
+        return self._page_words.keys()
+
+    def add_pages(self, pages: Iterable[int]) -> None:
+        """Indexes the pages not indexed yet. Word extraction, most of the cost, runs once per page; the
+        token sequence and postings are rebuilt in page order."""
+        new = sorted(set(pages) - self._page_words.keys())
+        if not new:
+            return
+        for page_index in new:
+            words = []
+            for x0, y0, x1, y1, word, block_no, line_no, _ in self._document[page_index].get_text("words"):
+                token = normalize_token(word)
+                if token:
+                    words.append((token, (page_index, block_no, line_no, x0, y0, x1, y1)))
+            self._page_words[page_index] = words
+        self._build()
+
+    def _build(self) -> None:
+        self.tokens, self.positions, self._run_starts = [], [], []
+        previous = None
+        for page_index in sorted(self._page_words):
+            if previous is not None and page_index != previous + 1 and self.tokens:
+                self._run_starts.append(len(self.tokens))
+            previous = page_index
+            for token, position in self._page_words[page_index]:
+                self.tokens.append(token)
+                self.positions.append(position)
+
+        self._ngrams = defaultdict(list)
+        bounds = [0] + self._run_starts + [len(self.tokens)]
+        for run_start, run_end in zip(bounds, bounds[1:]):
+            for i in range(run_start, run_end - NGRAM + 1):
+                self._ngrams[tuple(self.tokens[i:i + NGRAM])].append(i)
+        self._unigrams = defaultdict(list)
+        for i, token in enumerate(self.tokens):
+            self._unigrams[token].append(i)
+
+    def _run(self, offset: int) -> Tuple[int, int]:
+        """[start, end) of the run of consecutive indexed pages that holds a token offset."""
+        i = bisect.bisect_right(self._run_starts, offset)
+        return (self._run_starts[i - 1] if i else 0), (self._run_starts[i] if i < len(self._run_starts) else len(self.tokens))
+
+    def _exact(self, quote_tokens: List[str]) -> List[Tuple[int, int]]:
+        """Spans of exact occurrences, seeded from the quote's rarest token."""
+        anchor = min(range(len(quote_tokens)), key=lambda k: len(self._unigrams.get(quote_tokens[k], ())))
+        spans = []
+        for pos in self._unigrams.get(quote_tokens[anchor], ()):
+            start, end = pos - anchor, pos - anchor + len(quote_tokens)
+            run_start, run_end = self._run(pos)
+            if start >= run_start and end <= run_end and self.tokens[start:end] == quote_tokens:
+                spans.append((start, end))
+        return spans
+
+    def _fuzzy(self, quote_tokens: List[str]) -> Optional[Tuple[int, int]]:
+        """Span where the most quote n-grams agree, if enough of them do, cut to its run of pages."""
+        if len(quote_tokens) < NGRAM:
+            return None
+        # Votes are per start and run of consecutive pages, so n-grams on both sides of a skipped page do not add up.
+        votes: Counter = Counter()
+        total = len(quote_tokens) - NGRAM + 1
+        for offset in range(total):
+            for pos in self._ngrams.get(tuple(quote_tokens[offset:offset + NGRAM]), ()):
+                votes[pos - offset, self._run(pos)] += 1
+        if not votes:
+            return None
+        (start, (run_start, run_end)), count = votes.most_common(1)[0]
+        if count / total < FUZZY_THRESHOLD:
+            return None
+        return max(start, run_start), min(start + len(quote_tokens), run_end)
+
+    def _quads(self, start: int, end: int) -> List[Tuple[int, List[fitz.Quad]]]:
+        """Groups the words of a span into one quad per line, per page."""
+        lines: Dict[Tuple[int, int, int], fitz.Rect] = {}
+        for page_index, block_no, line_no, x0, y0, x1, y1 in self.positions[start:end]:
+            key = (page_index, block_no, line_no)
+            if key in lines:
+                lines[key] |= (x0, y0, x1, y1)
+            else:
+                lines[key] = fitz.Rect(x0, y0, x1, y1)
+        by_page: Dict[int, List[fitz.Quad]] = defaultdict(list)
+        for (page_index, _, _), rect in lines.items():
+            by_page[page_index].append(rect.quad)
+        return sorted(by_page.items())
+
+    def locate(self, quote: str) -> List[Tuple[int, List[fitz.Quad]]]:
+        """Returns [(page index, quads)] for every match of the quote; empty if not found.
+
+        Exact matches first, then the fuzzy match, then, as page.search_for did before this index,
+        exact matches of the quote's first SNIPPET_WORDS words.
+        """
+        if not quote or len(quote) < MIN_QUOTE_CHARS:
+            return []
+        quote_tokens = tokenize(quote)
+        if not quote_tokens or not self.tokens:
+            return []
+        spans = self._exact(quote_tokens)
+        if not spans:
+            fuzzy_span = self._fuzzy(quote_tokens)
+            spans = [fuzzy_span] if fuzzy_span is not None else []
+        if not spans and len(quote_tokens) > SNIPPET_WORDS:
+            spans = self._exact(quote_tokens[:SNIPPET_WORDS])
+        matches = []
+        for start, end in spans:
+            matches.extend(self._quads(start, end))
+        return matches
+
+    def locate_all(self, quotes: List[str]) -> Dict[str, List[Tuple[int, List[fitz.Quad]]]]:
+        """Resolves many quotes against the index; duplicate quotes are looked up once."""
+        return {quote: self.locate(quote) for quote in dict.fromkeys(quotes)}
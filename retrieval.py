@@ -0,0 +1,228 @@
+"""
+Regulatory Navigator - Retrieval Stage
+Chunks the extracted pages, embeds them into a per-document vector index and selects, for each
+requirement, only the top-k passages relevant to it, so the prompt no longer grows with document length.
+
+Embedders are pluggable: the default is the sentence-transformers model declared in requirements.txt,
+with a dependency-free hashing embedder for offline use (NAVIGATOR_EMBEDDER=hashing) or as a
+fallback when the model cannot be loaded. Indexes are built once per document, reused across all
+requirements and persisted under .cache/indexes keyed by the document's content hash. FAISS is used
+for search when installed, otherwise a NumPy inner product.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "indexes")
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_TOP_K = 4
+CHUNK_CHARS = 1200
+# Similarity bonus for passages from the requirement's own input_category document.
+PRIMARY_DOCUMENT_BOOST = 0.1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# --- Embedders ---
+
+class HashingEmbedder:
+    """Signed feature-hashing of word unigrams and bigrams. Deterministic, offline, no model download."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        np.copysign(np.log1p(np.abs(vectors)), vectors, out=vectors)  # sublinear term frequency
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Wraps a sentence-transformers model; the library and weights are loaded on first use."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+        self.name = f"st-{model_name.replace('/', '_')}"
+        self._model = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        vectors = self._model.encode(texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def get_embedder():
+    """Returns the process-wide embedder selected by NAVIGATOR_EMBEDDER ("sentence-transformers" or "hashing")."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            choice = os.environ.get("NAVIGATOR_EMBEDDER", "sentence-transformers")
+            if choice == "hashing":
+                _embedder = HashingEmbedder()
+            else:
+                candidate = SentenceTransformerEmbedder(os.environ.get("NAVIGATOR_EMBEDDING_MODEL", DEFAULT_MODEL))
+                try:
+                    candidate.embed(["warm-up"])
+                    _embedder = candidate
+                except Exception as e:
+                    logger.warning(f"Could not load embedding model ({e}); falling back to the hashing embedder.")
+                    _embedder = HashingEmbedder()
+        return _embedder
+
+
+# --- Chunking ---
+
+def chunk_pages(pages: List[str], max_chars: int = CHUNK_CHARS) -> List[Dict]:
+    """Splits pages into paragraph-aligned passages of at most max_chars, each tagged with its 1-based page."""
+    chunks = []
+    for page_number, page_text in enumerate(pages, start=1):
+        buffer = ""
+        for paragraph in re.split(r"\n\s*\n", page_text):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph: continue
+            while len(paragraph) > max_chars:
+                cut = paragraph.rfind(". ", 0, max_chars)
+                cut = cut + 1 if cut > max_chars // 2 else max_chars
+                if buffer:
+                    chunks.append({"page": page_number, "text": buffer})
+                    buffer = ""
+                chunks.append({"page": page_number, "text": paragraph[:cut].strip()})
+                paragraph = paragraph[cut:].strip()
+            if buffer and len(buffer) + len(paragraph) + 1 > max_chars:
+                chunks.append({"page": page_number, "text": buffer})
+                buffer = ""
+            buffer = f"{buffer} {paragraph}".strip()
+        if buffer:
+            chunks.append({"page": page_number, "text": buffer})
+    return chunks
+
+
+# --- Vector Index ---
+
+class DocumentIndex:
+    """Embedded passages of one document with inner-product search (FAISS when available)."""
+
+    def __init__(self, chunks: List[Dict], vectors: np.ndarray):
+        self.chunks = chunks
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._faiss = None
+        try:
+            import faiss
+            if len(chunks):
+                self._faiss = faiss.IndexFlatIP(self.vectors.shape[1])
+                self._faiss.add(self.vectors)
+        except ImportError:
+            pass
+
+    def search(self, queries: np.ndarray, k: int):
+        """Returns (scores, indices) arrays of shape (len(queries), min(k, len(chunks)))."""
+        k = min(k, len(self.chunks))
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self._faiss is not None:
+            return self._faiss.search(queries, k)
+        similarities = queries @ self.vectors.T
+        indices = np.argsort(-similarities, axis=1)[:, :k]
+        return np.take_along_axis(similarities, indices, axis=1), indices
+
+
+def document_hash(pages: List[str]) -> str:
+    digest = hashlib.sha256()
+    for page in pages:
+        encoded = page.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+def build_index(pages: List[str], embedder=None, index_dir: Optional[str] = None) -> DocumentIndex:
+    """Loads the persisted index for these pages, or chunks, embeds and persists a new one."""
+    embedder = embedder or get_embedder()
+    index_dir = index_dir or os.environ.get("NAVIGATOR_INDEX_DIR", DEFAULT_INDEX_DIR)
+    path = os.path.join(index_dir, f"{document_hash(pages)}-{embedder.name}.npz")
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            return DocumentIndex(json.loads(str(stored["chunks"])), stored["vectors"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    chunks = chunk_pages(pages)
+    vectors = embedder.embed([c["text"] for c in chunks]) if chunks else np.zeros((0, 1), dtype=np.float32)
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, vectors=vectors, chunks=np.array(json.dumps(chunks, ensure_ascii=False)))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not persist retrieval index: {e}")
+    return DocumentIndex(chunks, vectors)
+
+
+# --- Per-Requirement Context Selection ---
+
+def requirement_query(requirement: Dict) -> str:
+    return f"{requirement.get('requirement', '')}. {requirement.get('description', '')}"
+
+def select_context(pages: Dict[str, List[str]], requirements: List[Dict], top_k: int = DEFAULT_TOP_K, embedder=None) -> Dict[str, List[Dict]]:
+    """Maps each requirement id to its top-k passages ({"document", "page", "text", "score"}) across all documents.
+
+    Every document is indexed once; all requirement queries are embedded in a single batch. Passages
+    from the requirement's input_category document get a small boost, since that is where the
+    evidence is expected, but strong matches elsewhere still surface.
+    """
+    embedder = embedder or get_embedder()
+    indexes = {doc: build_index(doc_pages, embedder) for doc, doc_pages in pages.items()}
+    queries = embedder.embed([requirement_query(r) for r in requirements])
+
+    candidates: List[List[Dict]] = [[] for _ in requirements]
+    for doc, index in indexes.items():
+        scores, indices = index.search(queries, top_k)
+        for row, requirement in enumerate(requirements):
+            boost = PRIMARY_DOCUMENT_BOOST if requirement.get("input_category") == doc else 0.0
+            for score, idx in zip(scores[row], indices[row]):
+                if idx < 0: continue
+                chunk = index.chunks[idx]
+                candidates[row].append({"document": doc, "page": chunk["page"], "text": chunk["text"], "score": float(score) + boost})
+
+    return {
+        requirement["id"]: sorted(found, key=lambda p: -p["score"])[:top_k]
+        for requirement, found in zip(requirements, candidates)
+    }
+
+def render_context(requirements: List[Dict], context: Dict[str, List[Dict]]) -> str:
+    """Formats requirements and their selected passages for the retrieval prompt."""
+    blocks = []
+    for requirement in requirements:
+        passages = "\n".join(
+            f'<PASSAGE document="{p["document"]}" page="{p["page"]}">\n{p["text"]}\n</PASSAGE>'
+            for p in context.get(requirement["id"], [])
+        ) or "<PASSAGE>No relevant text found in any document.</PASSAGE>"
+        blocks.append(f"<REQUIREMENT>\n{json.dumps(requirement, indent=2, ensure_ascii=False)}\n{passages}\n</REQUIREMENT>")
+    return "\n\n".join(blocks)
@@ -0,0 +1,182 @@
+"""
+Regulatory Navigator - Deterministic Rule Engine
+High-precision specialist checks declared in rules.json instead of hand-written Python.
+
+Each rule names a requirement, a regex (or literal) pattern, an optional numeric condition on the
+captured `value` group (e.g. a QAR capital minimum), and the status and details to assign when it
+fires. All rules are compiled into one combined pattern, so each document is scanned exactly once
+no matter how many rules there are. The combined pattern reports one rule per position, so at each
+hit the rules that have not matched yet are tried again on their own at that position. Rules marked "definitive" settle their requirement before the
+AI evaluation, so that requirement is dropped from the prompt altogether.
+
+Each document is scanned on its own, so a match never spans two documents (the former hand-written
+checks ran on the three documents concatenated, where a pattern could start in one and end in the next).
+
+Rule fields:
+    id, requirement_id, pattern          required
+    literal (bool), ignore_case (bool)   how to read the pattern
+    value_type: "number"                 parse the (?P<value>...) group as a number ("5,000,000" -> 5000000)
+    condition: {"below"|"at_least"|"above": threshold}   fire only when the value satisfies it
+    status, details, suggestion          fields written to the requirement; details may use
+                                         {value}, {threshold}, {shortfall}, {excess} and {match}
+    found_in_document                    defaults to the document the pattern matched in
+    definitive (bool)                    settle the requirement without asking the LLM
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import config
+import spool
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+KEY_QUOTE_MAX_CHARS = 200
+SCAN_CACHE_SIZE = 16
+
+_GROUP_NAME_RE = re.compile(r"\(\?P(<|=)(\w+)")
+_CONDITIONS = {
+    "below": lambda value, threshold: value < threshold,
+    "at_least": lambda value, threshold: value >= threshold,
+    "above": lambda value, threshold: value > threshold,
+}
+
+
+class RuleEngine:
+    """Compiled set of declarative rules."""
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        alternatives = []
+        for index, rule in enumerate(rules):
+            for field in ("id", "requirement_id", "pattern"):
+                if not rule.get(field):
+                    raise ValueError(f"Rule #{index} is missing '{field}'")
+            condition = rule.get("condition", {})
+            if any(op not in _CONDITIONS for op in condition):
+                raise ValueError(f"Rule '{rule['id']}' has an unknown condition: {condition}")
+            pattern = re.escape(rule["pattern"]) if rule.get("literal") else rule["pattern"]
+            re.compile(pattern)  # report a bad pattern against its own rule, not the combined one
+            # Namespace the rule's own groups so every alternative can live in one pattern.
+            pattern = _GROUP_NAME_RE.sub(lambda m: f"(?P{m.group(1)}r{index}_{m.group(2)}", pattern)
+            flags = "i" if rule.get("ignore_case") else ""
+            # A zero-width lookahead per rule keeps one rule's match from consuming text another rule needs.
+            alternatives.append(f"(?=(?P<r{index}>(?{flags}:{pattern})))" if flags else f"(?=(?P<r{index}>{pattern}))")
+        self._combined = re.compile("|".join(alternatives)) if alternatives else None
+        self._single = [re.compile(alternative) for alternative in alternatives]
+
+    def scan(self, documents: Dict[str, str]) -> Dict[str, Dict]:
+        """Scans each document once; returns {requirement_id: finding} for every rule that fired.
+
+        As with the former hand-written checks, a rule uses its first match in document order.
+        """
+        first_matches: Dict[int, Tuple[str, re.Match]] = {}
+        if self._combined is not None:
+            for document, text in documents.items():
+                for match in self._combined.finditer(text):
+                    # The outer r<index> group closes last, so it names the rule that matched.
+                    index = int(match.lastgroup.split("_", 1)[0][1:])
+                    first_matches.setdefault(index, (document, match))
+                    # Alternation stops at the first rule that matches here; later rules may match here too.
+                    for other in range(index + 1, len(self.rules)):
+                        if other not in first_matches:
+                            other_match = self._single[other].match(text, match.start())
+                            if other_match is not None:
+                                first_matches[other] = (document, other_match)
+                    if len(first_matches) == len(self.rules): break
+                if len(first_matches) == len(self.rules): break
+
+        findings = {}
+        for index in sorted(first_matches):
+            document, match = first_matches[index]
+            finding = self._evaluate(index, document, match)
+            if finding is not None:
+                findings.setdefault(self.rules[index]["requirement_id"], finding)
+        return findings
+
+    def _evaluate(self, index: int, document: str, match: re.Match) -> Optional[Dict]:
+        rule = self.rules[index]
+        matched_text = match.group(f"r{index}")
+        fields = {"match": matched_text}
+        if rule.get("value_type") == "number":
+            try:
+                fields["value"] = int(match.group(f"r{index}_value").replace(",", ""))
+            except (IndexError, TypeError, ValueError):
+                return None
+        for op, threshold in rule.get("condition", {}).items():
+            value = fields.get("value")
+            if value is None or not _CONDITIONS[op](value, threshold):
+                return None
+            fields.update(threshold=threshold, shortfall=threshold - value, excess=value - threshold)
+
+        finding = {
+            "status": rule.get("status", "missing"),
+            "details": rule.get("details", "").format(**fields),
+            "found_in_document": rule.get("found_in_document", document),
+            "key_quote": " ".join(matched_text.split())[:KEY_QUOTE_MAX_CHARS],
+            "rule": rule["id"],
+            "definitive": bool(rule.get("definitive")),
+        }
+        if rule.get("suggestion"):
+            finding["suggestion"] = rule["suggestion"]
+        return finding
+
+
+def load_rules(path: str = RULES_PATH) -> List[Dict]:
+    """The rules in `path`, re-read when the file changes (see config.load). Do not mutate them."""
+    return config.load(path)
+
+_engine: Optional[RuleEngine] = None
+_rejected: Optional[List[Dict]] = None
+
+def get_engine() -> RuleEngine:
+    """The engine for the current rules.json, rebuilt when the file changes.
+
+    An edit with an invalid rule is logged and the previous rules stay in effect.
+    """
+    global _engine, _rejected
+    rules = load_rules()
+    if _engine is None or (rules is not _engine.rules and rules is not _rejected):
+        try:
+            engine = RuleEngine(rules)
+        except (ValueError, re.error) as e:
+            if _engine is None:
+                raise
+            logger.warning(f"Ignoring edited rules.json, keeping the previous rules: {e}")
+            _rejected = rules
+            return _engine
+        _engine = engine
+        clear_scan_cache()
+    return _engine
+
+# Memoized scans, least recently used first, keyed on a hash of the documents so the texts themselves are not kept.
+_scans: "OrderedDict[str, Dict[str, Dict]]" = OrderedDict()
+_scans_lock = threading.Lock()
+
+def clear_scan_cache() -> None:
+    """Forgets memoized scans, e.g. to time scan_documents itself."""
+    with _scans_lock:
+        _scans.clear()
+
+def scan_documents(documents: Dict[str, str]) -> Dict[str, Dict]:
+    """Rule findings for a set of documents, memoized so the pre-LLM and post-LLM passes share one scan.
+
+    Callers must not mutate the returned findings.
+    """
+    engine = get_engine()  # an edited rules.json drops the memoized scans
+    key = spool.content_key(*(part for item in documents.items() for part in item))
+    with _scans_lock:
+        if key in _scans:
+            _scans.move_to_end(key)
+            return _scans[key]
+    findings = engine.scan(documents)
+    with _scans_lock:
+        _scans[key] = findings
+        while len(_scans) > SCAN_CACHE_SIZE:
+            _scans.popitem(last=False)
+    return findings
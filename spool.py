@@ -0,0 +1,132 @@
+"""
+Regulatory Navigator - Spool Store
+Directory of content-addressed files with TTL and LRU (entry count / total size) eviction.
+
+Shared by the evaluation cache (eval_cache.py, JSON results) and the report artifact store
+(artifacts.py, rendered PDFs). A subclass sets SUFFIX and, when it does not store raw bytes,
+_encode/_decode. Writes are atomic (temp file + rename); a file's mtime is touched on every hit
+and doubles as the LRU clock, and entries not touched within the TTL expire.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts: str) -> str:
+    """SHA-256 over the parts, each length-prefixed so no two different inputs concatenate to the same stream."""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class SpoolStore:
+    """Spool directory of entries keyed by content hash, with TTL and LRU eviction."""
+
+    SUFFIX = ".bin"
+    DESCRIPTION = "spool entry"  # used in log messages
+
+    def __init__(self, directory: str, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _encode(self, value: Any) -> bytes:
+        return value
+
+    def _decode(self, data: bytes) -> Optional[Any]:
+        """The stored value, or None if the entry is no longer valid (it is then removed)."""
+        return data
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.SUFFIX}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the stored value, or None on a miss or expired entry."""
+        path = self._path(key)
+        value = None
+        try:
+            if time.time() - os.stat(path).st_mtime <= self.ttl_seconds:
+                with open(path, "rb") as f:
+                    value = self._decode(f.read())
+            if value is None:
+                self._remove(path)
+            else:
+                os.utime(path)
+        except (OSError, ValueError):
+            value = None
+        with self._lock:
+            if value is None: self.misses += 1
+            else: self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a value atomically, then evicts entries beyond the configured budgets."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._encode(value))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write {self.DESCRIPTION}: {e}")
+            return
+        self._evict()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+            with self._lock: self.evictions += 1
+        except OSError:
+            pass
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith(self.SUFFIX)]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        now = time.time()
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for mtime, size, path in entries:
+            # Oldest first: drop anything not touched within the TTL, then trim to the budgets.
+            if now - mtime <= self.ttl_seconds and count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            count -= 1
+            total_bytes -= size
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries()
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "entries": len(entries), "bytes": sum(e.stat().st_size for e in entries),
+        }
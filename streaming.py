@@ -0,0 +1,123 @@
+"""
+Regulatory Navigator - Streaming Evaluation
+Incremental parsing of a streamed evaluation reply, so findings can be shown as the model writes them.
+
+The model answers with one JSON object whose "requirements" array holds an object per requirement.
+RequirementStreamParser is fed the reply chunk by chunk and returns each requirement object as soon
+as its closing brace arrives. Anything before the first "{" (such as a ```json fence) is skipped, and
+so is anything after the top-level object closes. Once the stream has ended, the full text is parsed
+as usual, so the final result never depends on the incremental parse.
+
+Measure time-to-first-finding against a local streaming mock (no network needed):
+    python streaming.py business_plan.pdf compliance_policy.pdf legal_structure.pdf --latency 0.5
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUIREMENTS_KEY = "requirements"
+
+
+class RequirementStreamParser:
+    """Emits complete objects of the reply's top-level "requirements" array while the reply is still arriving."""
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        # One entry per open container: (bracket, key of the array or None).
+        self._stack: List[tuple] = []
+        self._object_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consumes the next piece of the reply; returns the requirement objects completed by it."""
+        self.text += chunk
+        text, completed = self.text, []
+        for i in range(self._pos, len(text)):
+            if self.done: break
+            c = text[i]
+            if self._in_string:
+                if self._escape: self._escape = False
+                elif c == "\\": self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = text[self._string_start:i + 1]
+                continue
+            if not self._stack and c != "{":
+                continue  # preamble such as a ```json fence
+            if c == '"':
+                self._in_string, self._string_start = True, i
+            elif c == "[":
+                key = json.loads(self._last_key) if len(self._stack) == 1 and self._last_key else None
+                self._stack.append(("[", key))
+            elif c == "{":
+                if len(self._stack) == 2 and self._stack[1] == ("[", REQUIREMENTS_KEY):
+                    self._object_start = i
+                self._stack.append(("{", None))
+            elif c in "]}":
+                self._stack.pop()
+                if c == "}" and self._object_start is not None and len(self._stack) == 2:
+                    try:
+                        found = json.loads(text[self._object_start:i + 1])
+                        if isinstance(found, dict): completed.append(found)
+                    except ValueError as e:
+                        logger.debug(f"Skipping malformed streamed requirement: {e}")
+                    self._object_start = None
+                if not self._stack:
+                    self.done = True
+        self._pos = len(text)
+        return completed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import pipeline
+    import mock_llm
+    from openai import OpenAI
+
+    parser = argparse.ArgumentParser(description="Time-to-first-finding of buffered vs streamed evaluation against a local mock.")
+    parser.add_argument("business_plan")
+    parser.add_argument("compliance_policy")
+    parser.add_argument("legal_structure")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock: seconds of latency per requirement in a reply")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    server, base_url = mock_llm.start_server(base_latency=0.2, per_requirement_latency=args.latency)
+    client = OpenAI(api_key="mock", base_url=base_url)
+    pdf_bytes = {}
+    for cat in pipeline.DOCUMENT_CATEGORIES:
+        with open(getattr(args, cat), "rb") as f:
+            pdf_bytes[cat] = f.read()
+    texts = {cat: "".join(pages) for cat, pages in pipeline.extract_documents(pdf_bytes).items()}
+
+    began = time.monotonic()
+    buffered = pipeline.evaluate_compliance_with_ai(texts["business_plan"], texts["compliance_policy"], texts["legal_structure"], client=client, use_cache=False)
+    buffered_seconds = time.monotonic() - began
+
+    arrivals = []
+    began = time.monotonic()
+    streamed = pipeline.evaluate_compliance_with_ai(texts["business_plan"], texts["compliance_policy"], texts["legal_structure"], client=client, use_cache=False,
+                                                    on_requirement=lambda req: arrivals.append(time.monotonic() - began))
+    streamed_seconds = time.monotonic() - began
+    server.shutdown()
+
+    print(f"buffered: first finding {buffered_seconds:6.2f}s  total {buffered_seconds:6.2f}s  {len(buffered.get('requirements', []))} requirements")
+    first = f"{arrivals[0]:6.2f}s" if arrivals else "   n/a"
+    print(f"streamed: first finding {first}  total {streamed_seconds:6.2f}s  {len(streamed.get('requirements', []))} requirements "
+          f"({len(arrivals)} emitted while streaming)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import artifacts
+import corpus
+
+
+@pytest.fixture
+def store(tmp_path):
+    return artifacts.ArtifactStore(str(tmp_path), max_entries=3)
+
+
+def result_for(category):
+    return {"overall_score": 50, "recommendations": [], "requirements": [
+        {"id": "REQ-1", "category": "x", "requirement": "Something", "status": "missing",
+         "found_in_document": category, "key_quote": "not in the document", "details": "gap"}]}
+
+
+def test_get_or_render_renders_once(store):
+    calls = []
+    render = lambda: calls.append(1) or b"%PDF-rendered"
+    assert store.get_or_render("k", render) == b"%PDF-rendered"
+    assert store.get_or_render("k", render) == b"%PDF-rendered"
+    assert len(calls) == 1
+    assert store.stats()["hits"] >= 1 and store.stats()["entries"] == 1
+
+
+def test_expired_artifact_is_a_miss(store):
+    store.put("k", b"old")
+    stale = time.time() - store.ttl_seconds - 10
+    os.utime(store._path("k"), (stale, stale))
+    assert store.get("k") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_least_recently_used_artifacts_are_evicted(store):
+    for i in range(3):
+        store.put(f"k{i}", b"x")
+        os.utime(store._path(f"k{i}"), (1000 + i, time.time() - 100 + i))
+    store.get("k0")  # k0 becomes the most recently used
+    store.put("k3", b"x")
+    assert store.get("k1") is None
+    assert store.get("k0") == b"x" and store.get("k3") == b"x"
+
+
+def test_failed_render_stores_nothing(store):
+    def render():
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        store.get_or_render("k", render)
+    assert store.stats()["entries"] == 0
+    assert store.get_or_render("k", lambda: b"ok") == b"ok"
+
+
+def test_failed_annotation_is_served_unannotated_but_not_stored(store):
+    broken = b"not a pdf"
+    assert artifacts.get_report("business_plan", broken, result_for("business_plan"), store=store) == broken
+    assert store.stats()["entries"] == 0
+
+
+def test_annotated_report_is_stored(store):
+    pdf = corpus.make_document("business_plan", pages=1, quotes=1)
+    first = artifacts.get_report("business_plan", pdf, result_for("business_plan"), store=store)
+    assert first != pdf and store.stats()["entries"] == 1
+    assert artifacts.get_report("business_plan", pdf, result_for("business_plan"), store=store) == first
@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+
+
+def write_manifest(tmp_path, ids):
+    path = tmp_path / "manifest.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for app_id in ids:
+            row = {"business_plan": "bp.pdf", "compliance_policy": "cp.pdf", "legal_structure": "ls.pdf"}
+            if app_id is not None: row["id"] = app_id
+            f.write(json.dumps(row) + "\n")
+    return str(path)
+
+
+def test_manifest_ids_become_folder_names(tmp_path):
+    applications = batch.discover_applications(write_manifest(tmp_path, ["APP-1", "app 2", None]))
+    assert [app["id"] for app in applications] == ["APP-1", "app 2", "2"]
+    assert applications[0]["business_plan"] == os.path.join(str(tmp_path), "bp.pdf")
+
+
+@pytest.mark.parametrize("ids", [["a", "a"], ["../outside"], ["a/b"], ["a\\b"], [".."], ["."], ["x", "2", None]])
+def test_duplicate_or_path_like_ids_are_rejected(tmp_path, ids):
+    with pytest.raises(ValueError):
+        batch.discover_applications(write_manifest(tmp_path, ids))
+
+
+def test_cli_reports_an_invalid_manifest(tmp_path):
+    assert batch.main([write_manifest(tmp_path, ["a", "a"]), "--out", str(tmp_path / "out")]) == 1
+    assert not os.path.exists(tmp_path / "out")
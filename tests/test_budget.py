@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import budget
+
+PREFIX = "Evaluate the documents below. " * 10
+
+
+def paragraphs(count, words=30, tag="p"):
+    return "\n\n".join(" ".join(f"{tag}{i}w{j}" for j in range(words)) for i in range(count))
+
+
+def prompt_tokens(documents):
+    return budget.count_tokens(PREFIX) + sum(budget.count_tokens(text) for text in documents.values())
+
+
+def test_documents_within_the_budget_are_untouched():
+    documents = {"a": paragraphs(3), "b": paragraphs(2)}
+    assert budget.fit(PREFIX, documents, max_tokens=prompt_tokens(documents)) is documents
+
+
+def test_small_documents_stay_whole_and_large_ones_are_cut_in_order():
+    documents = {"small": paragraphs(2, tag="s"), "large": paragraphs(200, tag="l"), "medium": paragraphs(40, tag="m")}
+    max_tokens = budget.count_tokens(PREFIX) + 2000
+    fitted = budget.fit(PREFIX, documents, max_tokens=max_tokens)
+    assert fitted["small"] == documents["small"]
+    assert prompt_tokens(fitted) <= max_tokens
+    for name in ("large", "medium"):
+        kept = fitted[name].split("\n\n")
+        assert kept[-1].startswith("[") and "omitted to fit the prompt budget" in kept[-1]
+        assert documents[name].startswith("\n\n".join(kept[:-2]))  # paragraphs kept from the start, in order
+
+
+def test_document_without_blank_lines_keeps_its_start():
+    text = " ".join(f"word{i}" for i in range(5000))
+    fitted = budget.fit(PREFIX, {"a": text}, max_tokens=budget.count_tokens(PREFIX) + 500)["a"]
+    kept, note = fitted.split("\n\n")
+    assert text.startswith(kept) and text[len(kept)] == " " and len(kept) > 1000
+    assert note == budget.TRUNCATION_NOTE.format(omitted=1, total=1)
+
+
+def test_cut_ends_at_the_last_word_that_fits():
+    paragraph = " ".join(f"w{i:03d}" for i in range(200))
+    for limit in (0, 1, 7, 50, 10_000):
+        cut = budget._cut(paragraph, limit)
+        assert paragraph.startswith(cut) and budget.count_tokens(cut) <= limit
+        if cut != paragraph:
+            longer = paragraph[:paragraph.find(" ", len(cut) + 1)] if " " in paragraph[len(cut) + 1:] else paragraph
+            assert budget.count_tokens(longer) > limit
+            assert cut == "" or paragraph[len(cut)] == " "
+
+
+def test_shares_give_small_documents_their_size():
+    assert budget._shares({"a": 10, "b": 500, "c": 800}, 610) == {"a": 10, "b": 300, "c": 300}
+    assert budget._shares({"a": 10, "b": 20}, -5) == {"a": 0, "b": 0}
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+
+REQUIREMENTS = [
+    {"id": "aml_policy", "category": "AML", "requirement": "AML policy", "input_category": "compliance_policy"},
+    {"id": "data_residency", "category": "Data", "requirement": "Data residency", "input_category": "legal_structure"},
+]
+
+
+def build(scoring=None, remediation=None, resources=None):
+    return catalog.Catalog(REQUIREMENTS, scoring or {"weights": {}}, remediation or {}, resources or [])
+
+
+def test_shipped_catalog_has_no_errors():
+    assert catalog.Catalog(*catalog._load_sources()).problems == []
+
+
+def test_dangling_weight_is_a_warning_and_ignored():
+    compiled = build(scoring={"weights": {"aml_policy": 8, "business_continuity": 5}})
+    assert compiled.problems == []
+    assert len(compiled.warnings) == 1 and catalog.SCORING_FILE in compiled.warnings[0] and "business_continuity" in compiled.warnings[0]
+    assert "business_continuity" not in compiled.weights
+    assert compiled.weights["aml_policy"] == 8
+
+
+def test_dangling_remediation_template_is_a_warning():
+    compiled = build(remediation={"aml_policy": "Write one.", "foreign_data_transfer": "Do not."})
+    assert compiled.problems == []
+    assert len(compiled.warnings) == 1 and catalog.REMEDIATION_FILE in compiled.warnings[0] and "foreign_data_transfer" in compiled.warnings[0]
+    assert compiled.remediation["foreign_data_transfer"] == "Do not."  # kept, just never matched
+
+
+def test_dangling_resource_link_is_a_warning_and_valid_links_still_resolve():
+    provider = {"name": "Gulf DR", "linked_rule_ids": ["business_continuity", "data_residency"]}
+    compiled = build(resources=[provider])
+    assert compiled.problems == []
+    assert len(compiled.warnings) == 1 and "Gulf DR" in compiled.warnings[0] and "business_continuity" in compiled.warnings[0]
+    assert compiled.resources_for("data_residency") == [provider]
+
+
+def test_structural_issues_are_errors():
+    compiled = catalog.Catalog(REQUIREMENTS + [{"id": "aml_policy", "category": "AML", "requirement": "Again", "input_category": "x"},
+                                               {"id": "no_category", "requirement": "R", "input_category": "x"}],
+                               {"weights": {"data_residency": -1}}, {}, [])
+    assert len(compiled.problems) == 3 and compiled.warnings == []
+
+
+def test_cli_exits_non_zero_on_warnings_only_when_strict(capsys):
+    assert catalog.main([]) == 0
+    assert catalog.main(["--strict"]) == (1 if catalog.Catalog(*catalog._load_sources()).warnings else 0)
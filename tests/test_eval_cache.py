@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import eval_cache
+import mock_llm
+import pipeline
+
+DOCUMENTS = {"business_plan": "plan", "compliance_policy": "policy", "legal_structure": "structure"}
+REQUIREMENTS = [{"id": "REQ-1", "category": "governance", "requirement": "Board"}]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = eval_cache.EvaluationCache(str(tmp_path))
+    monkeypatch.setattr(eval_cache, "_cache", cache)
+    monkeypatch.delenv("NAVIGATOR_CACHE", raising=False)
+    return cache
+
+
+def test_key_changes_with_every_input():
+    key = eval_cache.EvaluationCache.key(DOCUMENTS, REQUIREMENTS, "template", "model")
+    assert key == eval_cache.EvaluationCache.key(dict(reversed(list(DOCUMENTS.items()))), REQUIREMENTS, "template", "model")
+    changed = [
+        ({**DOCUMENTS, "legal_structure": "structure."}, REQUIREMENTS, "template", "model"),
+        (DOCUMENTS, [{**REQUIREMENTS[0], "requirement": "Board of directors"}], "template", "model"),
+        (DOCUMENTS, REQUIREMENTS, "template2", "model"),
+        (DOCUMENTS, REQUIREMENTS, "template", "model2"),
+        # Length prefixes: moving text between adjacent parts is a different key.
+        (DOCUMENTS, REQUIREMENTS, "templatem", "odel"),
+    ]
+    assert len({key} | {eval_cache.EvaluationCache.key(*args) for args in changed}) == len(changed) + 1
+
+
+def test_entries_expire_from_when_they_were_stored(cache):
+    cache.put("k", {"requirements": [1]})
+    assert cache.get("k") == {"requirements": [1]}
+    path = cache._path("k")
+    with open(path) as f:
+        entry = json.load(f)
+    entry["created"] -= cache.ttl_seconds + 1
+    with open(path, "w") as f:
+        json.dump(entry, f)
+    assert cache.get("k") is None  # the file was just touched, but the TTL counts from "created"
+    assert not os.path.exists(path)
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    with open(cache._path("k"), "w") as f:
+        f.write("{not json")
+    assert cache.get("k") is None and cache.stats()["misses"] == 1
+
+
+def test_evaluation_is_served_from_cache_until_an_input_changes(cache):
+    client = mock_llm.MockClient()
+    first = pipeline.evaluate_compliance_with_ai(*DOCUMENTS.values(), client=client)
+    assert first["requirements"] and client.calls == 1
+    assert pipeline.evaluate_compliance_with_ai(*DOCUMENTS.values(), client=client) == first
+    assert client.calls == 1
+    pipeline.evaluate_compliance_with_ai("plan, revised", "policy", "structure", client=client)
+    assert client.calls == 2
+    pipeline.evaluate_compliance_with_ai(*DOCUMENTS.values(), client=client, requirements=pipeline.QCB_REQUIREMENTS[:2])
+    assert client.calls == 3
+    pipeline.evaluate_compliance_with_ai(*DOCUMENTS.values(), client=client, use_cache=False)
+    assert client.calls == 4
+
+
+def test_failed_evaluations_are_not_cached(cache):
+    class Failing:
+        def __init__(self):
+            self.chat = self.completions = self
+        def create(self, **kwargs):
+            raise ConnectionError("down")
+    assert pipeline.evaluate_compliance_with_ai(*DOCUMENTS.values(), client=Failing()) == {"requirements": [], "recommendations": []}
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_can_be_switched_off(cache, monkeypatch):
+    assert eval_cache.get_cache() is cache
+    monkeypatch.setenv("NAVIGATOR_CACHE", "off")
+    assert eval_cache.get_cache() is None
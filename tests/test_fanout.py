@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fanout
+
+PLAN_GROUP = [{"id": "licence", "category": "Licensing", "requirement": "Licensing category"},
+              {"id": "capital", "category": "Capital", "requirement": "Minimum capital"}]
+POLICY_GROUP = [{"id": "aml", "category": "AML", "requirement": "AML programme"}]
+GROUPS = [("business_plan", PLAN_GROUP), ("compliance_policy", POLICY_GROUP)]
+
+
+def test_merge_keeps_requested_ids_once_and_fills_catalog_fields():
+    results = [
+        {"requirements": [{"id": "licence", "status": "compliant"},
+                          {"id": "unrequested", "status": "missing"},
+                          {"id": "licence", "status": "missing"},  # duplicate: the first one wins
+                          {"id": "capital", "status": "partial", "requirement": "As the model wrote it",
+                           "found_in_document": "legal_structure"}],
+         "recommendations": ["Raise capital", "Hire a CCO"]},
+        {"requirements": [{"id": "aml", "status": "missing", "found_in_document": ""}],
+         "recommendations": ["Hire a CCO", "Write an AML policy"]},
+    ]
+    merged = fanout.merge_results(GROUPS, results)
+    assert merged["requirements"] == [
+        {"id": "licence", "status": "compliant", "category": "Licensing", "requirement": "Licensing category",
+         "found_in_document": "business_plan"},
+        {"id": "capital", "status": "partial", "requirement": "As the model wrote it", "found_in_document": "legal_structure",
+         "category": "Capital"},
+        {"id": "aml", "status": "missing", "found_in_document": "compliance_policy", "category": "AML",
+         "requirement": "AML programme"},
+    ]
+    assert merged["recommendations"] == ["Raise capital", "Hire a CCO", "Write an AML policy"]
+
+
+def test_merge_skips_failed_groups():
+    merged = fanout.merge_results(GROUPS, [None, {"requirements": [{"id": "aml", "status": "compliant"}]}])
+    assert [req["id"] for req in merged["requirements"]] == ["aml"]
+    assert fanout.merge_results(GROUPS, [None, None]) == {"requirements": [], "recommendations": []}
+
+
+def test_an_id_is_only_taken_from_the_group_that_requested_it():
+    merged = fanout.merge_results(GROUPS, [{"requirements": [{"id": "aml", "status": "compliant"}]},
+                                           {"requirements": [{"id": "licence", "status": "compliant"}]}])
+    assert merged["requirements"] == []
+
+
+def test_async_client_keeps_the_sync_client_configuration():
+    from openai import OpenAI
+    client = OpenAI(api_key="key", organization="org", project="proj", base_url="http://localhost:9/v1", timeout=12.5,
+                    default_headers={"X-Tenant": "qcb"}, default_query={"api-version": "1"})
+    async_client, owned = fanout.async_client(client)
+    assert owned
+    assert (async_client.api_key, async_client.organization, async_client.project) == ("key", "org", "proj")
+    assert async_client.base_url == client.base_url and async_client.timeout == 12.5
+    assert async_client._custom_headers == {"X-Tenant": "qcb"} and async_client._custom_query == {"api-version": "1"}
+    assert async_client.max_retries == 0  # fanout retries each request itself
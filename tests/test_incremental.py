@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+import eval_cache
+import incremental
+import mock_llm
+import pipeline
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(eval_cache, "_cache", eval_cache.EvaluationCache(str(tmp_path / "cache")))
+    monkeypatch.delenv("NAVIGATOR_CACHE", raising=False)
+    return str(tmp_path / "submissions")
+
+
+def ids(requirements):
+    return sorted(req["id"] for req in requirements)
+
+
+def test_changed_pages_are_the_inserted_and_modified_ones():
+    assert incremental.changed_pages(["a", "b", "c"], ["a", "b", "c"]) == []
+    assert incremental.changed_pages(["a", "b", "c"], ["a", "x", "c"]) == [2]
+    assert incremental.changed_pages(["a", "b", "c"], ["new", "a", "b", "c", "end"]) == [1, 5]
+    assert incremental.changed_pages(["a", "b", "c"], ["a", "c"]) == []  # a removed page changes nothing that is left
+
+
+def test_affected_requirements_follow_input_category_and_previous_location():
+    by_category = {cat: ids(r for r in pipeline.QCB_REQUIREMENTS if r.get("input_category") == cat) for cat in pipeline.DOCUMENT_CATEGORIES}
+    previous = [{"id": req["id"], "found_in_document": req.get("input_category")} for req in pipeline.QCB_REQUIREMENTS]
+    assert ids(incremental.affected_requirements(["legal_structure"], previous)) == by_category["legal_structure"]
+
+    moved = next(iter(by_category["business_plan"]))
+    previous = [dict(req, found_in_document="legal_structure") if req["id"] == moved else req for req in previous]
+    assert ids(incremental.affected_requirements(["legal_structure"], previous)) == sorted(by_category["legal_structure"] + [moved])
+
+    unevaluated = previous[1:]
+    assert previous[0]["id"] in ids(incremental.affected_requirements(["legal_structure"], unevaluated))
+
+
+def test_resubmission_only_reevaluates_what_changed(root):
+    client = mock_llm.MockClient()
+    application = corpus.make_application(2, 3, "en")
+    first = incremental.run_incremental("APP-1", application, client=client, root=root, render=False)
+    assert first["changes"]["reevaluated"] == ids(pipeline.QCB_REQUIREMENTS)
+    calls = client.calls
+
+    unchanged = incremental.run_incremental("APP-1", application, client=client, root=root, render=False)
+    assert unchanged["changes"]["documents"] == [] and unchanged["changes"]["reevaluated"] == []
+    assert client.calls == calls
+    assert ids(unchanged["requirements"]) == ids(first["requirements"]) and unchanged["score"] == first["score"]
+
+    revised = dict(application, legal_structure=corpus.make_document("legal_structure", pages=3, quotes=3, seed=1))
+    changed = incremental.run_incremental("APP-1", revised, client=client, root=root, render=False)
+    previous_locations = {req["id"]: req.get("found_in_document") for req in unchanged["requirements"]}
+    expected = ids(incremental.affected_requirements(["legal_structure"], unchanged["requirements"]))
+    assert changed["changes"]["documents"] == ["legal_structure"]
+    assert changed["changes"]["pages"]["legal_structure"]
+    assert changed["changes"]["reevaluated"] == expected
+    assert set(expected) < set(previous_locations)
+    assert client.calls > calls
+    assert ids(changed["requirements"]) == ids(first["requirements"])
+
+
+def test_use_cache_false_reevaluates_everything(root):
+    client = mock_llm.MockClient()
+    application = corpus.make_application(2, 3, "en")
+    incremental.run_incremental("APP-2", application, client=client, root=root, render=False)
+    calls = client.calls
+    again = incremental.run_incremental("APP-2", application, client=client, root=root, render=False, use_cache=False)
+    assert again["changes"]["reevaluated"] == ids(pipeline.QCB_REQUIREMENTS)
+    assert client.calls > calls
@@ -0,0 +1,111 @@
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+import jobs
+import mock_llm
+import pipeline
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return jobs.JobQueue(str(tmp_path))
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes():
+    return corpus.make_application(2, 3, "en")
+
+
+def kinds(queue, job_id):
+    return [event["kind"] for event in queue.events(job_id)]
+
+
+def test_claim_takes_the_oldest_job_once(queue, pdf_bytes):
+    first = queue.submit(pdf_bytes)
+    second = queue.submit(pdf_bytes)
+    claimed = queue.claim("worker-a")
+    assert claimed["id"] == first and claimed["status"] == jobs.RUNNING and claimed["attempts"] == 1
+    assert queue.claim("worker-b")["id"] == second
+    assert queue.claim("worker-c") is None
+
+
+def test_heartbeat_keeps_only_the_listed_jobs_alive(queue, pdf_bytes):
+    alive, orphan = queue.submit(pdf_bytes), queue.submit(pdf_bytes)
+    queue.claim("worker-a"), queue.claim("worker-a")
+    time.sleep(0.05)
+    queue.heartbeat("worker-a", [alive])
+    assert queue.recover(stale_after=0.02) == [orphan]
+    assert queue.get(alive)["status"] == jobs.RUNNING
+    assert queue.get(orphan)["status"] == jobs.QUEUED and queue.get(orphan)["owner"] is None
+
+
+def test_crashed_worker_jobs_are_requeued_then_failed_after_max_attempts(queue, pdf_bytes):
+    job_id = queue.submit(pdf_bytes)
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        assert queue.claim("crashing-worker")["attempts"] == attempt
+        recovered = queue.recover(stale_after=-1)  # every heartbeat is stale
+        assert recovered == ([job_id] if attempt < jobs.MAX_ATTEMPTS else [])
+    job = queue.get(job_id)
+    assert job["status"] == jobs.FAILED and "stopped responding" in job["error"]
+    assert kinds(queue, job_id).count("queued") == jobs.MAX_ATTEMPTS
+
+
+def test_replay_resets_a_finished_job(queue, pdf_bytes):
+    job_id = queue.submit(pdf_bytes)
+    assert not queue.replay(job_id)  # still queued
+    queue.claim("worker-a")
+    queue.complete(job_id, {"score": 50, "requirements": [], "recommendations": []})
+    assert queue.result(job_id)["score"] == 50
+    assert queue.replay(job_id)
+    job = queue.get(job_id)
+    assert job["status"] == jobs.QUEUED and job["attempts"] == 0
+    assert queue.result(job_id) is None
+    assert [(event["kind"], event["payload"]) for event in queue.events(job_id)] == [("queued", "replay")]
+
+
+def wait_until(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_worker_survives_a_failure_to_store_the_outcome(queue, pdf_bytes, monkeypatch, caplog):
+    complete, calls = queue.complete, []
+
+    def flaky_complete(job_id, results):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        complete(job_id, results)
+
+    monkeypatch.setattr(queue, "complete", flaky_complete)
+    first, second = queue.submit(pdf_bytes), queue.submit(pdf_bytes)
+    pool = jobs.WorkerPool(queue, workers=1, client_factory=mock_llm.MockClient).start()
+    try:
+        with caplog.at_level(logging.ERROR, logger="jobs"):
+            wait_until(lambda: queue.get(second)["status"] == jobs.DONE)
+    finally:
+        pool.stop(timeout=10)
+    assert f"could not finish job {first}" in caplog.text
+    assert queue.get(first)["status"] == jobs.RUNNING  # left for recover() once its heartbeat is stale
+
+
+def test_mapreduce_errors_reach_the_job_event_log(queue, pdf_bytes):
+    job_id = queue.submit(pdf_bytes)
+    pool = jobs.WorkerPool(queue, workers=0).start()  # the log handler only, no worker claims the job
+    try:
+        pool._current[threading.get_ident()] = job_id
+        logging.getLogger("mapreduce").error("chunk 3-4 failed")
+    finally:
+        pool.stop(timeout=10)
+    assert "chunk 3-4 failed" in [event["payload"] for event in queue.events(job_id) if event["kind"] == "error"]
@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mapreduce
+
+HOSTING = {"id": "hosting", "category": "Technology", "requirement": "Data hosted in Qatar"}
+BOARD = {"id": "board", "category": "Governance", "requirement": "Board composition"}
+PAGES = {"business_plan": [
+    "Our company builds payment services.",
+    "All customer data is hosted in a Qatar data centre.",
+    "Backups are replicated to an AWS Ireland region.",
+    "The board has five members.",
+]}
+CHUNKS = [mapreduce.Chunk("business_plan", [HOSTING, BOARD], 0, 2), mapreduce.Chunk("business_plan", [HOSTING, BOARD], 2, 4)]
+
+
+def reduce(first, second):
+    merged = mapreduce.reduce_findings(PAGES, CHUNKS, [first, second])
+    return {req["id"]: req for req in merged["requirements"]}, merged
+
+
+def test_best_status_wins_and_other_evidence_is_a_conflict():
+    by_id, _ = reduce(
+        {"requirements": [{"id": "hosting", "status": "compliant", "key_quote": "hosted in a Qatar data centre"}]},
+        {"requirements": [{"id": "hosting", "status": "partial", "key_quote": "replicated to an AWS Ireland region", "details": "EU copy"}]},
+    )
+    hosting = by_id["hosting"]
+    assert hosting["status"] == "compliant" and hosting["evidence_pages"] == "1-2" and hosting["key_quote_page"] == 2
+    assert hosting["found_in_document"] == "business_plan" and hosting["requirement"] == HOSTING["requirement"]
+    assert hosting["conflicts"] == [{"pages": "3-4", "status": "partial", "details": "EU copy",
+                                     "key_quote": "replicated to an AWS Ireland region"}]
+
+
+def test_missing_without_a_quote_is_no_conflict():
+    by_id, _ = reduce({"requirements": [{"id": "board", "status": "missing"}]},
+                      {"requirements": [{"id": "board", "status": "partial", "key_quote": "The board has five members."}]})
+    assert by_id["board"]["status"] == "partial" and by_id["board"]["key_quote_page"] == 4
+    assert "conflicts" not in by_id["board"]
+
+    by_id, _ = reduce({"requirements": [{"id": "board", "status": "missing", "key_quote": "Our company builds payment services."}]},
+                      {"requirements": [{"id": "board", "status": "partial", "key_quote": "The board has five members."}]})
+    assert [conflict["status"] for conflict in by_id["board"]["conflicts"]] == ["missing"]
+
+
+def test_equal_statuses_prefer_a_quote_found_in_its_chunk_then_the_earliest_chunk():
+    by_id, _ = reduce({"requirements": [{"id": "hosting", "status": "partial", "key_quote": "invented by the model"}]},
+                      {"requirements": [{"id": "hosting", "status": "partial", "key_quote": "AWS Ireland region"}]})
+    assert by_id["hosting"]["evidence_pages"] == "3-4" and by_id["hosting"]["key_quote_page"] == 3
+
+    by_id, _ = reduce({"requirements": [{"id": "hosting", "status": "missing"}]},
+                      {"requirements": [{"id": "hosting", "status": "missing"}]})
+    assert by_id["hosting"]["evidence_pages"] == "1-2" and "key_quote_page" not in by_id["hosting"]
+
+
+def test_quote_outside_its_chunk_gets_no_page():
+    by_id, _ = reduce({"requirements": [{"id": "hosting", "status": "partial", "key_quote": "AWS Ireland region"}]}, None)
+    assert by_id["hosting"]["evidence_pages"] == "1-2" and "key_quote_page" not in by_id["hosting"]
+
+
+def test_requirement_order_duplicates_and_failed_chunks():
+    by_id, merged = reduce(
+        None,
+        {"requirements": [{"id": "board", "status": "compliant"}, {"id": "hosting", "status": "missing"},
+                          {"id": "board", "status": "missing"}, {"id": "unrequested", "status": "compliant"}],
+         "recommendations": ["Move backups to Qatar"]},
+    )
+    assert [req["id"] for req in merged["requirements"]] == ["hosting", "board"]  # catalog order, not reply order
+    assert by_id["board"]["status"] == "compliant"
+    assert merged["recommendations"] == ["Move backups to Qatar"]
+    assert reduce(None, None)[1] == {"requirements": [], "recommendations": []}
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalize
+
+NAMES = ["alpha beta", "gamma delta", "epsilon zeta", "eta theta"]
+PAGES = [f"ACME Corp confidential\nIntro {name}.\nThe {name} clause\nruns over   two {name} lines.\nClosing {name} words\nPage {i + 1} of 4\n"
+         for i, name in enumerate(NAMES)]
+
+
+def test_running_headers_and_footers_are_removed():
+    document = normalize.NormalizedDocument(PAGES)
+    assert document.removed_lines == 8
+    assert document.pages()[0] == "Intro alpha beta.\n\nThe alpha beta clause runs over two alpha beta lines.\n\nClosing alpha beta words"
+    assert not any("ACME" in page or "Page" in page for page in document.pages())
+
+
+def test_every_word_maps_back_to_the_original():
+    document = normalize.NormalizedDocument(PAGES)
+    text, offsets, origins, _, _ = document._word_index()
+    for offset, origin in zip(offsets, origins):
+        word = text[offset:].split(None, 1)[0]
+        assert document.original[origin:origin + len(word)] == word
+    start = text.index("over two")
+    assert document.original[slice(*document.to_original(start, start + len("over two")))] == "over   two"
+
+
+def test_locate_returns_the_original_text_and_its_page():
+    document = normalize.NormalizedDocument(PAGES)
+    assert document.locate("THE GAMMA DELTA clause runs over two gamma") == (1, "The gamma delta clause\nruns over   two gamma")
+    # A quote across a page break comes back with the footer and header it crossed.
+    assert document.locate("Closing alpha beta words Intro gamma") == (0, "Closing alpha beta words\nPage 1 of 4\nACME Corp confidential\nIntro gamma")
+    assert document.locate("not in the document") is None
+    assert document.locate("") is None
+
+
+def test_locate_can_be_limited_to_pages():
+    document = normalize.NormalizedDocument(PAGES)
+    assert document.locate("runs over two", first_page=2)[0] == 2
+    assert document.locate("Intro alpha beta", first_page=1) is None
+    assert document.locate("Intro eta theta", last_page=3) is None
+    assert document.locate("Intro eta theta", first_page=3, last_page=3) is None
+
+
+def test_repeated_paragraphs_are_kept_where_they_first_appear():
+    boilerplate = "This document is provided for regulatory review only and must not be shared outside the applicant."
+    pages = {"business_plan": [f"Plan text.\n{boilerplate}\n"], "compliance_policy": [f"{boilerplate}\nPolicy text.\n{boilerplate}\n"]}
+    normalized = normalize.normalize_documents(pages)
+    assert normalized["business_plan"] == [f"Plan text.\n\n{boilerplate}"]
+    assert normalized["compliance_policy"] == ["Policy text."]
+    assert normalize.normalize_documents(pages, dedupe=False)["compliance_policy"][0].count(boilerplate) == 2
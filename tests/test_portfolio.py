@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+import pipeline
+import portfolio
+
+STATUSES = ["compliant", "partial", "missing", "not_applicable", None]
+
+
+def random_results(count, seed=0):
+    rng = random.Random(seed)
+    ids = list(catalog.get_catalog().by_id)
+    results = []
+    for i in range(count):
+        requirements = [{"id": req_id, "status": rng.choice(STATUSES)} for req_id in ids if rng.random() < 0.9]
+        requirements += [{"id": rng.choice(ids), "status": rng.choice(STATUSES)} for _ in range(3)]  # duplicates: the first counts
+        requirements.append({"id": "not-in-catalog", "status": "compliant"})
+        rng.shuffle(requirements)
+        results.append((f"app{i}", requirements))
+    return results
+
+
+def test_vectorized_scores_match_calculate_transparent_score():
+    results = random_results(300)
+    scores = portfolio.Portfolio.from_results(results).scores()
+    assert scores.shape == (300, 1)
+    assert list(scores[:, 0]) == [pipeline.calculate_transparent_score(requirements) for _, requirements in results]
+
+
+def test_sweep_columns_match_scoring_each_configuration_alone():
+    results = random_results(50, seed=1)
+    matrix = portfolio.Portfolio.from_results(results)
+    base = portfolio.current_scoring()
+    first_id = matrix.requirement_ids[0]
+    sweep = [base, portfolio.with_multiplier(base, 0.0), portfolio.with_multiplier(base, 1.0), portfolio.with_weight(base, first_id, 7)]
+    swept = matrix.scores(sweep)
+    for k, scoring in enumerate(sweep):
+        assert np.array_equal(swept[:, k], matrix.scores([scoring])[:, 0])
+    # A multiplier of 1 scores partial like compliant.
+    upgraded = [(app, [dict(req, status="compliant" if req["status"] == "partial" else req["status"]) for req in reqs])
+                for app, reqs in results]
+    assert list(swept[:, 2]) == [pipeline.calculate_transparent_score(reqs) for _, reqs in upgraded]
+
+
+def test_unchanged_weights_have_no_sensitivity():
+    matrix = portfolio.Portfolio.from_results(random_results(20, seed=2))
+    assert all(row["changed"] == 0 for row in matrix.sensitivity(factor=1.0))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    matrix = portfolio.Portfolio.from_results(random_results(5, seed=3))
+    path = str(tmp_path / "portfolio.npz")
+    matrix.save(path)
+    loaded = portfolio.Portfolio.load(path)
+    assert loaded.application_ids == matrix.application_ids and loaded.requirement_ids == matrix.requirement_ids
+    assert np.array_equal(loaded.scores(), matrix.scores())
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import fitz
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quote_index
+
+PAGES = [
+    "The company is licensed as a payment service provider.\nCustomer data is hosted on servers in Doha.",
+    "Paid-up capital amounts to QAR 7,500,000 held in escrow.\nBackups replicate nightly to the AWS region",
+    "in Ireland under a standard processing agreement.\nThe board meets quarterly to review risk.",
+    "Suspicious transactions are reported to the QFIU within two days.",
+]
+
+
+@pytest.fixture
+def document():
+    pdf = fitz.open()
+    for text in PAGES:
+        page = pdf.new_page()
+        y = 72
+        for line in text.split("\n"):
+            page.insert_text((72, y), line, fontsize=11)
+            y += 20
+    yield pdf
+    pdf.close()
+
+
+def pages_of(matches):
+    return [page_index for page_index, _ in matches]
+
+
+def test_exact_match_is_case_and_punctuation_insensitive(document):
+    index = quote_index.QuoteIndex(document)
+    assert pages_of(index.locate("paid-up capital amounts to QAR 7,500,000")) == [1]
+
+
+def test_quote_across_a_page_break_matches_on_both_pages(document):
+    index = quote_index.QuoteIndex(document)
+    assert pages_of(index.locate("replicate nightly to the AWS region in Ireland under")) == [1, 2]
+
+
+def test_lazily_added_pages_keep_page_order(document):
+    full = quote_index.QuoteIndex(document)
+    lazy = quote_index.QuoteIndex(document, [2])
+    lazy.add_pages(range(document.page_count))
+    assert lazy.tokens == full.tokens
+    assert pages_of(lazy.locate("replicate nightly to the AWS region in Ireland under")) == [1, 2]
+
+
+def test_no_match_or_highlight_spans_a_page_that_is_not_indexed(document):
+    index = quote_index.QuoteIndex(document, [1, 3])  # page 2 is skipped
+    assert index.locate("the AWS region Suspicious transactions are reported") == []
+    # A fuzzy match at the end of page 1 is cut there instead of running into page 3.
+    matches = index.locate("Backups replicate nightly to the AWS region in Ireland under a standard")
+    assert pages_of(matches) == [1]
+
+
+def test_fuzzy_match_tolerates_reworded_quote(document):
+    index = quote_index.QuoteIndex(document)
+    assert pages_of(index.locate("Suspicious transactions are reported to the QFIU within 2 days")) == [3]
+
+
+def test_first_words_fallback(document):
+    index = quote_index.QuoteIndex(document)
+    matches = index.locate("The board meets quarterly to approve the budget and appoint auditors for the group")
+    assert pages_of(matches) == [2]
+
+
+def test_short_or_unknown_quotes_are_not_matched(document):
+    index = quote_index.QuoteIndex(document)
+    assert index.locate("Doha") == []
+    assert index.locate("nothing like this appears anywhere in the filing") == []
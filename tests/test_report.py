@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab import rl_config
+
+import report
+
+REQUIREMENTS = [{"id": "REQ-1", "category": "governance", "requirement": "Board", "status": "missing", "details": "none"}]
+
+
+def test_summary_streams_are_binary_and_reportlab_settings_are_restored():
+    before = rl_config.useA85
+    pdf = report.render_summary(50, REQUIREMENTS, [], "en")
+    assert pdf.startswith(b"%PDF") and b"/ASCII85Decode" not in pdf
+    assert rl_config.useA85 == before
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import retrieval
+
+FILLER = "The company organises team events and publishes a quarterly newsletter for its staff."
+PAGES = {
+    "business_plan": [f"{FILLER}\n\nWe apply for a payment service provider licence under Category 1.", FILLER],
+    "compliance_policy": [FILLER, "Anti-money laundering: every customer passes identity verification and sanctions screening."],
+    "legal_structure": ["The board of directors has five members, two of them independent.", FILLER],
+}
+REQUIREMENTS = [
+    {"id": "licence", "requirement": "Licensing category", "description": "State the payment service provider licence category",
+     "input_category": "business_plan"},
+    {"id": "aml", "requirement": "Anti-money laundering", "description": "Customer identity verification and sanctions screening",
+     "input_category": "compliance_policy"},
+    {"id": "board", "requirement": "Board composition", "description": "Board of directors with independent members",
+     "input_category": "legal_structure"},
+]
+
+
+@pytest.fixture
+def embedder(tmp_path, monkeypatch):
+    monkeypatch.setenv("NAVIGATOR_INDEX_DIR", str(tmp_path))
+    return retrieval.HashingEmbedder()
+
+
+def test_chunks_stay_within_the_limit_and_keep_their_page():
+    sentence = "This sentence is part of a very long paragraph. "
+    chunks = retrieval.chunk_pages(["short one\n\nshort two", sentence * 20], max_chars=200)
+    assert chunks[0] == {"page": 1, "text": "short one short two"}
+    assert all(len(c["text"]) <= 200 for c in chunks)
+    assert {c["page"] for c in chunks[1:]} == {2}
+    assert all(c["text"].endswith(".") for c in chunks[1:-1])  # long paragraphs are cut at a sentence end
+
+
+def test_each_requirement_gets_its_own_evidence_first(embedder):
+    context = retrieval.select_context(PAGES, REQUIREMENTS, top_k=2, embedder=embedder)
+    assert set(context) == {"licence", "aml", "board"}
+    assert all(len(passages) == 2 for passages in context.values())
+    assert "Category 1" in context["licence"][0]["text"] and context["licence"][0]["document"] == "business_plan"
+    assert "sanctions screening" in context["aml"][0]["text"] and context["aml"][0]["page"] == 2
+    assert "board of directors" in context["board"][0]["text"]
+    for passages in context.values():
+        assert [p["score"] for p in passages] == sorted((p["score"] for p in passages), reverse=True)
+
+
+def test_primary_document_gets_the_boost(embedder):
+    pages = {"business_plan": ["identity verification"], "compliance_policy": ["identity verification"]}
+    requirement = {"id": "aml", "requirement": "identity verification", "input_category": "compliance_policy"}
+    best = retrieval.select_context(pages, [requirement], top_k=2, embedder=embedder)["aml"]
+    assert [p["document"] for p in best] == ["compliance_policy", "business_plan"]
+    assert best[0]["score"] - best[1]["score"] == pytest.approx(retrieval.PRIMARY_DOCUMENT_BOOST)
+
+
+def test_index_is_persisted_by_content(embedder, tmp_path):
+    index = retrieval.build_index(PAGES["legal_structure"], embedder)
+    assert len(os.listdir(tmp_path)) == 1
+    class NoEmbedding(retrieval.HashingEmbedder):
+        def embed(self, texts):
+            raise AssertionError("persisted index not reused")
+    reloaded = retrieval.build_index(PAGES["legal_structure"], NoEmbedding())
+    assert reloaded.chunks == index.chunks and np.allclose(reloaded.vectors, index.vectors)
+    retrieval.build_index(PAGES["legal_structure"] + ["another page"], embedder)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_empty_document_yields_no_passages(embedder):
+    context = retrieval.select_context({"business_plan": []}, REQUIREMENTS[:1], embedder=embedder)
+    assert context == {"licence": []}
+    assert "No relevant text found" in retrieval.render_context(REQUIREMENTS[:1], context)
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rules
+
+
+def test_rules_matching_at_the_same_position_all_fire():
+    engine = rules.RuleEngine([
+        {"id": "cap_literal", "requirement_id": "a", "pattern": "QAR 45,000", "literal": True, "status": "partial"},
+        {"id": "cap_value", "requirement_id": "b", "pattern": r"QAR\s*(?P<value>[\d,]+)", "value_type": "number",
+         "condition": {"above": 1000}, "status": "compliant", "details": "QAR {value}"},
+    ])
+    findings = engine.scan({"business_plan": "Transactions up to QAR 45,000 per month."})
+    assert findings["a"]["rule"] == "cap_literal"
+    assert findings["b"]["rule"] == "cap_value"
+    assert findings["b"]["details"] == "QAR 45000"
+
+
+def test_first_match_in_document_order_wins():
+    engine = rules.RuleEngine([
+        {"id": "cap", "requirement_id": "a", "pattern": r"QAR\s*(?P<value>[\d,]+)", "value_type": "number", "details": "{value}"},
+        {"id": "any", "requirement_id": "b", "pattern": "QAR", "literal": True},
+    ])
+    findings = engine.scan({"business_plan": "QAR 10 then QAR 20"})
+    assert findings["a"]["details"] == "10"
+    assert findings["b"]["key_quote"] == "QAR"
+
+
+def test_a_match_does_not_span_two_documents():
+    engine = rules.RuleEngine([{"id": "cap", "requirement_id": "a", "pattern": r"QAR\s+(?P<value>[\d,]+)", "value_type": "number"}])
+    assert engine.scan({"business_plan": "Paid-up capital: QAR", "compliance_policy": "10,000,000 as required."}) == {}
+    assert engine.scan({"business_plan": "Paid-up capital: QAR 10,000,000"})["a"]["found_in_document"] == "business_plan"
+
+
+def test_scans_are_memoized_by_content_and_bounded():
+    rules.clear_scan_cache()
+    documents = {"business_plan": "Paid-up capital of QAR 5,000,000.", "compliance_policy": "", "legal_structure": ""}
+    first = rules.scan_documents(documents)
+    assert rules.scan_documents(dict(documents)) is first
+    assert rules.scan_documents({**documents, "legal_structure": "changed"}) is not first
+    for i in range(rules.SCAN_CACHE_SIZE):
+        rules.scan_documents({**documents, "legal_structure": f"filler {i}"})
+    assert len(rules._scans) == rules.SCAN_CACHE_SIZE
+    assert rules.scan_documents(documents) is not first  # evicted, scanned again
+    rules.clear_scan_cache()
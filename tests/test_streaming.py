@@ -0,0 +1,63 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mock_llm
+import pipeline
+import streaming
+
+# Characters that matter to the parser's bracket and string tracking.
+TRICKY = ['{', '}', '[', ']', '"', '\\', '\\"', '",', '":', 'requirements', ' ', 'é', '\n', 'a']
+
+
+def tricky_text(rng):
+    return "".join(rng.choice(TRICKY) for _ in range(rng.randint(0, 12)))
+
+
+def make_reply(rng):
+    requirements = []
+    for i in range(rng.randint(0, 6)):
+        req = {"id": f"REQ-{i}", "status": rng.choice(["compliant", "partial", "missing"]),
+               "details": tricky_text(rng), "key_quote": tricky_text(rng)}
+        if rng.random() < 0.5:
+            req["conflicts"] = [{"pages": "1-2", "details": tricky_text(rng)}]
+        requirements.append(req)
+    reply = {"summary": tricky_text(rng), "requirements": requirements,
+             "recommendations": [tricky_text(rng) for _ in range(rng.randint(0, 3))]}
+    if rng.random() < 0.5:
+        reply = {"note": "requirements", "nested": {"requirements": [{"id": "not top-level"}]}, **reply}
+    return reply, requirements
+
+
+def chunks(text, rng):
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 40))))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_parser_emits_each_requirement_whatever_the_chunking(seed):
+    rng = random.Random(seed)
+    reply, requirements = make_reply(rng)
+    text = json.dumps(reply, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    if rng.random() < 0.5:
+        text = f"```json\n{text}\n``` trailing {{\"requirements\": [{{}}]}}"
+    parser = streaming.RequirementStreamParser()
+    emitted = []
+    for chunk in chunks(text, rng):
+        emitted.extend(parser.feed(chunk))
+    assert emitted == requirements
+    assert parser.done and parser.text == text
+    assert pipeline.parse_evaluation_reply(parser.text) == reply
+
+
+def test_callback_errors_are_not_swallowed():
+    def on_requirement(found):
+        raise KeyError("ui bug")
+    with pytest.raises(KeyError):
+        pipeline.evaluate_compliance_with_ai("plan", "policy", "structure", client=mock_llm.MockClient(),
+                                             use_cache=False, on_requirement=on_requirement)
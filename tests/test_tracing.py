@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+
+
+def span(name, duration_ms, *children):
+    return {"name": name, "duration_ms": duration_ms, "children": list(children)}
+
+
+def test_breakdown_uses_self_time_so_nested_stages_count_once():
+    record = span("application", 1000,
+                  span("extract", 100),
+                  span("evaluate", 700, span("mapreduce", 650, span("llm", 300), span("llm", 200))),
+                  span("finalize", 150))
+    breakdown = tracing.stage_breakdown(record)
+    assert breakdown == {"extract": 100, "evaluate": 50, "mapreduce": 150, "llm": 500, "finalize": 150}
+    assert sum(breakdown.values()) == pytest.approx(950)
+
+
+def test_concurrent_children_leave_their_parent_no_self_time():
+    record = span("application", 500, span("fanout", 400, span("llm", 350), span("llm", 380)))
+    assert tracing.stage_breakdown(record) == {"fanout": 0.0, "llm": 730}
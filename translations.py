@@ -0,0 +1,113 @@
+"""
+Regulatory Navigator - UI and Report Translations
+Text shown in the Streamlit UI and in the summary reports, per language code.
+"""
+
+TRANSLATIONS = {
+    "en": {
+        "lang_name": "English",
+        "title": "QCB Regulatory Navigator & Readiness Evaluator",
+        "subtitle": "Upload your 3 core documents for comprehensive compliance evaluation",
+        "business_plan_header": "📄 Business Plan",
+        "compliance_policy_header": "🔒 Compliance Policy",
+        "legal_structure_header": "⚖️ Legal Structure",
+        "upload_bp_label": "Upload Business Plan PDF",
+        "upload_cp_label": "Upload Internal Compliance Policy PDF",
+        "upload_ls_label": "Upload Legal Structure Document PDF",
+        "evaluate_button": "🚀 Evaluate Compliance",
+        "bypass_cache_label": "Re-run AI analysis (ignore cached results)",
+        "submission_ref_label": "Submission reference (optional, resubmissions re-evaluate only what changed)",
+        "incremental_note": "♻️ Changed since last evaluation: {documents}. Re-evaluated {count} requirement(s) and reused the rest.",
+        "incremental_unchanged": "♻️ No document changed since the last evaluation; showing the saved results.",
+        "debug_panel": "🔧 Debug: stage timings and token usage",
+        "debug_total": "Job total: {ms:.0f} ms",
+        "error_upload_all": "⚠️ Please upload all three PDF documents before proceeding.",
+        "spinner_text": "🔍 Processing documents and analyzing compliance...",
+        "job_queued": "⏳ Evaluation queued (job {job_id}). It runs in the background, so you can refresh this page or come back later.",
+        "job_running": "🔍 Processing documents and analyzing compliance (job {job_id}). You can refresh this page or come back later.",
+        "reading_pdfs": "📖 Reading PDF files...",
+        "ai_analyzing": "🤖 AI is analyzing documents for compliance gaps...",
+        "applying_checks": "CHECKS: Applying high-precision checks for specific rules...",
+        "mapping_recs": "💡 Mapping deterministic recommendations and resources...",
+        "calculating_score": "🧮 Calculating transparent score based on AI findings...",
+        "generating_reports": "📝 Generating downloadable reports...",
+        "analysis_complete": "✅ Analysis complete! Download your reports below.",
+        "provisional_score_metric": "Provisional Readiness Score",
+        "provisional_score_delta": "{count} of {total} requirements evaluated so far",
+        "overall_score_metric": "Overall Readiness Score",
+        "score_delta": "(Transparently Calculated)",
+        "urgent_header": "🚨 URGENT: Critical Requirements Missing",
+        "urgent_subheader": "{count} critical requirement{s} must be addressed immediately",
+        "gap_label": "Gap:",
+        "suggestion_label": "Suggestion:",
+        "flag_review_label": "🚩 Flag '{req_name}' for expert review",
+        "download_reports_header": "📥 Download Reports",
+        "download_bp_button": "📄 Marked-up Business Plan",
+        "download_cp_button": "🔒 Marked-up Compliance Policy",
+        "download_ls_button": "⚖️ Marked-up Legal Structure",
+        "download_summary_button": "📊 Summary Report",
+        "report_title": "QCB Compliance Readiness Report",
+        "report_score": "Overall Readiness Score:",
+        "report_assessment": "Detailed Compliance Assessment",
+        "report_status": "Status:",
+        "report_reasoning": "Reasoning:",
+        "report_suggestion": "Improvement Suggestion:",
+        "report_resources": "Recommended Resources:",
+        "status_compliant": "Compliant",
+        "status_partial": "Partial",
+        "status_missing": "Missing"
+    },
+    "ar": {
+        "lang_name": "العربية",
+        "title": "متصفح الامتثال التنظيمي والتقييم لجاهزية مصرف قطر المركزي",
+        "subtitle": "قم بتحميل مستنداتك الأساسية الثلاثة لتقييم الامتثال الشامل",
+        "business_plan_header": "📄 خطة العمل",
+        "compliance_policy_header": "🔒 سياسة الامتثال",
+        "legal_structure_header": "⚖️ الهيكل القانوني",
+        "upload_bp_label": "تحميل ملف خطة العمل (PDF)",
+        "upload_cp_label": "تحميل ملف سياسة الامتثال الداخلية (PDF)",
+        "upload_ls_label": "تحميل ملف الهيكل القانوني (PDF)",
+        "evaluate_button": "🚀 تقييم الامتثال",
+        "bypass_cache_label": "إعادة تشغيل تحليل الذكاء الاصطناعي (تجاهل النتائج المخزنة)",
+        "submission_ref_label": "مرجع الطلب (اختياري، عند إعادة التقديم يُعاد تقييم ما تغيّر فقط)",
+        "incremental_note": "♻️ تغيّر منذ آخر تقييم: {documents}. أُعيد تقييم {count} متطلبًا وأُعيد استخدام الباقي.",
+        "incremental_unchanged": "♻️ لم يتغيّر أي مستند منذ آخر تقييم؛ يتم عرض النتائج المحفوظة.",
+        "debug_panel": "🔧 تصحيح الأخطاء: توقيت المراحل واستهلاك الرموز",
+        "debug_total": "إجمالي المهمة: {ms:.0f} مللي ثانية",
+        "error_upload_all": "⚠️ يرجى تحميل جميع ملفات PDF الثلاثة قبل المتابعة.",
+        "spinner_text": "🔍 جاري معالجة المستندات وتحليل الامتثال...",
+        "job_queued": "⏳ التقييم في قائمة الانتظار (المهمة {job_id}). يعمل في الخلفية، لذا يمكنك تحديث هذه الصفحة أو العودة لاحقًا.",
+        "job_running": "🔍 جاري معالجة المستندات وتحليل الامتثال (المهمة {job_id}). يمكنك تحديث هذه الصفحة أو العودة لاحقًا.",
+        "reading_pdfs": "📖 قراءة ملفات PDF...",
+        "ai_analyzing": "🤖 الذكاء الاصطناعي يحلل المستندات بحثًا عن فجوات الامتثال...",
+        "applying_checks": "CHECKS: تطبيق فحوصات عالية الدقة لقواعد محددة...",
+        "mapping_recs": "💡 ربط التوصيات والموارد المحددة...",
+        "calculating_score": "🧮 حساب النتيجة الشفافة بناءً على نتائج الذكاء الاصطناعي...",
+        "generating_reports": "📝 إنشاء التقارير القابلة للتنزيل...",
+        "analysis_complete": "✅ اكتمل التحليل! قم بتنزيل تقاريرك أدناه.",
+        "provisional_score_metric": "النتيجة المبدئية للجاهزية",
+        "provisional_score_delta": "تم تقييم {count} من {total} متطلبًا حتى الآن",
+        "overall_score_metric": "النتيجة الإجمالية للجاهزية",
+        "score_delta": "(محسوبة بشفافية)",
+        "urgent_header": "🚨 عاجل: متطلبات حرجة مفقودة",
+        "urgent_subheader": "يجب معالجة {count} متطلبًا حرجًا على الفور",
+        "gap_label": "الفجوة:",
+        "suggestion_label": "الاقتراح:",
+        "flag_review_label": "🚩 وضع علامة على '{req_name}' للمراجعة من قبل خبير",
+        "download_reports_header": "📥 تنزيل التقارير",
+        "download_bp_button": "📄 خطة العمل مع التعليقات",
+        "download_cp_button": "🔒 سياسة الامتثال مع التعليقات",
+        "download_ls_button": "⚖️ الهيكل القانوني مع التعليقات",
+        "download_summary_button": "📊 تقرير الملخص",
+        "report_title": "تقرير جاهزية الامتثال لمصرف قطر المركزي",
+        "report_score": "النتيجة الإجمالية للجاهزية:",
+        "report_assessment": "التقييم التفصيلي للامتثال",
+        "report_status": "الحالة:",
+        "report_reasoning": "التعليل:",
+        "report_suggestion": "اقتراح التحسين:",
+        "report_resources": "الموارد الموصى بها:",
+        "status_compliant": "ممتثل",
+        "status_partial": "ممتثل جزئيًا",
+        "status_missing": "مفقود"
+    }
+}